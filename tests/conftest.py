@@ -6,6 +6,7 @@ Este arquivo contém fixtures compartilhadas e configurações para todos os tes
 """
 
 import asyncio
+import json
 import pytest
 from pathlib import Path
 from typing import AsyncGenerator, Generator
@@ -124,6 +125,84 @@ def mock_registro_br_response_unavailable() -> dict:
     }
 
 
+# ============================================================================
+# Servidor Stub da API Registro.br
+# ============================================================================
+
+class StubRegistroBr:
+    """
+    Servidor HTTP local que imita o endpoint avail/raw do Registro.br.
+
+    Atributos configuráveis pelos testes:
+        latency: função domínio -> segundos de espera antes de responder
+        available: conjunto de domínios que devem ser respondidos como disponíveis
+        status_for: função domínio -> status HTTP (padrão 200)
+        throttle_above: responde 429 quando há mais requisições em voo que isso
+    """
+
+    def __init__(self):
+        self.latency = lambda domain: 0.0
+        self.available = set()
+        self.status_for = lambda domain: 200
+        self.throttle_above = None
+        self.requests = []
+        self.in_flight = 0
+        self.base_url = None
+
+    async def handle(self, request):
+        self.in_flight += 1
+        try:
+            return await self._respond(request)
+        finally:
+            self.in_flight -= 1
+
+    async def _respond(self, request):
+        from aiohttp import web
+
+        domain = request.match_info["domain"]
+        self.requests.append(domain)
+
+        delay = self.latency(domain)
+        if delay:
+            await asyncio.sleep(delay)
+
+        if self.throttle_above is not None and self.in_flight > self.throttle_above:
+            return web.Response(status=429, text="too many requests")
+
+        status = self.status_for(domain)
+        if status != 200:
+            return web.Response(status=status, text="erro")
+
+        if domain in self.available:
+            payload = {"status": 0, "fqdn": domain, "description": "Domínio disponível"}
+        else:
+            payload = {"status": 2, "fqdn": domain, "description": "Domínio já registrado"}
+        return web.json_response(payload, dumps=lambda o: json.dumps(o, ensure_ascii=False))
+
+
+@pytest.fixture
+async def stub_registro_br() -> AsyncGenerator[StubRegistroBr, None]:
+    """
+    Sobe um servidor stub da API do Registro.br em 127.0.0.1 (porta livre).
+    Use `stub.base_url` como API_URL do DomainChecker.
+    """
+    from aiohttp import web
+
+    stub = StubRegistroBr()
+    app = web.Application()
+    app.router.add_get("/v2/ajax/avail/raw/{domain}", stub.handle)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+
+    port = site._server.sockets[0].getsockname()[1]
+    stub.base_url = f"http://127.0.0.1:{port}/v2/ajax/avail/raw/"
+    yield stub
+    await runner.cleanup()
+
+
 # ============================================================================
 # Hooks do Pytest
 # ============================================================================
@@ -13,7 +13,9 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from tools.domain_checker.domain_checker_advanced import DomainChecker, setup_logging
+from tools.domain_checker.domain_checker_advanced import DomainChecker, build_parser, setup_logging
+from tools.domain_checker.coordinator import CoordinatorServer, LeaseQueue, run_worker
+from tools.domain_checker.sharding import run_sharded
 
 
 # ============================================================================
@@ -183,6 +185,181 @@ class TestResilience:
         assert checker.verificados + checker.erros == 10
 
 
+# ============================================================================
+# Benchmark do Agendador contra Stub Local
+# ============================================================================
+
+@pytest.mark.integration
+@pytest.mark.benchmark
+@pytest.mark.slow
+@pytest.mark.asyncio
+class TestSchedulerBenchmark:
+    """Compara batch-and-gather com a janela deslizante em um stub local"""
+
+    async def test_window_beats_batch_with_stragglers(
+        self, stub_registro_br, tmp_path, performance_tracker, record_property
+    ):
+        """Um domínio lento por lote não deve segurar a janela deslizante"""
+        domains = [f"bench{i}.com.br" for i in range(200)]
+        # 1 em cada 20 domínios demora 200ms; os demais 5ms
+        stub_registro_br.latency = (
+            lambda d: 0.2 if int(d[5:].split(".")[0]) % 20 == 0 else 0.005
+        )
+
+        durations = {}
+        for scheduler in ("batch", "window"):
+            checker = DomainChecker(
+                setup_logging(), batch_size=20, batch_delay=0, scheduler=scheduler
+            )
+            checker.API_URL = stub_registro_br.base_url
+            with performance_tracker:
+                await checker.verify_domains(domains, str(tmp_path / f"{scheduler}.csv"))
+            durations[scheduler] = performance_tracker.duration
+            assert checker.verificados == len(domains)
+
+        for scheduler, duration in durations.items():
+            record_property(f"{scheduler}_seconds", round(duration, 3))
+        assert durations["window"] < durations["batch"], (
+            f"batch={durations['batch']:.2f}s window={durations['window']:.2f}s"
+        )
+
+
+@pytest.mark.integration
+@pytest.mark.slow
+@pytest.mark.asyncio
+class TestShardedScan:
+    """Verificação em vários processos contra o stub local"""
+
+    async def test_shards_merge_into_single_output(self, stub_registro_br, tmp_path):
+        """Cada domínio é consultado uma vez e a saída junta todos os shards"""
+        stub_registro_br.available = {"aba.com.br", "bbb.com.br", "cab.com.br"}
+        output = tmp_path / "disponiveis.csv"
+        args = build_parser().parse_args([
+            "--pattern", "custom:abc",
+            "--workers", "2",
+            "--batch-delay", "0",
+            "--api-url", stub_registro_br.base_url,
+            "--journal", str(tmp_path / "scan.journal"),
+        ])
+
+        loop = asyncio.get_event_loop()
+        merged = await loop.run_in_executor(
+            None, run_sharded, vars(args), [], 2, setup_logging(), 27, str(output)
+        )
+
+        assert merged.verificados == 27
+        assert merged.erros == 0
+        assert merged.disponiveis == len(stub_registro_br.available)
+        assert sorted(stub_registro_br.requests) == sorted(set(stub_registro_br.requests))
+        assert len(stub_registro_br.requests) == 27
+        rows = output.read_text(encoding="utf-8").splitlines()[1:]
+        assert sorted(row.split(",")[0] for row in rows) == sorted(stub_registro_br.available)
+        assert (tmp_path / "scan.journal.shard1of2").exists()
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+class TestCoordinator:
+    """Varredura distribuída com coordenador e workers na mesma máquina"""
+
+    async def test_workers_cover_keyspace_and_recover_dead_lease(
+        self, stub_registro_br, tmp_path
+    ):
+        """Dois workers concluem todas as faixas, inclusive a de um worker morto"""
+        stub_registro_br.available = {"aba.com.br", "ccc.com.br"}
+        queue = LeaseQueue(str(tmp_path / "coord.sqlite3"), lease_timeout=0.5)
+        queue.setup("custom:abc", range_size=5)
+        # Um worker que pegou uma faixa e morreu sem concluir
+        queue.lease("morto")
+
+        server = CoordinatorServer(queue, port=0)
+        url = await server.start()
+        try:
+            checkers = []
+            for _ in range(2):
+                checker = DomainChecker(setup_logging(), batch_size=5, batch_delay=0)
+                checker.API_URL = stub_registro_br.base_url
+                checkers.append(checker)
+
+            completed = await asyncio.gather(*(
+                run_worker(checker, url, f"w{i}", setup_logging(), poll_interval=0.1)
+                for i, checker in enumerate(checkers)
+            ))
+        finally:
+            await server.stop()
+
+        status = queue.status()
+        assert sum(completed) == 6
+        assert status["done"] == 6
+        assert status["reassigned"] == 1
+        assert status["registered"] + status["available"] == 27
+        assert sorted(queue.available()) == sorted(stub_registro_br.available)
+        queue.close()
+
+    async def test_lost_lease_interrupts_range(self, stub_registro_br, tmp_path):
+        """Renovação recusada interrompe a faixa sem enviar o parcial"""
+        stub_registro_br.latency = lambda domain: 0.05
+        queue = LeaseQueue(str(tmp_path / "coord.sqlite3"), lease_timeout=0.15)
+        queue.setup("custom:ab", range_size=8)
+        renew = queue.renew
+        refused = []
+
+        def renew_refused_once(range_id, worker):
+            if not refused:
+                refused.append(range_id)
+                return False
+            return renew(range_id, worker)
+
+        queue.renew = renew_refused_once
+
+        server = CoordinatorServer(queue, port=0)
+        url = await server.start()
+        try:
+            checker = DomainChecker(setup_logging(), batch_size=1, batch_delay=0)
+            checker.API_URL = stub_registro_br.base_url
+            completed = await run_worker(checker, url, "w1", setup_logging(), poll_interval=0.05)
+        finally:
+            await server.stop()
+
+        status = queue.status()
+        assert completed == 1
+        assert status["done"] == 1
+        assert status["reassigned"] == 1
+        # A primeira entrega parou na primeira renovação, bem antes dos 8 domínios
+        assert len(stub_registro_br.requests) < 12
+        assert status["registered"] == 8
+        queue.close()
+
+    async def test_errors_are_retried_by_next_lease(self, stub_registro_br, tmp_path):
+        """Domínios com erro voltam ao coordenador e só eles são repetidos"""
+        failed = set()
+
+        def status_for(domain):
+            if domain == "abb.com.br" and domain not in failed:
+                failed.add(domain)
+                return 500
+            return 200
+
+        stub_registro_br.status_for = status_for
+        queue = LeaseQueue(str(tmp_path / "coord.sqlite3"))
+        queue.setup("custom:ab", range_size=8)
+
+        server = CoordinatorServer(queue, port=0)
+        url = await server.start()
+        try:
+            checker = DomainChecker(setup_logging(), batch_size=4, batch_delay=0, max_retries=1)
+            checker.API_URL = stub_registro_br.base_url
+            await run_worker(checker, url, "w1", setup_logging(), poll_interval=0.05)
+        finally:
+            await server.stop()
+
+        status = queue.status()
+        assert status["done"] == 1
+        assert (status["registered"], status["error"]) == (8, 0)
+        assert len(stub_registro_br.requests) == 9
+        queue.close()
+
+
 # ============================================================================
 # Testes de Proxy (Mockados)
 # ============================================================================
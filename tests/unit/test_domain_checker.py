@@ -9,7 +9,14 @@ import pytest
 import asyncio
 from unittest.mock import Mock, AsyncMock, patch, MagicMock
 import aiohttp
+import gzip
+import io
+import itertools
+import json
+import logging
+import random
 import sys
+import time
 from pathlib import Path
 
 # Adiciona o diretório raiz ao path
@@ -18,10 +25,40 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 # Importa as funções a serem testadas
 from tools.domain_checker.domain_checker_advanced import (
     DomainChecker,
+    RetryQueue,
+    build_parser,
+    count_domains,
+    create_sinks,
     generate_domains,
+    load_domains,
     load_proxies,
+    prepare_status_map,
     setup_logging
 )
+from tools.domain_checker.adaptive import AdaptiveConcurrency
+from tools.domain_checker.avail_parser import READ_CHUNK, classify, read_status
+from tools.domain_checker.connection_pool import RoutePool
+from tools.domain_checker.coordinator import LeaseQueue
+from tools.domain_checker.hedging import HedgePolicy
+from tools.domain_checker.journal import ScanJournal
+from tools.domain_checker.keyspace import Keyspace, KeyspaceView, Slot, known_size, parse_mask
+from tools.domain_checker.log_pipeline import (
+    SAMPLED, CompressingRotatingFileHandler, SamplingFilter, stop_logging
+)
+from tools.domain_checker.metrics import Counter, Histogram, Metric, MetricsServer
+from tools.domain_checker.normalize import InvalidDomain, Normalizer, normalize_domain
+from tools.domain_checker.prefilter import BloomFilter, KnownRegistered, build_index
+from tools.domain_checker.progress import ProgressReporter, ProgressTracker, format_duration
+from tools.domain_checker.proxy_pool import ProxyPool
+from tools.domain_checker.rate_limiter import ProxyRateLimiter, TokenBucket
+from tools.domain_checker.result_cache import ResultCache
+from tools.domain_checker.sharding import shard_domains, shard_path
+from tools.domain_checker.sinks import (
+    BufferedFileSink, CheckResult, CsvSink, JsonlSink, ParquetSink, ResultSink, StdoutSink,
+    available_csv
+)
+from tools.domain_checker.scan_diff import diff_status_maps, main as diff_main
+from tools.domain_checker.status_map import AVAILABLE, ERROR, TAKEN, UNKNOWN, StatusMap
 
 
 # ============================================================================
@@ -69,6 +106,192 @@ class TestGenerateDomains:
         with pytest.raises(ValueError, match="Padrão desconhecido"):
             generate_domains("invalid_pattern")
 
+    def test_generate_lazy_matches_list(self):
+        """Testa que o modo lazy produz a mesma sequência da lista"""
+        keyspace = generate_domains("2letters", lazy=True)
+        assert isinstance(keyspace, Keyspace)
+        assert list(keyspace) == generate_domains("2letters")
+
+    def test_lazy_len_and_contains_without_enumerating(self):
+        """Testa len() e `in` em um keyspace grande sem gerá-lo"""
+        keyspace = Keyspace("abcdefghijklmnopqrstuvwxyz0123456789", 6)
+        assert len(keyspace) == 36 ** 6
+        assert "a1b2c3.com.br" in keyspace
+        assert "a1b2c.com.br" not in keyspace
+        assert "a1b2c!.com.br" not in keyspace
+        assert "a1b2c3.net.br" not in keyspace
+
+    def test_count_domains(self):
+        """Testa contagem sem geração"""
+        assert count_domains("4letters") == 26 ** 4
+        assert count_domains("custom:aab") == 2 ** 3
+
+    def test_mask_count_and_order(self):
+        """Testa máscara com classes, conjuntos e alternativas"""
+        keyspace = generate_domains("mask:{loja,shop}[a-c]?d", lazy=True)
+        assert len(keyspace) == 2 * 3 * 10
+        domains = list(keyspace)
+        assert len(domains) == len(keyspace)
+        assert domains[:2] == ["lojaa0.com.br", "lojaa1.com.br"]
+        assert domains[-1] == "shopc9.com.br"
+        assert "shopb7.com.br" in keyspace
+        assert "shopd7.com.br" not in keyspace
+        assert keyspace.mask() == "{loja,shop}[abc]?d.com.br"
+
+    def test_mask_multiple_suffixes(self):
+        """Testa categorias alternativas depois do ponto"""
+        keyspace = parse_mask("loja?l?l.{com,net,org}.br")
+        assert len(keyspace) == 3 * 26 ** 2
+        domains = list(keyspace)
+        assert domains[0] == "lojaaa.com.br"
+        assert domains[-1] == "lojazz.org.br"
+        assert "lojaxy.net.br" in keyspace
+        assert "lojaxy.edu.br" not in keyspace
+
+    def test_mask_wordlist(self, tmp_path):
+        """Testa lista de palavras mapeada do arquivo"""
+        words = tmp_path / "palavras.txt"
+        words.write_text("casa\nbola\n\n" + "x" * 30 + "\n")
+        keyspace = parse_mask(f"<{words}>?d")
+        assert len(keyspace) == 2 * 10  # vazia e longa demais são ignoradas
+        assert list(keyspace)[:2] == ["casa0.com.br", "casa1.com.br"]
+        assert "bola9.com.br" in keyspace
+        assert "pato9.com.br" not in keyspace
+
+    @pytest.mark.parametrize("mask,message", [
+        ("-?l?l", "hífen"),
+        ("?l?l?h", "hífen"),
+        ("?l?h?h?l", "hífen"),
+        ("?l", "2 a 26"),
+        ("?l" * 27, "2 a 26"),
+        ("?x?l", "Classe desconhecida"),
+        ("[a-?l", "sem ']'"),
+        ("?l?l.net", "Categoria inválida"),
+        ("?a" * 13, "acima do limite"),
+        ("?a" * 12 + ".{com,net}.br", "acima do limite"),
+        ("xn--?l", "3ª e 4ª"),
+        ("?l?l--?l", "3ª e 4ª"),
+        ("{a,ab}--?l", "3ª e 4ª"),
+        ("{a,ab}{bc,c}", "mais de uma vez"),
+        ("{ab,abc}?l{cd,d}", "mais de uma vez"),
+    ])
+    def test_mask_invalid(self, mask, message):
+        """Testa que máscaras inválidas são recusadas antes da varredura"""
+        with pytest.raises(ValueError, match=message):
+            parse_mask(mask)
+
+    def test_mask_variable_pieces_without_repeats(self, tmp_path):
+        """Trechos de tamanhos variados são aceitos quando os nomes não se repetem"""
+        for mask in ("{meu,minha}?l?l", "{a,ab}{c,d}", "a--bc"):
+            names = list(parse_mask(mask))
+            assert len(names) == len(set(names)) == len(parse_mask(mask))
+
+        # '--' fora da 3ª e 4ª posições é permitido; na lista, só se não cair lá
+        words = tmp_path / "palavras.txt"
+        words.write_text("casa\nx--y\n")
+        assert len(parse_mask(f"<{words}>?d")) == 20
+        with pytest.raises(ValueError, match="3ª e 4ª"):
+            parse_mask(f"?l<{words}>")
+
+    def test_slot_is_abstract(self):
+        """Testa que um Slot sem os métodos de acesso não pode ser criado"""
+        class Incomplete(Slot):
+            def __len__(self):
+                return 1
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+    def test_mask_len_without_enumerating(self):
+        """Testa len() de uma máscara enorme sem gerar os nomes"""
+        keyspace = generate_domains("mask:" + "?a" * 12, lazy=True)
+        assert len(keyspace) == 36 ** 12
+        assert count_domains("mask:?a?a?a?a?a?a?a?a?a?a") == 36 ** 10
+
+    def test_size_beyond_len_limit(self):
+        """Testa contagens acima de sys.maxsize, onde len() levanta OverflowError"""
+        keyspace = Keyspace("abcdefghijklmnopqrstuvwxyz0123456789", 13)
+        with pytest.raises(OverflowError):
+            len(keyspace)
+        assert known_size(keyspace) == 36 ** 13
+        assert known_size(keyspace[::2]) == -(-36 ** 13 // 2)
+        assert known_size(["a.com.br"]) == 1
+        assert known_size(iter(["a.com.br"])) is None
+        # parse_mask recusa com uma mensagem, em vez de estourar depois
+        with pytest.raises(ValueError, match="acima do limite"):
+            count_domains("mask:" + "?a" * 13)
+
+    @pytest.mark.parametrize("pattern", ["2letters", "custom:abc", "mask:{loja,shop}?l?d.{com,net}.br"])
+    def test_index_roundtrip(self, pattern):
+        """Testa que keyspace[i] segue a ordem de iteração e index() é o inverso"""
+        keyspace = generate_domains(pattern, lazy=True)
+        domains = list(keyspace)
+        assert [keyspace[i] for i in range(len(domains))] == domains
+        assert [keyspace.index(d) for d in domains] == list(range(len(domains)))
+        assert keyspace[-1] == domains[-1]
+        with pytest.raises(IndexError):
+            keyspace[len(domains)]
+        with pytest.raises(ValueError):
+            keyspace.index("fora.org.br")
+
+    @pytest.mark.parametrize("window", [slice(10, 500), slice(3, None, 7), slice(0, None, 1000), slice(5, 5)])
+    def test_slices_match_list(self, window):
+        """Testa faixas [início, fim) e passos contra a lista"""
+        keyspace = generate_domains("mask:?l?l?d", lazy=True)
+        domains = list(keyspace)
+        view = keyspace[window]
+        assert isinstance(view, KeyspaceView)
+        assert list(view) == domains[window]
+        assert len(view) == len(domains[window])
+        assert list(view[1:4]) == domains[window][1:4]
+        for position, domain in enumerate(domains[window][:20]):
+            assert view.index(domain) == position
+        outside = [d for d in domains if d not in set(domains[window])][:5]
+        assert not any(d in view for d in outside)
+
+    def test_shuffled_is_deterministic_permutation(self):
+        """Testa que o embaralhamento cobre tudo uma vez e depende só da semente"""
+        keyspace = generate_domains("3letters", lazy=True)
+        shuffled = list(keyspace.shuffled(42))
+        assert shuffled == list(keyspace.shuffled(42))
+        assert shuffled != list(keyspace.shuffled(7))
+        assert shuffled[:10] != list(keyspace)[:10]
+        assert sorted(shuffled) == list(keyspace)
+        view = keyspace.shuffled(42)
+        assert view[123] == shuffled[123]
+        assert view.index(shuffled[999]) == 999
+        assert list(view[5::4]) == shuffled[5::4]
+
+    @pytest.mark.parametrize("numpy", [True, False])
+    @pytest.mark.parametrize("pattern", [
+        "3letters", "mask:loja?d.{com,net}.br", "mask:{a,ab}?l", "mask:?l?l.{com,blog}.br"
+    ])
+    def test_chunks_match_iteration(self, pattern, numpy):
+        """Testa que os blocos (com e sem NumPy) seguem a ordem de keyspace[i]"""
+        if numpy:
+            pytest.importorskip("numpy")
+        keyspace = generate_domains(pattern, lazy=True)
+        if not numpy:
+            keyspace._tables = False
+        expected = [keyspace[i] for i in range(len(keyspace))]
+        chunks = list(keyspace.chunks(1000))
+        assert all(len(chunk) == 1000 for chunk in chunks[:-1])
+        assert [d for chunk in chunks for d in chunk] == expected
+        assert list(keyspace) == expected
+        assert list(keyspace[7::13]) == expected[7::13]
+        shuffled = keyspace.shuffled(9)
+        assert [d for chunk in shuffled.chunks(777) for d in chunk] == [shuffled[i] for i in range(len(shuffled))]
+
+    def test_random_access_without_enumerating(self):
+        """Testa acesso e faixas no meio de um keyspace enorme (acima do limite de parse_mask)"""
+        keyspace = Keyspace("abcdefghijklmnopqrstuvwxyz0123456789", 20)
+        middle = 36 ** 19
+        domain = keyspace[middle]
+        assert domain == "b" + "a" * 19 + ".com.br"
+        assert keyspace.index(domain) == middle
+        assert list(keyspace[middle:middle + 2]) == [domain, "b" + "a" * 18 + "b.com.br"]
+        assert keyspace[middle:].size == keyspace.size - middle
+
 
 # ============================================================================
 # Testes de Carregamento de Proxies
@@ -131,9 +354,85 @@ class TestLogging:
         logger = setup_logging(str(log_file))
 
         assert logger.name == 'domain_checker'
-        assert len(logger.handlers) >= 2
+        assert len(logger.handlers) >= 1
         assert log_file.exists()
 
+        logger.info("✅ %s DISPONÍVEL", "abc.com.br")
+        stop_logging(logger)
+        assert "✅ abc.com.br DISPONÍVEL" in log_file.read_text(encoding="utf-8")
+
+    def test_queue_defers_formatting_to_listener(self, tmp_path):
+        """O registro entra na fila sem formatar; a thread do listener formata e grava"""
+        log_file = tmp_path / "test.log"
+        logger = setup_logging(str(log_file))
+        queue_handler = logger.handlers[-1]
+        queued = []
+        enqueue = queue_handler.enqueue
+
+        def capture(record):
+            queued.append((record.msg, record.args, hasattr(record, "message")))
+            enqueue(record)
+
+        queue_handler.enqueue = capture
+        logger.warning("⏱️ %s - Timeout", "abc.com.br")
+        stop_logging(logger)
+
+        assert queued == [("⏱️ %s - Timeout", ("abc.com.br",), False)]
+        assert "⏱️ abc.com.br - Timeout" in log_file.read_text(encoding="utf-8")
+
+    def test_sampling_filter_limits_per_domain_lines(self):
+        """Linhas SAMPLED respeitam a taxa; erros e linhas comuns sempre passam"""
+        now = [0.0]
+        sampler = SamplingFilter(rate=2, clock=lambda: now[0])
+
+        def record(level=logging.WARNING, sampled=True):
+            rec = logging.LogRecord("x", level, __file__, 1, "⚠️ %s", ("d",), None)
+            if sampled:
+                rec.__dict__.update(SAMPLED)
+            return rec
+
+        assert [sampler.filter(record()) for _ in range(5)] == [True, True, False, False, False]
+        assert sampler.filter(record(level=logging.ERROR))
+        assert sampler.filter(record(sampled=False))
+
+        now[0] += 1
+        passed = record()
+        assert sampler.filter(passed)
+        assert "(+3 linhas omitidas pela amostragem)" in passed.getMessage()
+        assert sampler.dropped_total == 3
+
+    def test_sync_mode_samples_once_and_replaces_handlers(self, tmp_path):
+        """Sem fila, cada linha consome uma ficha só e setup_logging repetido não duplica"""
+        log_file = tmp_path / "test.log"
+        for _ in range(2):
+            logger = setup_logging(str(log_file), sample_rate=1, use_queue=False)
+        assert len(logger.handlers) == 2
+        assert len(logger.filters) == 1
+
+        logger.warning("⏱️ %s - Timeout", "a.com.br", extra=SAMPLED)
+        logger.warning("⏱️ %s - Timeout", "b.com.br", extra=SAMPLED)
+        stop_logging(logger)
+
+        assert logger.handlers == [] and logger.filters == []
+        text = log_file.read_text(encoding="utf-8")
+        assert text.count("a.com.br - Timeout") == 1
+        assert "b.com.br" not in text
+        assert "1 linhas por domínio omitidas" in text
+
+    def test_rotation_compresses_old_logs(self, tmp_path):
+        """Ao passar de max_bytes o log é rotacionado para .1.gz"""
+        path = tmp_path / "run.log"
+        handler = CompressingRotatingFileHandler(str(path), max_bytes=200, backup_count=2)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        for i in range(60):
+            handler.emit(logging.LogRecord("x", logging.INFO, __file__, 1, f"linha {i:03d}", None, None))
+        handler.close()
+
+        rotated = sorted(p.name for p in tmp_path.iterdir())
+        assert rotated == ["run.log", "run.log.1.gz", "run.log.2.gz"]
+        with gzip.open(tmp_path / "run.log.1.gz", "rt", encoding="utf-8") as f:
+            assert f.read().startswith("linha")
+
 
 # ============================================================================
 # Testes da Classe DomainChecker
@@ -156,7 +455,7 @@ class TestDomainCheckerInit:
         assert checker.max_retries == 3
         assert checker.verificados == 0
         assert checker.erros == 0
-        assert len(checker.disponiveis) == 0
+        assert checker.disponiveis == 0
 
     def test_init_custom_values(self):
         """Testa inicialização com valores customizados"""
@@ -276,6 +575,1615 @@ class TestCheckDomain:
         assert checker.erros == 1
 
 
+# ============================================================================
+# Testes do Agendador (janela deslizante)
+# ============================================================================
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestScheduler:
+    """Testes dos modos de agendamento de verify_domains"""
+
+    def test_invalid_scheduler(self):
+        """Testa que scheduler desconhecido levanta erro"""
+        with pytest.raises(ValueError, match="Scheduler desconhecido"):
+            DomainChecker(Mock(), scheduler="invalid")
+
+    @pytest.mark.parametrize("scheduler", ["window", "batch"])
+    async def test_verify_domains_modes(self, stub_registro_br, tmp_path, scheduler):
+        """Testa que ambos os modos verificam todos os domínios"""
+        domains = [f"d{i}.com.br" for i in range(25)]
+        stub_registro_br.available = {"d3.com.br", "d17.com.br"}
+
+        checker = DomainChecker(Mock(), batch_size=4, batch_delay=0, scheduler=scheduler)
+        checker.API_URL = stub_registro_br.base_url
+        output = tmp_path / "out.csv"
+        await checker.verify_domains(domains, str(output))
+
+        assert checker.verificados == 25
+        assert checker.disponiveis == 2
+        rows = output.read_text(encoding="utf-8").splitlines()
+        assert sorted(row.split(",")[0] for row in rows[1:]) == ["d17.com.br", "d3.com.br"]
+        assert sorted(stub_registro_br.requests) == sorted(domains)
+
+    @pytest.mark.parametrize("scheduler", ["window", "batch"])
+    async def test_verify_domains_consumes_iterator(self, stub_registro_br, tmp_path, scheduler):
+        """Testa que verify_domains aceita um gerador sem len()"""
+        domains = (f"g{i}.com.br" for i in range(7))
+
+        checker = DomainChecker(Mock(), batch_size=3, batch_delay=0, scheduler=scheduler)
+        checker.API_URL = stub_registro_br.base_url
+        await checker.verify_domains(domains, str(tmp_path / "out.csv"))
+
+        assert checker.verificados == 7
+
+    async def test_verify_domains_counts_huge_keyspace(self, stub_registro_br):
+        """Testa que um keyspace acima de sys.maxsize não estoura len() ao começar"""
+        keyspace = Keyspace("abcdefghijklmnopqrstuvwxyz0123456789", 13)
+        checker = DomainChecker(Mock(), batch_size=2, batch_delay=0)
+        checker.API_URL = stub_registro_br.base_url
+
+        scan = asyncio.ensure_future(checker.verify_domains(keyspace, None))
+        while not stub_registro_br.requests and not scan.done():
+            await asyncio.sleep(0.01)
+        scan.cancel()
+        await asyncio.gather(scan, return_exceptions=True)
+
+        assert checker.progress.total == 36 ** 13
+
+    @pytest.mark.parametrize("scheduler", ["window", "batch"])
+    async def test_verify_domains_takes_keyspace_in_chunks(self, stub_registro_br, monkeypatch, scheduler):
+        """Testa que o keyspace chega aos schedulers pelos blocos de chunks(), não nome a nome"""
+        keyspace = generate_domains("custom:ab", lazy=True)
+        expected = list(keyspace)
+        monkeypatch.setattr(Keyspace, "__iter__", lambda self: pytest.fail("keyspace iterado nome a nome"))
+
+        checker = DomainChecker(Mock(), batch_size=3, batch_delay=0, scheduler=scheduler)
+        checker.API_URL = stub_registro_br.base_url
+        await checker.verify_domains(keyspace, None)
+
+        assert sorted(stub_registro_br.requests) == sorted(expected)
+        assert checker.verificados == 8
+
+
+
+# ============================================================================
+# Testes da Fila de Novas Tentativas
+# ============================================================================
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestRetryQueue:
+    """Testes para RetryQueue e o backoff fora do semáforo"""
+
+    def test_pop_due_orders_by_due_time(self):
+        """Testa que tentativas saem em ordem de vencimento"""
+        queue = RetryQueue()
+        queue.push("late.com.br", 1, 0.0)
+        queue.push("later.com.br", 1, 60.0)
+        queue.push("early.com.br", 2, -1.0)
+
+        assert queue.pop_due() == [("early.com.br", 2), ("late.com.br", 1)]
+        assert len(queue) == 1
+        assert queue.time_until_due() > 0
+
+    def test_retry_delay_jitter_bounds(self):
+        """Testa que o backoff fica entre metade e o total de 2 ** attempt"""
+        checker = DomainChecker(Mock())
+        for attempt in range(4):
+            delay = checker.retry_delay(attempt)
+            assert 2 ** attempt / 2 <= delay <= 2 ** attempt
+
+    async def test_backoff_releases_semaphore(self, mock_aio_session):
+        """Testa que o slot fica livre durante o backoff de check_domain"""
+        checker = DomainChecker(Mock(), max_retries=2)
+        checker.retry_delay = lambda attempt: 0.2
+        mock_aio_session.get = AsyncMock(side_effect=asyncio.TimeoutError)
+
+        semaphore = asyncio.Semaphore(1)
+        task = asyncio.ensure_future(
+            checker.check_domain(mock_aio_session, "test.com.br", semaphore)
+        )
+        await asyncio.sleep(0.05)
+        assert not semaphore.locked()
+
+        assert await task is None
+        assert checker.erros == 1
+        assert checker.retentativas == 1
+
+    async def test_window_retries_count_toward_limits(self, stub_registro_br, tmp_path):
+        """Testa que falhas voltam pela fila e esgotam max_retries"""
+        attempts = {}
+
+        def status_for(domain):
+            attempts[domain] = attempts.get(domain, 0) + 1
+            if domain == "dead.com.br":
+                return 503
+            if domain == "flaky.com.br" and attempts[domain] == 1:
+                return 500
+            return 200
+
+        stub_registro_br.status_for = status_for
+        stub_registro_br.available = {"flaky.com.br"}
+
+        checker = DomainChecker(Mock(), batch_size=2, batch_delay=0, max_retries=3)
+        checker.API_URL = stub_registro_br.base_url
+        checker.retry_delay = lambda attempt: 0.01
+        domains = ["flaky.com.br", "dead.com.br", "ok.com.br"]
+        await checker.verify_domains(domains, str(tmp_path / "out.csv"))
+
+        assert checker.disponiveis == 1
+        assert "flaky.com.br" in (tmp_path / "out.csv").read_text(encoding="utf-8")
+        assert attempts["dead.com.br"] == 3
+        assert attempts["flaky.com.br"] == 2
+        assert checker.erros == 1
+        assert checker.retentativas == 3
+        assert checker.verificados == 2
+
+
+# ============================================================================
+# Testes do Journal de Checkpoint
+# ============================================================================
+
+@pytest.mark.unit
+class TestScanJournal:
+    """Testes para ScanJournal e a retomada de verificações"""
+
+    def test_record_and_resume(self, tmp_path):
+        """Testa que domínios resolvidos são recarregados e erros não"""
+        path = tmp_path / "scan.journal"
+        with ScanJournal(str(path)) as journal:
+            journal.record("aaa.com.br", "available")
+            journal.record("aab.com.br", "taken")
+            journal.record("aac.com.br", "error")
+
+        journal = ScanJournal(str(path), resume=True)
+        assert len(journal) == 2
+        assert "aaa.com.br" in journal
+        assert "aab.com.br" in journal
+        assert "aac.com.br" not in journal
+        assert list(journal.available()) == ["aaa.com.br"]
+        assert journal.counts == {"available": 1, "taken": 1}
+        assert list(journal.entries()) == [("aaa.com.br", "available"), ("aab.com.br", "taken")]
+        journal.close()
+
+    def test_truncated_tail_is_discarded(self, tmp_path):
+        """Testa que uma linha incompleta (crash) é descartada e truncada"""
+        path = tmp_path / "scan.journal"
+        path.write_text("aaa.com.br\ttaken\naab.com.br\tavai")
+
+        with ScanJournal(str(path), resume=True) as journal:
+            assert len(journal) == 1
+            journal.record("aab.com.br", "available")
+
+        assert path.read_text() == "aaa.com.br\ttaken\naab.com.br\tavailable\n"
+
+    def test_fsync_runs_off_the_calling_thread(self, tmp_path, monkeypatch):
+        """Testa que gravação e fsync dos lotes rodam na thread do journal"""
+        import threading
+        from tools.domain_checker import journal as journal_module
+
+        threads = []
+        real_fsync = journal_module.os.fsync
+
+        def fsync(fd):
+            threads.append(threading.current_thread())
+            real_fsync(fd)
+
+        monkeypatch.setattr(journal_module.os, "fsync", fsync)
+        path = tmp_path / "scan.journal"
+        with ScanJournal(str(path), sync_every=2) as journal:
+            journal.record("aaa.com.br", "taken")
+            journal.record("aab.com.br", "available")
+            journal.flush(force=True)
+            assert path.read_text() == "aaa.com.br\ttaken\naab.com.br\tavailable\n"
+
+        assert threads
+        assert threading.current_thread() not in threads
+
+    def test_without_resume_starts_fresh(self, tmp_path):
+        """Testa que sem resume o journal é recriado"""
+        path = tmp_path / "scan.journal"
+        path.write_text("aaa.com.br\ttaken\n")
+
+        with ScanJournal(str(path)) as journal:
+            assert len(journal) == 0
+        assert path.read_text() == ""
+
+    @pytest.mark.asyncio
+    async def test_verify_domains_skips_resolved(self, stub_registro_br, tmp_path):
+        """Testa que a retomada não consulta domínios já resolvidos"""
+        path = tmp_path / "scan.journal"
+        path.write_text("d0.com.br\tavailable\nd1.com.br\ttaken\nd2.com.br\terror\n")
+        domains = [f"d{i}.com.br" for i in range(5)]
+
+        with ScanJournal(str(path), resume=True) as journal:
+            checker = DomainChecker(Mock(), batch_size=2, batch_delay=0, journal=journal)
+            checker.API_URL = stub_registro_br.base_url
+            await checker.verify_domains(domains, str(tmp_path / "out.csv"))
+
+        assert sorted(stub_registro_br.requests) == ["d2.com.br", "d3.com.br", "d4.com.br"]
+        assert checker.verificados == 5
+        assert checker.disponiveis == 1
+        # O disponível retomado do journal também vai para a saída
+        assert "d0.com.br" in (tmp_path / "out.csv").read_text(encoding="utf-8")
+
+        with ScanJournal(str(path), resume=True) as journal:
+            assert len(journal) == 5
+
+
+# ============================================================================
+# Testes do Cache de Resultados
+# ============================================================================
+
+@pytest.mark.unit
+class TestResultCache:
+    """Testes para ResultCache"""
+
+    def test_put_get_and_hit_counters(self, tmp_path):
+        """Testa armazenamento e contadores de hit/miss"""
+        with ResultCache(str(tmp_path / "cache.db")) as cache:
+            cache.put("aaa.com.br", "taken")
+            assert cache.get("aaa.com.br") == "taken"
+            assert cache.get("bbb.com.br") is None
+            assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_ttl_per_status(self, tmp_path):
+        """Testa que cada status expira com seu próprio TTL"""
+        with ResultCache(str(tmp_path / "cache.db"), ttl_available=-1, ttl_error=0) as cache:
+            cache.put("free.com.br", "available")
+            cache.put("err.com.br", "error")
+            cache.put("taken.com.br", "taken")
+
+            assert cache.get("free.com.br") is None
+            assert cache.get("err.com.br") is None
+            assert cache.get("taken.com.br") == "taken"
+
+    def test_persists_between_instances(self, tmp_path):
+        """Testa que o cache sobrevive ao fechamento"""
+        path = str(tmp_path / "cache.db")
+        with ResultCache(path) as cache:
+            cache.put("aaa.com.br", "available")
+        with ResultCache(path) as cache:
+            assert cache.get("aaa.com.br") == "available"
+
+    def test_eviction_keeps_newest(self, tmp_path):
+        """Testa a remoção das entradas mais antigas ao passar do limite"""
+        with ResultCache(str(tmp_path / "cache.db"), max_entries=10) as cache:
+            for i in range(25):
+                cache.put(f"d{i}.com.br", "taken")
+            cache.evict()
+
+            assert len(cache) == 10
+            assert cache.get("d24.com.br") == "taken"
+            assert cache.get("d0.com.br") is None
+
+    @pytest.mark.asyncio
+    async def test_checker_cache_hits_skip_network(self, stub_registro_br, tmp_path):
+        """Testa que acertos no cache não fazem requisição"""
+        stub_registro_br.available = {"d1.com.br"}
+        domains = [f"d{i}.com.br" for i in range(4)]
+
+        with ResultCache(str(tmp_path / "cache.db")) as cache:
+            for _ in range(2):
+                checker = DomainChecker(Mock(), batch_size=2, batch_delay=0, cache=cache)
+                checker.API_URL = stub_registro_br.base_url
+                await checker.verify_domains(domains, str(tmp_path / "out.csv"))
+
+                assert checker.verificados == 4
+                assert checker.disponiveis == 1
+                assert "d1.com.br" in (tmp_path / "out.csv").read_text(encoding="utf-8")
+
+            assert len(stub_registro_br.requests) == 4
+            assert cache.hits == 4
+
+    @pytest.mark.asyncio
+    async def test_checker_does_not_cache_errors(self, stub_registro_br, tmp_path):
+        """Testa que erros não entram no cache e voltam a ser consultados"""
+        stub_registro_br.status_for = lambda d: 500 if d == "d0.com.br" else 200
+        domains = ["d0.com.br", "d1.com.br"]
+
+        with ResultCache(str(tmp_path / "cache.db"), ttl_error=300) as cache:
+            cache.put("d0.com.br", "error")  # de uma versão antiga
+            checker = DomainChecker(Mock(), batch_size=2, batch_delay=0, max_retries=1, cache=cache)
+            checker.API_URL = stub_registro_br.base_url
+            await checker.verify_domains(domains, None)
+
+            assert sorted(stub_registro_br.requests) == domains
+            assert checker.erros == 1
+            assert cache.get("d0.com.br") == "error"
+            assert cache.get("d1.com.br") == "registered"
+
+    @pytest.mark.asyncio
+    async def test_lookup_and_store_batch_off_the_loop(self, tmp_path):
+        """Testa consulta em lote e gravação agrupada na thread do cache"""
+        with ResultCache(str(tmp_path / "cache.db"), write_batch=1000) as cache:
+            for i in range(600):
+                cache.store(f"d{i}.com.br", "taken")
+            assert len(cache) == 0  # ainda no buffer
+
+            cache.flush()
+            found = await cache.lookup([f"d{i}.com.br" for i in range(0, 1200, 2)])
+            assert len(found) == 300
+            assert (cache.hits, cache.misses) == (300, 300)
+
+    def test_cli_cache_is_opt_in(self):
+        """Testa que o cache só é usado com --cache"""
+        assert build_parser().parse_args([]).cache is False
+        assert build_parser().parse_args(["--cache"]).cache is True
+
+
+# ============================================================================
+# Testes da Concorrência Adaptativa (AIMD)
+# ============================================================================
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestAdaptiveConcurrency:
+    """Testes para AdaptiveConcurrency"""
+
+    def test_additive_increase(self):
+        """Testa que respostas saudáveis aumentam o limite ~1 por rodada"""
+        limiter = AdaptiveConcurrency(initial=10, max_limit=100)
+        for _ in range(10):
+            limiter.on_success(0.05)
+        assert limiter.current_limit == 10
+        assert 10.9 < limiter.limit < 11.0
+
+    def test_multiplicative_decrease_and_bounds(self):
+        """Testa redução pela metade, respeitando o mínimo"""
+        limiter = AdaptiveConcurrency(initial=40, min_limit=8)
+        limiter.on_failure()
+        assert limiter.current_limit == 20
+        limiter._last_decrease = 0.0
+        limiter.on_failure()
+        limiter._last_decrease = 0.0
+        limiter.on_failure()
+        assert limiter.current_limit == 8
+
+    def test_latency_spike_counts_as_failure(self):
+        """Testa que um pico de latência reduz o limite"""
+        limiter = AdaptiveConcurrency(initial=20)
+        for _ in range(5):
+            limiter.on_success(0.01)
+        limiter.on_success(1.0)
+        assert limiter.current_limit == 10
+        assert limiter.decreases == 1
+
+    def test_one_decrease_per_round(self):
+        """Testa que uma rajada de falhas reduz o limite uma vez só"""
+        limiter = AdaptiveConcurrency(initial=32)
+        limiter.on_success(10.0)
+        for _ in range(5):
+            limiter.on_failure()
+        assert limiter.decreases == 1
+
+    async def test_caps_in_flight(self):
+        """Testa que nunca há mais requisições em voo que o limite"""
+        limiter = AdaptiveConcurrency(initial=3, max_limit=3)
+        peak = 0
+
+        async def job():
+            nonlocal peak
+            async with limiter:
+                peak = max(peak, limiter.in_flight)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(job() for _ in range(20)))
+        assert peak == 3
+        assert limiter.in_flight == 0
+
+    async def test_adaptive_backs_off_under_throttling(self, stub_registro_br, tmp_path):
+        """Testa que o verificador converge abaixo do limite de throttling do stub"""
+        stub_registro_br.latency = lambda domain: 0.01
+        stub_registro_br.throttle_above = 8
+        checker = DomainChecker(
+            Mock(), batch_size=4, batch_delay=0, adaptive=True, max_concurrency=64
+        )
+        checker.API_URL = stub_registro_br.base_url
+        checker.retry_delay = lambda attempt: 0.01
+        checker.max_retries = 10
+        await checker.verify_domains([f"d{i}.com.br" for i in range(300)], str(tmp_path / "o.csv"))
+
+        assert checker.verificados == 300
+        assert checker.limiter.decreases > 0
+        assert checker.limiter.current_limit < 64
+
+    def test_adaptive_requires_window(self):
+        """Testa que o modo adaptativo exige o scheduler window"""
+        with pytest.raises(ValueError, match="adaptativo"):
+            DomainChecker(Mock(), scheduler="batch", adaptive=True)
+
+
+# ============================================================================
+# Testes do Limitador de Taxa (Token Bucket)
+# ============================================================================
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestTokenBucket:
+    """Testes para TokenBucket e ProxyRateLimiter"""
+
+    async def test_burst_then_steady_rate(self):
+        """Testa que a rajada sai na hora e o resto segue a taxa"""
+        bucket = TokenBucket(rate=50, burst=5)
+        start = time.monotonic()
+        for _ in range(5):
+            await bucket.acquire()
+        assert time.monotonic() - start < 0.02
+
+        for _ in range(5):
+            await bucket.acquire()
+        assert time.monotonic() - start >= 0.09
+
+    async def test_concurrent_acquires_are_spaced(self):
+        """Testa que reservas concorrentes não furam a taxa"""
+        bucket = TokenBucket(rate=100, burst=1)
+        start = time.monotonic()
+        await asyncio.gather(*(bucket.acquire() for _ in range(11)))
+        assert time.monotonic() - start >= 0.09
+
+    async def test_cancelled_wait_refunds_reservation(self):
+        """Testa que uma espera cancelada devolve o token reservado"""
+        bucket = TokenBucket(rate=10, burst=1)
+        await bucket.acquire()
+        waiter = asyncio.ensure_future(bucket.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert 0 < bucket.time_until_available() <= 0.1
+
+    async def test_proxy_wait_does_not_hold_a_slot(self):
+        """Testa que a espera pelo limite do proxy acontece fora do semáforo"""
+        checker = DomainChecker(Mock(), per_proxy_rps=1)
+        await checker.proxy_rate_limiter.acquire(None)
+        semaphore = asyncio.Semaphore(1)
+
+        task = asyncio.ensure_future(checker.check_domain(Mock(), "d0.com.br", semaphore))
+        await asyncio.sleep(0.05)
+        assert not task.done()
+        assert not semaphore.locked()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    def test_invalid_rate(self):
+        """Testa que taxa não positiva levanta erro"""
+        with pytest.raises(ValueError, match="Taxa inválida"):
+            TokenBucket(0)
+
+    def test_per_proxy_buckets_are_independent(self):
+        """Testa que cada proxy tem seu próprio balde"""
+        limiter = ProxyRateLimiter(rate=1, burst=1)
+        assert limiter.bucket("http://p1:8080") is limiter.bucket("http://p1:8080")
+        assert limiter.bucket("http://p1:8080") is not limiter.bucket("http://p2:8080")
+
+    async def test_checker_respects_max_rps(self, stub_registro_br, tmp_path):
+        """Testa que max_rps limita a taxa do verificador"""
+        checker = DomainChecker(Mock(), batch_size=20, max_rps=100, burst=1)
+        checker.API_URL = stub_registro_br.base_url
+
+        start = time.monotonic()
+        await checker.verify_domains([f"d{i}.com.br" for i in range(21)], str(tmp_path / "o.csv"))
+        assert time.monotonic() - start >= 0.19
+        assert checker.verificados == 21
+
+
+# ============================================================================
+# Testes do Pool de Proxies
+# ============================================================================
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestProxyPool:
+    """Testes para ProxyPool"""
+
+    def test_prefers_fast_healthy_proxies(self):
+        """Testa que a escolha favorece proxies rápidos"""
+        pool = ProxyPool(["http://fast:1", "http://slow:1"], rng=random.Random(1))
+        for _ in range(10):
+            pool.record_success("http://fast:1", 0.05)
+            pool.record_success("http://slow:1", 2.0)
+
+        picks = [pool.choose() for _ in range(500)]
+        assert picks.count("http://fast:1") > 400
+
+    def test_ejects_after_consecutive_failures(self):
+        """Testa que o circuito abre após falhas seguidas"""
+        pool = ProxyPool(["http://a:1", "http://b:1"], failure_threshold=3)
+        for _ in range(2):
+            pool.record_failure("http://a:1")
+        pool.record_success("http://a:1", 0.1)
+        for _ in range(3):
+            pool.record_failure("http://a:1")
+
+        assert pool.stats["http://a:1"].state == "open"
+        assert {pool.choose() for _ in range(50)} == {"http://b:1"}
+
+    def test_all_ejected_never_goes_direct(self):
+        """Testa que sem proxies saudáveis o pool não retorna None"""
+        pool = ProxyPool(["http://a:1"], failure_threshold=1)
+        pool.record_failure("http://a:1")
+        assert pool.choose() == "http://a:1"
+
+    async def test_probe_readmits_recovered_proxy(self):
+        """Testa que a sonda readmite proxies recuperados"""
+        pool = ProxyPool(["http://a:1", "http://b:1"], failure_threshold=1, cooldown=0)
+        pool.record_failure("http://a:1")
+        pool.record_failure("http://b:1")
+
+        async def check(proxy):
+            return proxy == "http://a:1"
+
+        await pool.probe(check)
+        assert pool.stats["http://a:1"].state == "closed"
+        assert pool.stats["http://b:1"].state == "open"
+
+    async def test_checker_ejects_dead_proxy(self, stub_registro_br, tmp_path):
+        """Testa que o verificador isola um proxy morto e reporta estatísticas"""
+        good = stub_registro_br.base_url.split("/v2/")[0]
+        dead = "http://127.0.0.1:1"
+        class LastHealthy(random.Random):
+            """Sorteio determinístico: o último proxy saudável (o morto, até a ejeção)"""
+
+            def choices(self, population, weights=None, **kwargs):
+                return [population[-1]]
+
+        checker = DomainChecker(
+            Mock(), proxies=[good, dead], batch_size=4, batch_delay=0,
+            proxy_failure_threshold=2, proxy_cooldown=60
+        )
+        checker.proxy_pool.rng = LastHealthy()
+        checker.API_URL = stub_registro_br.base_url
+        checker.retry_delay = lambda attempt: 0.0
+        await checker.verify_domains([f"d{i}.com.br" for i in range(40)], str(tmp_path / "o.csv"))
+
+        assert checker.verificados == 40
+        assert checker.proxy_pool.stats[dead].state == "open"
+        assert checker.proxy_pool.stats[good].successes == 40
+        assert len(checker.proxy_pool.report()) == 2
+
+
+# ============================================================================
+# Testes do Pool de Conexões por Rota
+# ============================================================================
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestRoutePool:
+    """Testes para RoutePool"""
+
+    async def test_one_session_per_route(self):
+        """Testa que cada proxy ganha sua própria sessão"""
+        async with RoutePool() as routes:
+            direct = routes.session(None)
+            assert routes.session(None) is direct
+            assert routes.session("http://p1:8080") is not direct
+            assert set(routes.stats) == {None, "http://p1:8080"}
+
+    async def test_checker_reuses_connections(self, stub_registro_br, tmp_path):
+        """Testa que o verificador reaproveita conexões keep-alive"""
+        checker = DomainChecker(Mock(), batch_size=5, batch_delay=0)
+        checker.API_URL = stub_registro_br.base_url
+        await checker.verify_domains([f"d{i}.com.br" for i in range(60)], str(tmp_path / "o.csv"))
+
+        stats = checker.connection_stats
+        assert stats.new_connections <= 5
+        assert stats.reused_connections >= 55
+        assert checker.routes is None
+
+
+# ============================================================================
+# Testes da Divisão em Shards
+# ============================================================================
+
+@pytest.mark.unit
+@pytest.mark.fast
+class TestSharding:
+    """Testes da divisão do padrão entre processos"""
+
+    @pytest.mark.parametrize("count", [1, 3, 7])
+    def test_shards_are_disjoint_and_complete(self, count):
+        """Os shards não se sobrepõem e juntos cobrem o padrão"""
+        keyspace = generate_domains("2letters", lazy=True)
+        shards = [list(shard_domains(keyspace, i, count)) for i in range(count)]
+
+        seen = [domain for shard in shards for domain in shard]
+        assert len(seen) == len(set(seen)) == len(keyspace)
+        assert set(seen) == set(keyspace)
+        assert max(map(len, shards)) - min(map(len, shards)) <= 1
+
+    def test_keyspace_shards_are_views(self):
+        """Shards de um Keyspace têm len() e não geram os outros shards"""
+        keyspace = generate_domains("3letters", lazy=True)
+        shard = shard_domains(keyspace, 2, 8)
+        assert isinstance(shard, KeyspaceView)
+        assert len(shard) == len(list(shard)) == len(keyspace[2::8])
+        assert list(shard)[:2] == [keyspace[2], keyspace[10]]
+
+    def test_shuffled_shards_are_disjoint(self):
+        """--shuffle mantém os shards disjuntos e completos"""
+        args = build_parser().parse_args(["--pattern", "2letters", "--shuffle", "3"])
+        keyspace, _ = load_domains(args)
+        shards = [list(shard_domains(keyspace, i, 3)) for i in range(3)]
+        seen = [domain for shard in shards for domain in shard]
+        assert sorted(seen) == list(generate_domains("2letters"))
+
+    def test_invalid_shard(self):
+        """Índice fora do intervalo é rejeitado"""
+        with pytest.raises(ValueError):
+            shard_domains([], 2, 2)
+
+    def test_shard_path_includes_count(self):
+        """Journals de divisões diferentes não se misturam"""
+        assert shard_path("out.csv.journal", 0, 4) != shard_path("out.csv.journal", 0, 2)
+
+    def test_dead_shard_is_reaped_while_queue_is_busy(self, tmp_path, monkeypatch):
+        """Um shard morto é detectado mesmo com os outros mantendo a fila ocupada"""
+        from tools.domain_checker import sharding
+
+        class Events:
+            """Fila que nunca esvazia: relatórios do shard 2 por 1s, depois o fim"""
+
+            def __init__(self):
+                self.start = time.monotonic()
+
+            def get(self, timeout=None):
+                time.sleep(0.001)
+                if time.monotonic() - self.start < 1.0:
+                    return ("progress", 1, 0, 0, [], 0)
+                return ("done", 1, 0, 0, [], 0, 0)
+
+        class Process:
+            """O shard 1 morreu (OOM) sem avisar o pai"""
+
+            def __init__(self, target, args, name, daemon):
+                self.index = args[2]
+                self.exitcode = -9 if self.index == 0 else None
+
+            def start(self):
+                pass
+
+            def is_alive(self):
+                return self.index != 0
+
+            def join(self, timeout=None):
+                pass
+
+            def terminate(self):
+                pass
+
+        class Context:
+            Queue = Events
+
+        Context.Process = Process
+        monkeypatch.setattr(sharding.multiprocessing, "get_context", lambda method: Context)
+        monkeypatch.setattr(sharding, "REPORT_INTERVAL", 0.05)
+        logger = Mock()
+        start = time.monotonic()
+        reaped = []
+        logger.error.side_effect = lambda message: reaped.append(time.monotonic() - start)
+
+        sharding.run_sharded({"progress_interval": 0}, [], 2, logger, None, str(tmp_path / "o.csv"))
+
+        assert len(reaped) == 1
+        assert reaped[0] < 0.5
+
+    def test_workers_flag(self):
+        """--workers é aceito pela CLI e vale 1 por padrão"""
+        assert build_parser().parse_args([]).workers == 1
+        assert build_parser().parse_args(["--workers", "4"]).workers == 4
+
+
+# ============================================================================
+# Testes da Fila de Leases do Coordenador
+# ============================================================================
+
+@pytest.mark.unit
+class TestLeaseQueue:
+    """Testes da fila de faixas com lease"""
+
+    def test_setup_splits_pattern_into_ranges(self, tmp_path):
+        """As faixas cobrem o padrão inteiro, sem sobreposição"""
+        with LeaseQueue(str(tmp_path / "q.sqlite3")) as queue:
+            assert queue.setup("custom:abc", range_size=10) == 27
+
+            ranges = [queue.lease("w1")[1:] for _ in range(3)]
+            assert ranges == [(0, 10), (10, 20), (20, 27)]
+            assert queue.lease("w1") is None
+
+    def test_setup_is_idempotent_and_checks_pattern(self, tmp_path):
+        """Reabrir a fila não recria faixas; outro padrão é rejeitado"""
+        path = str(tmp_path / "q.sqlite3")
+        with LeaseQueue(path) as queue:
+            queue.setup("custom:abc", range_size=10)
+            queue.lease("w1")
+        with LeaseQueue(path) as queue:
+            queue.setup("custom:abc", range_size=10)
+            assert queue.status()["leased"] == 1
+            with pytest.raises(ValueError):
+                queue.setup("2letters")
+
+    def test_expired_lease_is_reassigned(self, tmp_path):
+        """Faixa de um worker que sumiu volta para a fila"""
+        with LeaseQueue(str(tmp_path / "q.sqlite3"), lease_timeout=0.05) as queue:
+            queue.setup("custom:ab", range_size=8)
+            first = queue.lease("morto")
+            assert queue.lease("vivo") is None
+
+            time.sleep(0.1)
+            assert queue.lease("vivo") == first
+            assert queue.status()["reassigned"] == 1
+
+            # O dono antigo não consegue mais renovar nem concluir
+            assert not queue.renew(first[0], "morto")
+            assert not queue.complete(first[0], "morto", [("aaa.com.br", "taken")])
+            assert queue.complete(first[0], "vivo", [("aaa.com.br", "available")])
+            assert list(queue.available()) == ["aaa.com.br"]
+            assert queue.finished()
+
+    def test_range_with_errors_is_retried(self, tmp_path):
+        """Faixa com erros volta para a fila só com os domínios que faltam"""
+        with LeaseQueue(str(tmp_path / "q.sqlite3"), max_attempts=2) as queue:
+            queue.setup("custom:ab", range_size=3)
+            range_id, start, stop = queue.lease("w1")
+            assert queue.retry_domains(range_id) is None
+            assert queue.complete(range_id, "w1", [
+                ("aaa.com.br", "registered"), ("aab.com.br", "error"), ("aba.com.br", "available"),
+            ])
+            assert not queue.finished()
+
+            assert queue.lease("w2") == (range_id, start, stop)
+            assert queue.retry_domains(range_id) == ["aab.com.br"]
+            assert queue.complete(range_id, "w2", [("aab.com.br", "error")])
+
+            # Segunda entrega era a última: a faixa fecha mesmo com erro
+            assert queue.lease("w3")[0] != range_id
+            assert queue.status()["error"] == 1
+
+
+# ============================================================================
+# Testes das Saídas em Fluxo (sinks)
+# ============================================================================
+
+@pytest.mark.unit
+class TestResultSinks:
+    """Testes dos sinks de resultados"""
+
+    def test_sink_bases_are_abstract(self, tmp_path):
+        """Sinks sem _write/_format não podem ser criados"""
+        with pytest.raises(TypeError):
+            ResultSink()
+
+        class NoFormat(BufferedFileSink):
+            pass
+
+        with pytest.raises(TypeError):
+            NoFormat(str(tmp_path / "x.txt"))
+
+    def test_csv_sink_is_readable_mid_run(self, tmp_path):
+        """Após flush, os resultados já estão no arquivo, antes de close"""
+        path = tmp_path / "todos.csv"
+        sink = CsvSink(str(path), buffer_size=1000, flush_interval=3600)
+        sink.write(CheckResult("abc.com.br", "taken", 0.0123, "http://p:1", 2, time.time()))
+        sink.flush()
+
+        lines = path.read_text(encoding="utf-8").splitlines()
+        assert lines[0] == "dominio,status,latencia_ms,proxy,tentativas,verificado_em"
+        assert lines[1].startswith("abc.com.br,taken,12.3,http://p:1,2,")
+        sink.close()
+
+    def test_available_csv_keeps_legacy_format(self, tmp_path):
+        """O CSV de disponíveis mantém o formato de save_results"""
+        path = tmp_path / "disponiveis.csv"
+        with available_csv(str(path)) as sink:
+            sink.write(CheckResult("abc.com.br", "taken"))
+            sink.write(CheckResult("xyz.com.br", "available", checked_at=time.time()))
+
+        lines = path.read_text(encoding="utf-8").splitlines()
+        assert lines[0] == "dominio,verificado_em"
+        assert len(lines) == 2 and lines[1].startswith("xyz.com.br,")
+        assert sink.written == 1
+
+    def test_stdout_sink(self):
+        """Por padrão só disponíveis são impressos"""
+        stream = io.StringIO()
+        sink = StdoutSink(stream=stream)
+        sink.write(CheckResult("abc.com.br", "taken"))
+        sink.write(CheckResult("xyz.com.br", "available"))
+        assert stream.getvalue() == "xyz.com.br\tavailable\n"
+
+    def test_parquet_sink_typed_row_groups(self, tmp_path):
+        """Parquet com colunas tipadas, dicionário e um row group por lote"""
+        pq = pytest.importorskip("pyarrow.parquet")
+        path = tmp_path / "todos.parquet"
+        with ParquetSink(str(path), buffer_size=4) as sink:
+            for i in range(10):
+                sink.write(CheckResult(
+                    f"d{i}.com.br", "available" if i == 3 else "taken",
+                    0.05, "http://p:1" if i % 2 else None, 1, time.time()
+                ))
+            sink.write(CheckResult("err.com.br", "error", attempts=3))
+
+        parquet = pq.ParquetFile(str(path))
+        assert parquet.metadata.num_rows == 11
+        assert parquet.metadata.num_row_groups == 3
+
+        table = parquet.read()
+        assert str(table.schema.field("status").type) == "dictionary<values=string, indices=int8, ordered=0>"
+        assert str(table.schema.field("verificado_em").type) == "timestamp[ms]"
+        rows = table.to_pylist()
+        assert rows[3]["status"] == "available"
+        assert rows[1]["proxy"] == "http://p:1" and rows[0]["proxy"] is None
+        assert rows[10]["tentativas"] == 3 and rows[10]["latencia_ms"] is None
+
+    @pytest.mark.slow
+    def test_parquet_four_letter_run_loads_fast(self, tmp_path):
+        """A tabela completa de uma varredura de 4 letras carrega em menos de 1s"""
+        pd = pytest.importorskip("pandas")
+        pytest.importorskip("pyarrow")
+        path = tmp_path / "4letters.parquet"
+        now = time.time()
+        with ParquetSink(str(path)) as sink:
+            for i, domain in enumerate(generate_domains("4letters", lazy=True)):
+                sink.write(CheckResult(domain, "available" if i % 50 == 0 else "taken", 0.1, None, 1, now))
+
+        start = time.perf_counter()
+        df = pd.read_parquet(path)
+        elapsed = time.perf_counter() - start
+
+        assert len(df) == 26 ** 4
+        assert str(df["status"].dtype) == "category"
+        assert elapsed < 1.0
+
+    @pytest.mark.asyncio
+    async def test_checker_records_every_outcome(self, stub_registro_br, tmp_path):
+        """Disponíveis, ocupados e erros chegam aos sinks com proxy, latência e tentativas"""
+        stub_registro_br.available = {"d1.com.br"}
+        stub_registro_br.status_for = lambda d: 500 if d == "d2.com.br" else 200
+        path = tmp_path / "todos.jsonl"
+
+        with JsonlSink(str(path)) as sink:
+            checker = DomainChecker(
+                Mock(), batch_size=2, batch_delay=0, max_retries=2, sinks=[sink]
+            )
+            checker.API_URL = stub_registro_br.base_url
+            checker.retry_delay = lambda attempt: 0
+            await checker.verify_domains(["d0.com.br", "d1.com.br", "d2.com.br"], None)
+
+        rows = {row["dominio"]: row for row in map(json.loads, path.read_text(encoding="utf-8").splitlines())}
+        assert {d: r["status"] for d, r in rows.items()} == {
+            "d0.com.br": "registered", "d1.com.br": "available", "d2.com.br": "error"
+        }
+        assert rows["d0.com.br"]["tentativas"] == 1
+        assert rows["d0.com.br"]["latencia_ms"] is not None
+        assert rows["d2.com.br"]["tentativas"] == 2
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("scheduler", ["window", "batch"])
+    async def test_sink_failure_still_reports_domain(self, stub_registro_br, scheduler):
+        """Se um sink falhar, o domínio é registrado como erro em vez de sumir"""
+
+        class FlakySink(ResultSink):
+            def _write(self, result):
+                if result.domain == "d1.com.br" and result.status != "error":
+                    raise OSError("disco cheio")
+
+        class Recorder(ResultSink):
+            def __init__(self):
+                super().__init__()
+                self.rows = {}
+
+            def _write(self, result):
+                self.rows[result.domain] = result.status
+
+        recorder = Recorder()
+        checker = DomainChecker(
+            Mock(), batch_size=2, batch_delay=0, scheduler=scheduler,
+            sinks=[FlakySink(), recorder]
+        )
+        checker.API_URL = stub_registro_br.base_url
+        await checker.verify_domains(["d0.com.br", "d1.com.br", "d2.com.br"], None)
+
+        assert recorder.rows["d1.com.br"] == "error"
+        assert set(recorder.rows) == {"d0.com.br", "d1.com.br", "d2.com.br"}
+        assert checker.erros == 1
+        assert checker.verificados + checker.erros == 3
+
+    @pytest.mark.asyncio
+    async def test_final_flush_does_not_block_event_loop(self, stub_registro_br):
+        """A gravação final dos sinks roda fora do event loop"""
+
+        class SlowSink(ResultSink):
+            def _write(self, result):
+                pass
+
+            def flush(self):
+                time.sleep(0.3)
+
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.02)
+
+        checker = DomainChecker(Mock(), batch_size=2, batch_delay=0, sinks=[SlowSink()])
+        checker.API_URL = stub_registro_br.base_url
+        task = asyncio.ensure_future(ticker())
+        try:
+            await checker.verify_domains(["d0.com.br", "d1.com.br"], None)
+        finally:
+            task.cancel()
+
+        gaps = [b - a for a, b in zip(ticks, ticks[1:])]
+        assert max(gaps) < 0.25
+
+
+# ============================================================================
+# Testes do Parser de Respostas (avail/raw)
+# ============================================================================
+
+# Respostas reais do avail/raw (campos abreviados)
+AVAIL_REGISTERED = (
+    '{"status":2,"fqdn":"google.com.br","hosts":["ns1.google.com","ns2.google.com"],'
+    '"publication-status":"published","expires-at":"2026-04-17T00:00:00-03:00",'
+    '"reasons":["Domínio já registrado"]}'
+).encode("utf-8")
+AVAIL_AVAILABLE = '{"status":0,"fqdn":"xyzqw.com.br","reasons":["Domínio disponível"]}'.encode("utf-8")
+
+
+@pytest.mark.unit
+@pytest.mark.fast
+class TestAvailParser:
+    """Testes da classificação das respostas do Registro.br"""
+
+    @pytest.mark.parametrize("body,expected", [
+        (AVAIL_AVAILABLE, "available"),
+        (AVAIL_REGISTERED, "registered"),
+        (b'{"status":3,"fqdn":"gov.com.br"}', "reserved"),
+        (b'{"status": 4, "fqdn": "-a.com.br"}', "invalid"),
+        (b'{"status":8}', "error"),
+        (b'{"status":42}', "unknown"),
+        ("Domínio disponível".encode("utf-8"), "available"),
+        ("Domínio não disponível".encode("utf-8"), "unknown"),
+        ("Domínio indisponível".encode("utf-8"), "unknown"),
+        (b"<html>manutencao</html>", "unknown"),
+        (b"", "unknown"),
+    ])
+    def test_classify_body(self, body, expected):
+        """O campo status do JSON define o resultado; texto é só fallback"""
+        assert classify(200, body) == expected
+
+    @pytest.mark.asyncio
+    async def test_read_status_stops_after_status_field(self):
+        """O corpo é lido só até o campo status; sem ele, até o fim"""
+        class Content:
+            def __init__(self, data):
+                self.stream = io.BytesIO(data)
+                self.consumed = 0
+
+            async def read(self, n):
+                chunk = self.stream.read(n)
+                self.consumed += len(chunk)
+                return chunk
+
+        body = b'{"status":2,"fqdn":"a.com.br"' + b' ' * (4 * READ_CHUNK) + b'}'
+        resp = Mock(status=200, content=Content(body))
+        assert await read_status(resp) == "registered"
+        assert resp.content.consumed == READ_CHUNK
+
+        # O número cortado no fim de um pedaço não é lido pela metade
+        split = b' ' * (READ_CHUNK - len(b'{"status":4')) + b'{"status":42}'
+        resp = Mock(status=200, content=Content(split))
+        assert await read_status(resp) == "unknown"
+
+        resp = Mock(status=200, content=Content(b"<html>" + b"x" * READ_CHUNK + b"</html>"))
+        assert await read_status(resp) == "unknown"
+        assert resp.content.consumed == READ_CHUNK + 13
+
+    def test_status_inside_other_field_is_ignored(self):
+        """'publication-status' não é confundido com 'status'"""
+        assert classify(200, b'{"publication-status":"0","status":2}') == "registered"
+
+    @pytest.mark.parametrize("http_status,expected", [
+        (429, "rate_limited"), (503, "rate_limited"), (500, "error"), (404, "error"),
+    ])
+    def test_classify_http_status(self, http_status, expected):
+        """Status HTTP diferentes de 200 não dependem do corpo"""
+        assert classify(http_status, AVAIL_AVAILABLE) == expected
+
+
+# ============================================================================
+# Testes das Métricas
+# ============================================================================
+
+@pytest.mark.unit
+class TestMetrics:
+    """Testes das métricas no formato Prometheus"""
+
+    def test_metric_is_abstract(self):
+        """Uma métrica sem _samples não pode ser criada"""
+        with pytest.raises(TypeError):
+            Metric("x", "Ajuda")
+
+    def test_counter_and_histogram_exposition(self):
+        """Contadores com labels e histogramas cumulativos com _sum e _count"""
+        counter = Counter("x_total", "Ajuda", ["code"])
+        counter.inc("200")
+        counter.inc("200")
+        counter.inc('5"0"3')
+        assert counter.render() == [
+            "# HELP x_total Ajuda",
+            "# TYPE x_total counter",
+            'x_total{code="200"} 2',
+            'x_total{code="5\\"0\\"3"} 1',
+        ]
+
+        histogram = Histogram("lat_seconds", "Latência", buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+        assert histogram.render()[2:] == [
+            'lat_seconds_bucket{le="0.1"} 2',
+            'lat_seconds_bucket{le="1.0"} 3',
+            'lat_seconds_bucket{le="+Inf"} 4',
+            "lat_seconds_sum 3.65",
+            "lat_seconds_count 4",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_scrape_after_scan(self, stub_registro_br, tmp_path):
+        """/metrics expõe latência, códigos HTTP, retentativas, proxies e cache"""
+        stub_registro_br.available = {"d1.com.br"}
+        stub_registro_br.status_for = lambda d: 503 if d == "d2.com.br" else 200
+
+        cache = ResultCache(str(tmp_path / "cache.sqlite3"))
+        cache.put("d3.com.br", "registered")
+        checker = DomainChecker(
+            Mock(), batch_size=2, batch_delay=0, max_retries=2, cache=cache
+        )
+        checker.API_URL = stub_registro_br.base_url
+        checker.retry_delay = lambda attempt: 0
+        await checker.verify_domains(["d0.com.br", "d1.com.br", "d2.com.br", "d3.com.br"], None)
+        cache.close()
+
+        server = MetricsServer(checker.metrics, port=0)
+        url = await server.start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(url) as resp:
+                    assert resp.status == 200
+                    assert resp.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+                    body = await resp.text()
+        finally:
+            await server.stop()
+
+        lines = set(body.splitlines())
+        assert 'domain_checker_http_responses_total{code="200"} 2' in lines
+        assert 'domain_checker_http_responses_total{code="503"} 2' in lines
+        assert 'domain_checker_retries_total{cause="rate_limited"} 1' in lines
+        assert 'domain_checker_results_total{status="available"} 1' in lines
+        assert 'domain_checker_results_total{status="error"} 1' in lines
+        assert 'domain_checker_results_total{status="registered"} 2' in lines
+        assert 'domain_checker_proxy_requests_total{proxy="direct",result="success"} 2' in lines
+        assert 'domain_checker_proxy_requests_total{proxy="direct",result="failure"} 2' in lines
+        assert 'domain_checker_cache_lookups_total{result="hit"} 1' in lines
+        assert 'domain_checker_cache_lookups_total{result="miss"} 3' in lines
+        assert 'domain_checker_request_duration_seconds_count{result="rate_limited"} 2' in lines
+        assert "domain_checker_requests_in_flight 0" in lines
+        assert "domain_checker_concurrency_limit 2" in lines
+
+
+# ============================================================================
+# Testes do Progresso por Tempo
+# ============================================================================
+
+@pytest.mark.unit
+class TestProgress:
+    """Testes do ProgressTracker e do ProgressReporter"""
+
+    def test_rolling_rate_percentiles_and_eta(self):
+        """Erros contam como concluídos; taxa e ETA usam só a janela recente"""
+        now = [1000.0]
+        tracker = ProgressTracker(window=10, clock=lambda: now[0])
+        tracker.start(total=100)
+
+        # 20 domínios no primeiro segundo, depois 10 segundos parados
+        for i in range(20):
+            tracker.record_request(0.01 * (i + 1))
+            tracker.record_result("error" if i < 2 else "registered")
+        now[0] += 1
+        snapshot = tracker.snapshot()
+        assert snapshot.completed == 20 and snapshot.errors == 2
+        assert snapshot.fraction == 0.2
+        assert snapshot.rps == 20.0
+        assert snapshot.p50 == pytest.approx(0.10)
+        assert snapshot.p95 == pytest.approx(0.19)
+        assert snapshot.eta == pytest.approx(4.0)
+
+        now[0] += 10
+        stalled = tracker.snapshot()
+        assert stalled.rps == 0.0 and stalled.eta is None
+        assert "20/100 (20.0%)" in stalled.format() and "Erros: 2" in stalled.format()
+
+    def test_skip_does_not_count_as_throughput(self):
+        """Resultados retomados do journal avançam o total, não a taxa"""
+        tracker = ProgressTracker()
+        tracker.start(total=10)
+        tracker.skip(4, available=1)
+        snapshot = tracker.snapshot()
+        assert snapshot.completed == 4 and snapshot.available == 1
+        assert snapshot.rate == 0.0
+
+    def test_format_duration(self):
+        assert format_duration(42) == "42s"
+        assert format_duration(725) == "12m05s"
+        assert format_duration(12000) == "3h20m"
+
+    @pytest.mark.asyncio
+    async def test_reporter_ticks_during_scan(self, stub_registro_br):
+        """O relatório sai por tempo, com o total incluindo erros"""
+        stub_registro_br.latency = lambda domain: 0.05
+        stub_registro_br.status_for = lambda d: 500 if d == "d0.com.br" else 200
+        snapshots = []
+
+        checker = DomainChecker(Mock(), batch_size=2, batch_delay=0, max_retries=1, progress_interval=None)
+        checker.API_URL = stub_registro_br.base_url
+        async with ProgressReporter(checker.progress, snapshots.append, interval=0.05):
+            await checker.verify_domains([f"d{i}.com.br" for i in range(8)], None)
+
+        assert len(snapshots) >= 3
+        assert snapshots[-1].completed == 8 and snapshots[-1].errors == 1
+        assert snapshots[-1].eta == 0.0
+        assert snapshots[-1].p50 is not None
+
+
+# ============================================================================
+# Testes de Requisições Hedged
+# ============================================================================
+
+@pytest.mark.unit
+class TestHedging:
+    """Testes do HedgePolicy e do hedging no verificador"""
+
+    def test_delay_waits_for_samples_and_tracks_p95(self):
+        """Sem amostras suficientes não há hedge; depois o atraso é o p95"""
+        policy = HedgePolicy(min_samples=20, min_delay=0.01, refresh=0)
+        for i in range(19):
+            policy.observe(0.1)
+        assert policy.delay() is None
+
+        for i in range(81):
+            policy.observe(1.0 if i >= 75 else 0.1)
+        assert policy.delay() == 1.0
+
+    def test_budget_caps_hedges(self):
+        """Cópias nunca passam de max_ratio das primárias"""
+        policy = HedgePolicy(max_ratio=0.1)
+        sent = 0
+        for _ in range(100):
+            policy.on_primary()
+            sent += policy.try_hedge()
+        assert sent == 10 and policy.hedges == 10
+
+    def test_invalid_ratio(self):
+        with pytest.raises(ValueError):
+            HedgePolicy(max_ratio=0)
+
+    @pytest.mark.asyncio
+    async def test_slow_request_is_won_by_hedge(self, stub_registro_br, tmp_path):
+        """Uma requisição presa é respondida pela cópia por outro proxy"""
+        calls = {}
+
+        def latency(domain):
+            calls[domain] = calls.get(domain, 0) + 1
+            return 1.5 if domain == "slow.com.br" and calls[domain] == 1 else 0.0
+
+        stub_registro_br.latency = latency
+        stub_registro_br.available = {"slow.com.br"}
+        port = stub_registro_br.base_url.split(":")[2].split("/")[0]
+        proxies = [f"http://127.0.0.1:{port}", f"http://localhost:{port}"]
+
+        checker = DomainChecker(Mock(), proxies=proxies, batch_size=1, batch_delay=0, hedge_ratio=0.5)
+        checker.API_URL = stub_registro_br.base_url
+        checker.hedging = HedgePolicy(max_ratio=0.5, min_samples=5, min_delay=0.01)
+
+        start = time.monotonic()
+        await checker.verify_domains([f"d{i}.com.br" for i in range(10)] + ["slow.com.br"], None)
+        elapsed = time.monotonic() - start
+
+        assert elapsed < 1.0
+        assert checker.disponiveis == 1
+        assert calls["slow.com.br"] == 2
+        assert checker.hedging.wins == 1
+        assert checker.metrics.hedges.value("won") == 1
+        assert checker.hedging.hedges <= 0.5 * checker.hedging.primaries
+
+    def test_hedging_requires_two_proxies(self):
+        assert DomainChecker(Mock(), hedge_ratio=0.05).hedging is None
+        assert DomainChecker(Mock(), proxies=["http://a:1", "http://b:1"], hedge_ratio=0.05).hedging is not None
+
+
+# ============================================================================
+# Testes da Normalização de Entrada
+# ============================================================================
+
+@pytest.mark.unit
+@pytest.mark.fast
+class TestNormalizer:
+    """Testes do normalize_domain e do Normalizer"""
+
+    @pytest.mark.parametrize("name,expected", [
+        ("Exemplo", "exemplo.com.br"),
+        ("  EXEMPLO.COM.BR.  ", "exemplo.com.br"),
+        ("café", "xn--caf-dma.com.br"),
+        ("xn--caf-dma.com.br", "xn--caf-dma.com.br"),
+        ("a-b-c", "a-b-c.com.br"),
+        ("99x", "99x.com.br"),
+    ])
+    def test_normalizes_valid_names(self, name, expected):
+        assert normalize_domain(name) == expected
+
+    @pytest.mark.parametrize("name,reason", [
+        ("a", "tamanho"),
+        ("a" * 27, "tamanho"),
+        ("-abc", "hifen"),
+        ("abc-", "hifen"),
+        ("ab--c", "hifen"),
+        ("12345", "numerico"),
+        ("foo_bar", "caractere"),
+        ("naïve", "caractere"),
+        ("foo.net.br", "categoria"),
+        ("xn--zzzz-", "idna"),
+    ])
+    def test_rejects_invalid_names(self, name, reason):
+        with pytest.raises(InvalidDomain) as error:
+            normalize_domain(name)
+        assert error.value.reason == reason
+
+    def test_other_suffixes(self):
+        assert normalize_domain("loja.net.br", (".com.br", ".net.br")) == "loja.net.br"
+        assert normalize_domain("loja", (".net.br",)) == "loja.net.br"
+
+    def test_feed_dedupes_and_counts(self):
+        normalizer = Normalizer()
+        lines = ["abc", "ABC.com.br", "", "# comentário", "a", "café", "café.com.br", "-x-"]
+        assert list(normalizer.feed(lines)) == ["abc.com.br", "xn--caf-dma.com.br"]
+        assert normalizer.accepted == 2
+        assert normalizer.duplicates == 2
+        assert normalizer.rejected == {"tamanho": 1, "hifen": 1}
+        assert "2 aceitos, 2 duplicados, 2 rejeitados" in normalizer.summary()
+
+    @pytest.mark.parametrize("chunk_size", [7, 1 << 20])
+    def test_read_matches_feed(self, chunk_size):
+        """O caminho rápido por bloco dá o mesmo resultado que linha a linha"""
+        text = "\n".join([
+            "abc", "XYZ.com.br", "abc", "", "  # lista", "cafe", "café", "foo bar",
+            "ab--c", "123", "123a", "long" * 7, "x.net.br", "ok-ok\r", "fim"
+        ])
+        expected = Normalizer()
+        by_line = list(expected.feed(text.splitlines()))
+
+        normalizer = Normalizer()
+        result = list(normalizer.read(io.BytesIO(text.encode("utf-8")), chunk_size=chunk_size))
+
+        assert result == by_line
+        assert normalizer.rejected == expected.rejected
+        assert normalizer.duplicates == expected.duplicates
+
+    @pytest.mark.parametrize("bad", [
+        "123.com.br", "ab-.com.br", "-ab.com.br", "ab--c.com.br", "x.y.com.br",
+        "a.com.br", "l" * 27 + ".com.br", ".com.br", "ok.net.br",
+    ])
+    def test_read_suffixed_block_matches_feed(self, bad):
+        """Bloco em que toda linha tem a categoria padrão: mesmas regras que linha a linha"""
+        lines = ["abc.com.br", "xyz.com.br", bad, "fim.com.br"]
+        expected = Normalizer()
+        by_line = list(expected.feed(lines))
+
+        normalizer = Normalizer()
+        data = ("\n".join(lines) + "\n").encode("ascii")
+        assert list(normalizer.read(io.BytesIO(data))) == by_line
+        assert normalizer.rejected == expected.rejected
+
+    def test_read_clean_file_in_bulk(self):
+        """Arquivo limpo passa inteiro pelo caminho rápido, com repetidos entre blocos"""
+        names = [f"d{i:05d}" for i in range(20000)]
+        data = ("\n".join(names + names[:100]) + "\n").encode("ascii")
+
+        normalizer = Normalizer()
+        result = list(normalizer.read(io.BytesIO(data), chunk_size=4096))
+
+        assert result == [f"{name}.com.br" for name in names]
+        assert normalizer.duplicates == 100
+        assert not normalizer.rejected
+
+    def test_input_option(self, tmp_path):
+        """--input substitui --pattern e é exclusivo com ele"""
+        path = tmp_path / "lista.txt"
+        path.write_text("Beta\nalfa\nbeta\n", encoding="utf-8")
+        args = build_parser().parse_args(["--input", str(path)])
+
+        domains, normalizer = load_domains(args)
+        assert list(domains) == ["beta.com.br", "alfa.com.br"]
+        assert normalizer.duplicates == 1
+
+        with pytest.raises(SystemExit):
+            build_parser().parse_args(["--input", str(path), "--pattern", "2letters"])
+
+
+# ============================================================================
+# Testes do Pré-filtro de Registrados
+# ============================================================================
+
+@pytest.mark.unit
+@pytest.mark.fast
+class TestPrefilter:
+    """Testes do BloomFilter e do KnownRegistered"""
+
+    def test_bloom_has_no_false_negatives_and_few_false_positives(self, tmp_path):
+        bloom = BloomFilter.for_capacity(5000, 0.01)
+        for i in range(5000):
+            bloom.add(f"r{i}.com.br")
+
+        path = tmp_path / "known.bloom"
+        bloom.save(str(path))
+        loaded = BloomFilter.load(str(path))
+
+        assert len(loaded) == 5000
+        assert all(f"r{i}.com.br" in loaded for i in range(5000))
+        false_positives = sum(f"livre{i}.com.br" in loaded for i in range(10000))
+        assert false_positives < 300  # ~1% esperado
+
+    def test_load_rejects_other_files(self, tmp_path):
+        path = tmp_path / "lista.txt"
+        path.write_text("abc\n" * 20)
+        with pytest.raises(ValueError):
+            BloomFilter.load(str(path))
+
+    def test_build_index_last_status_wins(self, tmp_path):
+        old = tmp_path / "antigo.jsonl"
+        old.write_text("\n".join(json.dumps({"dominio": d, "status": s}) for d, s in [
+            ("aaa.com.br", "registered"), ("bbb.com.br", "registered"), ("ccc.com.br", "available"),
+        ]) + "\n", encoding="utf-8")
+        new = tmp_path / "novo.csv"
+        new.write_text("dominio,status\nbbb.com.br,available\nccc.com.br,error\n", encoding="utf-8")
+        listed = tmp_path / "zona.txt"
+        listed.write_text("DDD\nxn--caf-dma.com.br\n", encoding="utf-8")
+
+        bloom = build_index([str(old), str(new), str(listed)], str(tmp_path / "known.bloom"))
+
+        assert len(bloom) == 3
+        assert "aaa.com.br" in bloom and "ddd.com.br" in bloom and "xn--caf-dma.com.br" in bloom
+        assert "bbb.com.br" not in bloom and "ccc.com.br" not in bloom
+
+    def test_filter_skips_defers_and_rechecks(self):
+        bloom = BloomFilter.for_capacity(100)
+        known = [f"k{i}.com.br" for i in range(60)]
+        for domain in known:
+            bloom.add(domain)
+        domains = ["novo1.com.br"] + known + ["novo2.com.br"]
+
+        skip = KnownRegistered(bloom, mode="skip", refresh_days=0)
+        routes = []
+        assert list(skip.filter(domains, lambda d, r: routes.append(r))) == ["novo1.com.br", "novo2.com.br"]
+        assert routes == ["skipped"] * 60
+
+        defer = KnownRegistered(bloom, mode="defer", refresh_days=0)
+        assert list(defer.filter(domains)) == ["novo1.com.br", "novo2.com.br"] + known
+
+        # Em `refresh_days` dias seguidos, cada conhecido é reverificado uma vez
+        rechecked = []
+        for day in range(7):
+            daily = KnownRegistered(bloom, refresh_days=7, clock=lambda: day * 86400 + 10)
+            rechecked += [d for d in daily.filter(domains) if d in known]
+        assert sorted(rechecked) == sorted(known)
+
+    @pytest.mark.asyncio
+    async def test_checker_does_not_query_known_names(self, stub_registro_br):
+        bloom = BloomFilter.for_capacity(10)
+        bloom.add("conhecido.com.br")
+        stub_registro_br.available = {"livre.com.br"}
+
+        checker = DomainChecker(
+            Mock(), batch_size=2, batch_delay=0,
+            prefilter=KnownRegistered(bloom, refresh_days=0)
+        )
+        checker.API_URL = stub_registro_br.base_url
+        await checker.verify_domains(["conhecido.com.br", "livre.com.br"], None)
+
+        assert stub_registro_br.requests == ["livre.com.br"]
+        assert checker.disponiveis == 1
+        assert checker.progress.completed == 2
+        assert checker.metrics.prefilter.value("skipped") == 1
+
+
+# ============================================================================
+# Testes do Mapa de Status
+# ============================================================================
+
+def _write_status_range(path: str, size: int, start: int, step: int):
+    with StatusMap(path, size, "2letters", resume=True, shared=True) as status:
+        for index in range(start, size, step):
+            status.set(index, TAKEN)
+
+
+@pytest.mark.unit
+class TestStatusMap:
+    """Testes do mapa de status em 2 bits"""
+
+    def test_set_get_and_counts(self, tmp_path):
+        """Cada índice guarda seu código sem afetar os vizinhos do mesmo byte"""
+        path = str(tmp_path / "scan.status")
+        with StatusMap(path, 10, "custom:ab") as status:
+            status.set(0, AVAILABLE)
+            status.set(1, TAKEN)
+            status.set(2, ERROR)
+            status.set(9, AVAILABLE)
+            status.set(2, TAKEN)
+            assert [status.get(i) for i in range(4)] == [AVAILABLE, TAKEN, TAKEN, UNKNOWN]
+            assert status.counts() == {"unknown": 6, "available": 2, "taken": 2, "error": 0}
+            assert list(status.indices(AVAILABLE)) == [0, 9]
+            with pytest.raises(IndexError):
+                status.set(10, TAKEN)
+        assert (tmp_path / "scan.status").stat().st_size == StatusMap.DATA_OFFSET + 3
+
+    def test_reader_sees_live_writes(self, tmp_path):
+        """Um leitor com o arquivo aberto vê as gravações sem reabrir"""
+        path = str(tmp_path / "scan.status")
+        with StatusMap(path, 676, "2letters") as writer, StatusMap.open(path) as reader:
+            assert reader.pattern == "2letters" and len(reader) == 676
+            writer.set(500, AVAILABLE)
+            assert reader.get(500) == AVAILABLE
+            assert list(reader.indices(AVAILABLE)) == [500]
+
+    def test_resume_keeps_state_and_checks_pattern(self, tmp_path):
+        """--resume mantém o mapa; sem ele o mapa é zerado; outro padrão é recusado"""
+        path = str(tmp_path / "scan.status")
+        with StatusMap(path, 676, "2letters") as status:
+            status.set(7, AVAILABLE)
+        with StatusMap(path, 676, "2letters", resume=True) as status:
+            assert status.get(7) == AVAILABLE
+        with pytest.raises(ValueError, match="3letters"):
+            StatusMap(path, 17576, "3letters", resume=True)
+        with StatusMap(path, 676, "2letters") as status:
+            assert status.get(7) == UNKNOWN
+
+    def test_sink_uses_original_index_with_shuffle(self, tmp_path):
+        """O sink grava no índice da ordem original, mesmo com --shuffle"""
+        path = str(tmp_path / "scan.status")
+        args = build_parser().parse_args(
+            ["--pattern", "2letters", "--shuffle", "5", "--status-map", path, "--output", str(tmp_path / "o.csv")]
+        )
+        domains, _ = load_domains(args)
+        keyspace = domains.keyspace
+        prepare_status_map(args, keyspace).close()
+        sinks = create_sinks(args, include_output=False, keyspace=keyspace)
+        for sink in sinks:
+            sink.write(CheckResult("zz.com.br", "available"))
+            sink.write(CheckResult("ab.com.br", "reserved"))
+            sink.close()
+
+        with StatusMap.open(path) as status:
+            assert list(status.indices(AVAILABLE)) == [keyspace.index("zz.com.br")] == [675]
+            assert status.get(1) == TAKEN
+
+    def test_shards_share_the_file(self, tmp_path):
+        """Processos gravando índices intercalados não perdem gravações"""
+        multiprocessing = pytest.importorskip("multiprocessing")
+        if "fork" not in multiprocessing.get_all_start_methods():
+            pytest.skip("requer fork")
+        path = str(tmp_path / "scan.status")
+        StatusMap(path, 676, "2letters").close()
+        context = multiprocessing.get_context("fork")
+        processes = [
+            context.Process(target=_write_status_range, args=(path, 676, start, 4))
+            for start in range(4)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(timeout=30)
+        with StatusMap.open(path) as status:
+            assert status.counts()["taken"] == 676
+
+
+# ============================================================================
+# Testes do Diff entre Varreduras
+# ============================================================================
+
+def _status_map_file(path, codes: dict, pattern: str = "2letters", size: int = 676) -> str:
+    with StatusMap(str(path), size, pattern) as status:
+        for index, code in codes.items():
+            status.set(index, code)
+    return str(path)
+
+
+@pytest.mark.unit
+class TestScanDiff:
+    """Testes do subcomando diff"""
+
+    @pytest.fixture(autouse=True)
+    def _numpy(self):
+        pytest.importorskip("numpy")
+
+    def test_codes_match_get(self, tmp_path):
+        """codes() desempacota os 2 bits de cada índice"""
+        path = _status_map_file(tmp_path / "a.status", {0: AVAILABLE, 5: TAKEN, 675: ERROR})
+        with StatusMap.open(path) as status:
+            codes = status.codes()
+            assert len(codes) == 676
+            assert [int(codes[i]) for i in (0, 1, 5, 675)] == [AVAILABLE, UNKNOWN, TAKEN, ERROR]
+
+    def test_newly_available_and_taken(self, tmp_path):
+        """Mudanças entre dois mapas; erro e desconhecido não contam como mudança"""
+        old = _status_map_file(tmp_path / "old.status", {0: TAKEN, 1: AVAILABLE, 2: TAKEN, 3: AVAILABLE, 4: TAKEN})
+        new = _status_map_file(tmp_path / "new.status", {0: AVAILABLE, 1: TAKEN, 2: TAKEN, 3: ERROR, 5: AVAILABLE})
+        diff = diff_status_maps([old, new])
+        assert diff.domains("newly_available") == ["aa.com.br"]
+        assert diff.domains("newly_taken") == ["ab.com.br"]
+        assert diff.domains("flapping") == []
+
+    def test_flapping_and_history(self, tmp_path):
+        """Com três mapas: oscilação e o último status definitivo como 'antes'"""
+        first = _status_map_file(tmp_path / "1.status", {0: AVAILABLE, 1: TAKEN})
+        second = _status_map_file(tmp_path / "2.status", {0: TAKEN, 1: ERROR})
+        third = _status_map_file(tmp_path / "3.status", {0: AVAILABLE, 1: AVAILABLE})
+        diff = diff_status_maps([first, second, third])
+        assert diff.domains("flapping") == ["aa.com.br"]
+        assert diff.domains("newly_available") == ["aa.com.br", "ab.com.br"]
+
+    def test_chunked_scan_matches_whole_map(self, tmp_path, monkeypatch):
+        """Faixas pequenas (cortando bytes no meio) dão o mesmo resultado"""
+        from tools.domain_checker import scan_diff, status_map
+
+        marks = {0: TAKEN, 5: AVAILABLE, 6: TAKEN, 13: AVAILABLE, 674: TAKEN, 675: AVAILABLE}
+        old = _status_map_file(tmp_path / "old.status", marks)
+        new = _status_map_file(
+            tmp_path / "new.status", {i: AVAILABLE if c == TAKEN else TAKEN for i, c in marks.items()}
+        )
+        monkeypatch.setattr(status_map, "DATA_CHUNK", 3)
+        monkeypatch.setattr(scan_diff, "CODES_CHUNK", 7)
+
+        with StatusMap.open(new) as status:
+            assert status.counts() == {"unknown": 670, "available": 3, "taken": 3, "error": 0}
+            assert list(status.indices(AVAILABLE)) == [0, 6, 674]
+            assert [int(c) for c in status.codes(5, 8)] == [TAKEN, AVAILABLE, UNKNOWN]
+        diff = diff_status_maps([old, new])
+        assert diff.domains("newly_available") == ["aa.com.br", "ag.com.br", "zy.com.br"]
+        assert diff.domains("newly_taken") == ["af.com.br", "an.com.br", "zz.com.br"]
+
+    def test_rejects_different_patterns(self, tmp_path):
+        """Mapas de padrões diferentes não são comparados"""
+        old = _status_map_file(tmp_path / "old.status", {})
+        new = _status_map_file(tmp_path / "new.status", {}, pattern="custom:ab", size=8)
+        with pytest.raises(ValueError, match="custom:ab"):
+            diff_status_maps([old, new])
+
+    def test_cli_json_and_csv(self, tmp_path, capsys):
+        """Saída JSON na saída padrão e CSV em arquivo"""
+        old = _status_map_file(tmp_path / "old.status", {26: TAKEN})
+        new = _status_map_file(tmp_path / "new.status", {26: AVAILABLE})
+
+        diff_main([old, new])
+        data = json.loads(capsys.readouterr().out)
+        assert data["counts"] == {"newly_available": 1, "newly_taken": 0, "flapping": 0}
+        assert data["newly_available"] == ["ba.com.br"]
+
+        output = tmp_path / "mudancas.csv"
+        diff_main([old, new, "--format", "csv", "-o", str(output)])
+        assert output.read_text().splitlines() == ["dominio,mudanca", "ba.com.br,newly_available"]
+
+    def test_subcommand_dispatch(self, tmp_path, capsys):
+        """`domain_checker_advanced.py diff` chega ao subcomando"""
+        from tools.domain_checker import domain_checker_advanced
+        old = _status_map_file(tmp_path / "old.status", {})
+        new = _status_map_file(tmp_path / "new.status", {})
+        with patch.object(sys, "argv", ["domain_checker_advanced.py", "diff", old, new]):
+            domain_checker_advanced.main()
+        assert json.loads(capsys.readouterr().out)["pattern"] == "2letters"
+
+
 # ============================================================================
 # Testes de Salvamento de Resultados
 # ============================================================================
@@ -289,10 +2197,10 @@ class TestSaveResults:
         """Testa salvamento de resultados em CSV"""
         logger = Mock()
         checker = DomainChecker(logger)
-        checker.disponiveis = {"test1.com.br", "test2.com.br", "test3.com.br"}
+        domains = iter(["test1.com.br", "test2.com.br", "test3.com.br"])
 
         output_file = tmp_path / "results.csv"
-        checker.save_results(str(output_file))
+        checker.save_results(str(output_file), domains)
 
         assert output_file.exists()
 
@@ -309,7 +2217,7 @@ class TestSaveResults:
         checker = DomainChecker(logger)
 
         output_file = tmp_path / "empty_results.csv"
-        checker.save_results(str(output_file))
+        checker.save_results(str(output_file), [])
 
         assert output_file.exists()
         content = output_file.read_text()
@@ -332,6 +2240,75 @@ class TestPerformance:
         result = benchmark(generate_domains, "2letters")
         assert len(result) == 676
 
+    @pytest.mark.benchmark(group="generation")
+    def test_generate_join_baseline_performance(self, benchmark):
+        """Linha de base: ''.join + f-string por tupla do itertools.product (4 letras)"""
+        letters = "abcdefghijklmnopqrstuvwxyz"
+
+        def generate():
+            return [f"{''.join(combo)}.com.br" for combo in itertools.product(letters, repeat=4)]
+
+        assert len(benchmark(generate)) == 26 ** 4
+
+    @pytest.mark.benchmark(group="generation")
+    def test_generate_domains_list_performance(self, benchmark):
+        """generate_domains('4letters') (lista, via blocos NumPy quando disponível)"""
+        assert len(benchmark(generate_domains, "4letters")) == 26 ** 4
+
+    @pytest.mark.benchmark(group="generation")
+    def test_keyspace_chunks_performance(self, benchmark):
+        """Blocos de 64K domínios montados com NumPy (4 letras)"""
+        pytest.importorskip("numpy")
+        keyspace = generate_domains("4letters", lazy=True)
+        assert benchmark(lambda: sum(len(chunk) for chunk in keyspace.chunks())) == 26 ** 4
+
+    @pytest.mark.benchmark(group="generation")
+    def test_keyspace_blocks_performance(self, benchmark):
+        """Blocos sem NumPy (prefixo por bloco + sufixos em cache, 4 letras)"""
+        keyspace = generate_domains("4letters", lazy=True)
+        keyspace._tables = False
+        assert benchmark(lambda: sum(len(chunk) for chunk in keyspace.chunks())) == 26 ** 4
+
+    @pytest.mark.benchmark(group="avail-parser")
+    def test_classify_response_performance(self, benchmark):
+        """Benchmark do parser: regex sobre os bytes, sem decodificar"""
+        assert benchmark(classify, 200, AVAIL_REGISTERED) == "registered"
+
+    @pytest.mark.benchmark(group="avail-parser")
+    def test_text_search_baseline_performance(self, benchmark):
+        """Referência: decodificar, copiar em minúsculas e procurar "disponível" """
+        def text_search(body):
+            return "disponível" in body.decode("utf-8").lower()
+
+        assert benchmark(text_search, AVAIL_REGISTERED) is False
+
+    def test_normalize_file_performance(self, benchmark):
+        """Benchmark da normalização de um arquivo de 1M linhas (meta: milhões de linhas/s)"""
+        data = "".join(f"{domain}\n" for domain in generate_domains("4letters", lazy=True))
+        data = (data * 3)[:len(data) * 2].encode("ascii")  # ~1M linhas com repetidos
+
+        def normalize():
+            return sum(1 for _ in Normalizer().read(io.BytesIO(data)))
+
+        assert benchmark(normalize) == 26 ** 4
+
+    def test_scan_diff_performance(self, benchmark, tmp_path):
+        """Benchmark do diff de dois mapas de 5 letras (~11,9M índices)"""
+        np = pytest.importorskip("numpy")
+        size = 26 ** 5
+        paths = []
+        for seed in (1, 2):
+            path = tmp_path / f"{seed}.status"
+            StatusMap(str(path), size, "mask:?l?l?l?l?l").close()
+            packed = np.random.default_rng(seed).integers(0, 256, (size + 3) // 4, dtype=np.uint8)
+            with open(path, "r+b") as f:
+                f.seek(StatusMap.DATA_OFFSET)
+                f.write(packed.tobytes())
+            paths.append(str(path))
+
+        diff = benchmark(diff_status_maps, paths)
+        assert diff.counts()["newly_available"] > 0
+
     def test_load_proxies_performance(self, benchmark, tmp_path):
         """Benchmark de carregamento de proxies"""
         proxy_file = tmp_path / "proxies.txt"
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Controle Adaptativo de Concorrência (AIMD)
+Ajusta o número de requisições simultâneas pela latência e pelos erros observados
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Optional
+
+
+class AdaptiveConcurrency:
+    """
+    Limite de concorrência AIMD (aumento aditivo, redução multiplicativa)
+
+    A cada resposta saudável o limite cresce 1/limite, ou seja, cerca de uma
+    vaga por "rodada" de requisições. Timeouts, status diferentes de 200 ou
+    latência acima de `spike_factor` vezes a média multiplicam o limite por
+    `backoff`, no máximo uma vez por latência média, para que uma rajada de
+    erros da mesma rodada não derrube o limite até o mínimo.
+
+    Usado como um semáforo: `async with limiter: ...`.
+    """
+
+    def __init__(
+        self,
+        initial: int = 50,
+        min_limit: int = 1,
+        max_limit: int = 200,
+        backoff: float = 0.5,
+        spike_factor: float = 3.0,
+        smoothing: float = 0.1
+    ):
+        """
+        Args:
+            initial: Limite inicial de requisições simultâneas
+            min_limit: Limite mínimo
+            max_limit: Limite máximo
+            backoff: Fator multiplicativo aplicado em caso de falha
+            spike_factor: Latência acima de spike_factor * média conta como falha
+            smoothing: Peso da amostra nova na média móvel (EWMA) da latência
+        """
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError(f"Limites inválidos: min={min_limit}, max={max_limit}")
+
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.spike_factor = spike_factor
+        self.smoothing = smoothing
+        self.limit = float(min(max(initial, min_limit), max_limit))
+        self.in_flight = 0
+        self.latency_ewma: Optional[float] = None
+        self.decreases = 0
+        self._last_decrease = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def current_limit(self) -> int:
+        """Limite atual arredondado para baixo"""
+        return int(self.limit)
+
+    async def acquire(self):
+        """Aguarda uma vaga dentro do limite atual"""
+        while self.in_flight >= self.current_limit:
+            waiter = asyncio.get_event_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                raise
+        self.in_flight += 1
+
+    def release(self):
+        """Libera uma vaga"""
+        self.in_flight -= 1
+        self._wake()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *args):
+        self.release()
+
+    def _wake(self):
+        """Acorda quantos aguardando couberem no limite atual"""
+        free = self.current_limit - self.in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    def on_success(self, latency: float):
+        """
+        Registra uma resposta bem-sucedida
+
+        Args:
+            latency: Latência da requisição (segundos)
+        """
+        if self.latency_ewma is not None and latency > self.spike_factor * self.latency_ewma:
+            self._decrease()
+        else:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._wake()
+
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma += self.smoothing * (latency - self.latency_ewma)
+
+    def on_failure(self):
+        """Registra timeout, status de erro (429/5xx) ou falha de conexão"""
+        self._decrease()
+
+    def _decrease(self):
+        """Reduz o limite multiplicativamente, no máximo uma vez por latência média"""
+        now = time.monotonic()
+        if now - self._last_decrease < (self.latency_ewma or 0.0):
+            return
+
+        self._last_decrease = now
+        self.limit = max(float(self.min_limit), self.limit * self.backoff)
+        self.decreases += 1
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Parser de Respostas do Endpoint avail/raw do Registro.br
+Classifica a resposta pelo campo numérico `status` do JSON, lido direto dos
+bytes, sem decodificar o corpo nem procurar texto
+"""
+
+import json
+import re
+from typing import Optional
+
+# Status explícitos de uma verificação
+AVAILABLE = "available"
+REGISTERED = "registered"
+RESERVED = "reserved"
+INVALID = "invalid"
+RATE_LIMITED = "rate_limited"
+ERROR = "error"
+UNKNOWN = "unknown"
+
+# Respostas definitivas: o domínio não precisa ser consultado de novo
+DEFINITIVE = (AVAILABLE, REGISTERED, RESERVED, INVALID)
+
+# Campo "status" do avail/raw
+STATUS_CODES = {
+    0: AVAILABLE,     # disponível
+    1: AVAILABLE,     # disponível, com tickets concorrentes
+    2: REGISTERED,    # já registrado
+    3: RESERVED,      # indisponível (reservado ou bloqueado)
+    4: INVALID,       # consulta inválida
+    5: RESERVED,      # aguardando processo de liberação
+    6: AVAILABLE,     # disponível no processo de liberação em andamento
+    7: AVAILABLE,     # idem, com tickets concorrentes
+    8: ERROR,         # erro do lado do Registro.br
+    9: RESERVED,      # em processo de liberação competitiva
+}
+
+# Status HTTP de limitação de taxa
+RATE_LIMIT_HTTP = (429, 503)
+
+# Rótulos em português para exibição
+LABELS = {
+    AVAILABLE: "disponível",
+    REGISTERED: "registrado",
+    RESERVED: "reservado",
+    INVALID: "inválido",
+    RATE_LIMITED: "limitado",
+    ERROR: "erro",
+    UNKNOWN: "desconhecido",
+}
+
+# Bytes lidos por vez do corpo em read_status()
+READ_CHUNK = 256
+
+_STATUS_FIELD = re.compile(rb'"status"\s*:\s*(\d+)')
+_STATUS_FIELD_OVERLAP = 64
+# "disponível" como palavra inteira e sem "não " antes, para que
+# "indisponível" e "não disponível" não virem AVAILABLE (bytes em UTF-8)
+_AVAILABLE_TEXT = re.compile(rb'(?<![a-z\x80-\xff])(?<!n\xc3\xa3o )dispon\xc3\xadvel')
+
+
+def classify(http_status: int, body: Optional[bytes]) -> str:
+    """
+    Classifica uma resposta do avail/raw
+
+    O status é lido por uma regex sobre os bytes, que para nos primeiros
+    caracteres do JSON. Se o corpo não tiver o campo (formato antigo ou
+    página de erro), tenta o JSON completo e, por último, a palavra
+    "disponível" sem negação.
+
+    Args:
+        http_status: Status HTTP da resposta
+        body: Corpo bruto (pode ser None para status diferentes de 200)
+
+    Returns:
+        Um dos status do módulo (AVAILABLE, REGISTERED, ...)
+    """
+    if http_status in RATE_LIMIT_HTTP:
+        return RATE_LIMITED
+    if http_status != 200:
+        return ERROR
+    if not body:
+        return UNKNOWN
+
+    match = _STATUS_FIELD.search(body)
+    if match is not None:
+        return STATUS_CODES.get(int(match.group(1)), UNKNOWN)
+
+    try:
+        code = json.loads(body).get("status")
+        if isinstance(code, int):
+            return STATUS_CODES.get(code, UNKNOWN)
+    except (ValueError, AttributeError):
+        pass
+
+    # Resposta em texto livre
+    if _AVAILABLE_TEXT.search(body.lower()):
+        return AVAILABLE
+    return UNKNOWN
+
+
+async def read_status(resp) -> str:
+    """
+    Lê e classifica uma resposta aiohttp
+
+    O corpo bruto é lido aos poucos (READ_CHUNK bytes), sem detecção de
+    charset nem decodificação, e a leitura para assim que o campo `status`
+    aparece; só um corpo sem o campo é lido até o fim para os fallbacks de
+    classify(). Respostas de erro nem têm o corpo lido.
+
+    Args:
+        resp: aiohttp.ClientResponse
+
+    Returns:
+        Status classificado
+    """
+    if resp.status != 200:
+        return classify(resp.status, None)
+
+    body = bytearray()
+    while True:
+        chunk = await resp.content.read(READ_CHUNK)
+        if not chunk:
+            break
+        # Procura só no pedaço novo e no fim do anterior (onde o campo pode
+        # ter sido cortado), para um corpo grande não ser varrido de novo
+        start = max(0, len(body) - _STATUS_FIELD_OVERLAP)
+        body += chunk
+        match = _STATUS_FIELD.search(body, start)
+        # Um número no fim do que foi lido pode continuar no próximo pedaço
+        if match is not None and match.end() < len(body):
+            break
+    return classify(200, bytes(body))
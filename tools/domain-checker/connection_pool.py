@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Pool de Conexões por Rota de Saída
+Uma sessão aiohttp com conector próprio (keep-alive, cache de DNS, limite
+por host) para cada proxy ou conexão direta, com métricas de reuso
+"""
+
+from typing import Dict, List, Optional
+
+import aiohttp
+
+
+class RouteStats:
+    """Contadores de conexões de uma rota"""
+
+    def __init__(self):
+        self.new_connections = 0
+        self.reused_connections = 0
+
+    @property
+    def reuse_ratio(self) -> float:
+        """Fração das requisições que reaproveitaram uma conexão aberta"""
+        total = self.new_connections + self.reused_connections
+        return self.reused_connections / total if total else 0.0
+
+
+class RoutePool:
+    """
+    Sessões aiohttp por rota de saída
+
+    Cada proxy (e a conexão direta, chave None) recebe um TCPConnector
+    próprio, de modo que limites, keep-alive e handshakes TLS de um proxy
+    lento não afetam os demais. Um TraceConfig por rota conta conexões
+    novas e reaproveitadas.
+
+    Deve ser criado e usado dentro do event loop:
+    `async with RoutePool() as routes: session = routes.session(proxy)`.
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 100,
+        keepalive_timeout: float = 30.0,
+        dns_ttl: int = 300
+    ):
+        """
+        Args:
+            limit: Conexões simultâneas máximas por rota
+            limit_per_host: Conexões simultâneas máximas por host em cada rota
+            keepalive_timeout: Segundos que uma conexão ociosa fica aberta
+            dns_ttl: Segundos de cache das resoluções DNS
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_ttl = dns_ttl
+        self.stats: Dict[Optional[str], RouteStats] = {}
+        self._sessions: Dict[Optional[str], aiohttp.ClientSession] = {}
+
+    def _trace_config(self, stats: RouteStats) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+
+        async def on_new(session, ctx, params):
+            stats.new_connections += 1
+
+        async def on_reuse(session, ctx, params):
+            stats.reused_connections += 1
+
+        trace.on_connection_create_end.append(on_new)
+        trace.on_connection_reuseconn.append(on_reuse)
+        return trace
+
+    def session(self, proxy: Optional[str] = None) -> aiohttp.ClientSession:
+        """
+        Retorna (criando se preciso) a sessão da rota
+
+        Args:
+            proxy: URL do proxy, ou None para conexão direta
+
+        Returns:
+            Sessão aiohttp dedicada à rota
+        """
+        session = self._sessions.get(proxy)
+        if session is None:
+            stats = self.stats[proxy] = RouteStats()
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_ttl,
+                use_dns_cache=True
+            )
+            session = self._sessions[proxy] = aiohttp.ClientSession(
+                connector=connector,
+                trace_configs=[self._trace_config(stats)]
+            )
+        return session
+
+    @property
+    def new_connections(self) -> int:
+        """Conexões abertas em todas as rotas"""
+        return sum(s.new_connections for s in self.stats.values())
+
+    @property
+    def reused_connections(self) -> int:
+        """Conexões reaproveitadas em todas as rotas"""
+        return sum(s.reused_connections for s in self.stats.values())
+
+    def summary(self) -> str:
+        """
+        Returns:
+            Linha de resumo com conexões novas, reaproveitadas e taxa de reuso
+        """
+        new, reused = self.new_connections, self.reused_connections
+        ratio = reused / (new + reused) * 100 if new + reused else 0.0
+        return f"{new} novas, {reused} reaproveitadas ({ratio:.1f}% de reuso) em {len(self.stats)} rotas"
+
+    def report(self) -> List[str]:
+        """
+        Returns:
+            Uma linha por rota com conexões novas e taxa de reuso
+        """
+        return [
+            f"{proxy or 'direta'} | {s.new_connections} novas | {s.reuse_ratio * 100:.1f}% reuso"
+            for proxy, s in self.stats.items()
+        ]
+
+    async def close(self):
+        """Fecha todas as sessões"""
+        for session in self._sessions.values():
+            await session.close()
+        self._sessions.clear()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
@@ -0,0 +1,574 @@
+#!/usr/bin/env python3
+"""
+Coordenador Distribuído de Verificação
+Distribui faixas do espaço de domínios entre máquinas por leases com
+expiração; faixas de workers que morreram voltam para a fila
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import socket
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import aiohttp
+from aiohttp import web
+
+try:
+    from .keyspace import keyspace_for_pattern
+except ImportError:
+    from keyspace import keyspace_for_pattern
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE/COMMIT, para que dois processos não peguem a mesma faixa"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def __enter__(self):
+        self._conn.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, *args):
+        self._conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+class LeaseQueue:
+    """
+    Fila de faixas do espaço de domínios com leases, persistida em SQLite
+
+    O espaço do padrão é cortado em faixas [start, stop) de índices. Um
+    worker recebe uma faixa por vez com prazo de `lease_timeout` segundos,
+    que ele renova enquanto trabalha. Se o prazo vence (worker morto ou
+    sem rede), a faixa volta a ser entregue a quem pedir. Ao concluir, o
+    worker envia os resultados da faixa, que só são aceitos se ele ainda
+    for o dono do lease.
+
+    Uma faixa concluída com erros volta para a fila até `max_attempts`
+    entregas; na nova entrega, retry_domains() diz quais domínios ainda
+    faltam, para que os já resolvidos não sejam consultados de novo.
+
+    Como tudo fica no SQLite, o coordenador pode ser reiniciado sem perder
+    o andamento.
+    """
+
+    def __init__(self, path: str, lease_timeout: float = 120.0, max_attempts: int = 3):
+        """
+        Args:
+            path: Arquivo SQLite da fila
+            lease_timeout: Segundos até um lease não renovado expirar
+            max_attempts: Entregas de uma faixa com erros antes de ela ser
+                dada como concluída mesmo assim
+        """
+        self.path = Path(path)
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self._keyspace = None
+        self._conn = sqlite3.connect(str(self.path), isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS ranges ("
+            " id INTEGER PRIMARY KEY,"
+            " start INTEGER NOT NULL,"
+            " stop INTEGER NOT NULL,"
+            " state TEXT NOT NULL DEFAULT 'pending',"
+            " worker TEXT,"
+            " expires_at REAL NOT NULL DEFAULT 0,"
+            " attempts INTEGER NOT NULL DEFAULT 0);"
+            "CREATE INDEX IF NOT EXISTS ranges_state ON ranges (state, expires_at);"
+            "CREATE TABLE IF NOT EXISTS results ("
+            " domain TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " worker TEXT NOT NULL,"
+            " checked_at REAL NOT NULL);"
+        )
+
+    def setup(self, pattern: str, range_size: int = 1000) -> int:
+        """
+        Cria as faixas do padrão, se a fila ainda estiver vazia
+
+        Args:
+            pattern: Padrão de geração ('3letters', 'custom:abc', ...)
+            range_size: Domínios por faixa
+
+        Returns:
+            Quantidade total de domínios do padrão
+        """
+        if range_size < 1:
+            raise ValueError(f"Tamanho de faixa inválido: {range_size}")
+
+        total = keyspace_for_pattern(pattern).size
+        existing = self.pattern
+        if existing is not None:
+            if existing != pattern:
+                raise ValueError(f"A fila {self.path} pertence ao padrão '{existing}'")
+            return total
+
+        with self._transaction():
+            self._conn.execute("INSERT INTO meta VALUES ('pattern', ?)", (pattern,))
+            self._conn.executemany(
+                "INSERT INTO ranges (start, stop) VALUES (?, ?)",
+                ((start, min(start + range_size, total)) for start in range(0, total, range_size))
+            )
+        return total
+
+    @property
+    def pattern(self) -> Optional[str]:
+        """Padrão da varredura (None antes de setup)"""
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'pattern'").fetchone()
+        return row[0] if row else None
+
+    def _transaction(self):
+        return _Transaction(self._conn)
+
+    def lease(self, worker: str) -> Optional[Tuple[int, int, int]]:
+        """
+        Entrega a próxima faixa pendente ou com lease vencido
+
+        Args:
+            worker: Identificador do worker
+
+        Returns:
+            (id, start, stop) da faixa, ou None se não houver faixa livre
+        """
+        now = time.time()
+        with self._transaction():
+            row = self._conn.execute(
+                "SELECT id, start, stop FROM ranges"
+                " WHERE state = 'pending' OR (state = 'leased' AND expires_at <= ?)"
+                " ORDER BY id LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE ranges SET state = 'leased', worker = ?, expires_at = ?,"
+                " attempts = attempts + 1 WHERE id = ?",
+                (worker, now + self.lease_timeout, row[0])
+            )
+        return row
+
+    def renew(self, range_id: int, worker: str) -> bool:
+        """
+        Prorroga o lease de uma faixa
+
+        Returns:
+            False se o worker não é mais o dono do lease
+        """
+        cursor = self._conn.execute(
+            "UPDATE ranges SET expires_at = ?"
+            " WHERE id = ? AND worker = ? AND state = 'leased'",
+            (time.time() + self.lease_timeout, range_id, worker)
+        )
+        return cursor.rowcount == 1
+
+    def complete(
+        self,
+        range_id: int,
+        worker: str,
+        results: Sequence[Tuple[str, str]]
+    ) -> bool:
+        """
+        Grava os resultados de uma faixa e a marca como concluída
+
+        Se houver erros e a faixa ainda não tiver sido entregue
+        `max_attempts` vezes, ela volta a ficar pendente para os domínios
+        com erro serem verificados de novo.
+
+        Args:
+            range_id: Faixa concluída
+            worker: Identificador do worker
+            results: Pares (domínio, status) da faixa
+
+        Returns:
+            False se a faixa foi reatribuída a outro worker (resultados descartados)
+        """
+        now = time.time()
+        errors = any(status == "error" for _, status in results)
+        with self._transaction():
+            cursor = self._conn.execute(
+                "UPDATE ranges SET expires_at = 0,"
+                " state = CASE WHEN ? AND attempts < ? THEN 'pending' ELSE 'done' END"
+                " WHERE id = ? AND worker = ? AND state = 'leased'",
+                (errors, self.max_attempts, range_id, worker)
+            )
+            if cursor.rowcount != 1:
+                return False
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO results (domain, status, worker, checked_at)"
+                " VALUES (?, ?, ?, ?)",
+                ((domain, status, worker, now) for domain, status in results)
+            )
+        return True
+
+    def retry_domains(self, range_id: int) -> Optional[List[str]]:
+        """
+        Domínios de uma faixa ainda sem resultado definitivo
+
+        Args:
+            range_id: Faixa entregue
+
+        Returns:
+            None se a faixa nunca foi concluída (verificar a faixa inteira);
+            senão os domínios com erro ou sem resultado, na ordem do padrão
+        """
+        start, stop = self._conn.execute(
+            "SELECT start, stop FROM ranges WHERE id = ?", (range_id,)
+        ).fetchone()
+        if self._keyspace is None:
+            self._keyspace = keyspace_for_pattern(self.pattern)
+        domains = list(self._keyspace[start:stop])
+
+        statuses: Dict[str, str] = {}
+        for i in range(0, len(domains), 500):
+            chunk = domains[i:i + 500]
+            statuses.update(self._conn.execute(
+                f"SELECT domain, status FROM results WHERE domain IN ({','.join('?' * len(chunk))})",
+                chunk
+            ))
+        if not statuses:
+            return None
+        return [domain for domain in domains if statuses.get(domain, "error") == "error"]
+
+    def finished(self) -> bool:
+        """True quando todas as faixas foram concluídas"""
+        row = self._conn.execute("SELECT COUNT(*) FROM ranges WHERE state != 'done'").fetchone()
+        return row[0] == 0 and self.pattern is not None
+
+    def status(self) -> Dict[str, int]:
+        """
+        Returns:
+            Contagem de faixas por estado, faixas reatribuídas e resultados
+            por status
+        """
+        counts = {"pending": 0, "leased": 0, "done": 0}
+        counts.update(self._conn.execute("SELECT state, COUNT(*) FROM ranges GROUP BY state").fetchall())
+        counts["reassigned"] = self._conn.execute(
+            "SELECT COALESCE(SUM(attempts - 1), 0) FROM ranges WHERE attempts > 1"
+        ).fetchone()[0]
+        for status in ("available", "registered", "reserved", "invalid", "error"):
+            counts[status] = 0
+        counts.update(self._conn.execute("SELECT status, COUNT(*) FROM results GROUP BY status").fetchall())
+        return counts
+
+    def available(self) -> Iterator[str]:
+        """Domínios disponíveis encontrados até agora, lidos do banco sob demanda"""
+        rows = self._conn.execute("SELECT domain FROM results WHERE status = 'available'")
+        return (row[0] for row in rows)
+
+    def close(self):
+        """Fecha a conexão com o banco"""
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class CoordinatorServer:
+    """
+    Serviço HTTP (JSON) na frente de uma LeaseQueue
+
+    Rotas: POST /lease, POST /renew, POST /complete e GET /status.
+    """
+
+    def __init__(self, queue: LeaseQueue, host: str = "127.0.0.1", port: int = 8765):
+        """
+        Args:
+            queue: Fila de faixas já preparada com setup()
+            host: Endereço de escuta
+            port: Porta de escuta (0 escolhe uma livre)
+        """
+        self.queue = queue
+        self.host = host
+        self.port = port
+        self.url: Optional[str] = None
+        self._runner: Optional[web.AppRunner] = None
+
+        self.app = web.Application()
+        self.app.router.add_post("/lease", self._lease)
+        self.app.router.add_post("/renew", self._renew)
+        self.app.router.add_post("/complete", self._complete)
+        self.app.router.add_get("/status", self._status)
+
+    async def _lease(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        leased = self.queue.lease(body["worker"])
+        if leased is None:
+            return web.json_response({"range": None, "finished": self.queue.finished()})
+
+        range_id, start, stop = leased
+        return web.json_response({
+            "range": range_id,
+            "start": start,
+            "stop": stop,
+            "domains": self.queue.retry_domains(range_id),
+            "pattern": self.queue.pattern,
+            "lease_timeout": self.queue.lease_timeout,
+        })
+
+    async def _renew(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        return web.json_response({"ok": self.queue.renew(body["range"], body["worker"])})
+
+    async def _complete(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        results = [(domain, status) for domain, status in body["results"]]
+        return web.json_response({"ok": self.queue.complete(body["range"], body["worker"], results)})
+
+    async def _status(self, request: web.Request) -> web.Response:
+        return web.json_response(self.queue.status())
+
+    async def start(self) -> str:
+        """
+        Returns:
+            URL base do serviço
+        """
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = f"http://{self.host}:{port}"
+        return self.url
+
+    async def stop(self):
+        """Encerra o serviço"""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+class CoordinatorClient:
+    """Cliente HTTP do CoordinatorServer usado pelos workers"""
+
+    def __init__(self, url: str, session: aiohttp.ClientSession, retries: int = 5):
+        """
+        Args:
+            url: URL base do coordenador
+            session: Sessão aiohttp
+            retries: Tentativas por chamada antes de desistir
+        """
+        self.url = url.rstrip("/")
+        self.session = session
+        self.retries = retries
+
+    async def _post(self, path: str, payload: dict) -> dict:
+        for attempt in range(1, self.retries + 1):
+            try:
+                async with self.session.post(f"{self.url}{path}", json=payload) as resp:
+                    resp.raise_for_status()
+                    return await resp.json()
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if attempt == self.retries:
+                    raise
+                await asyncio.sleep(2 ** attempt)
+
+    async def lease(self, worker: str) -> dict:
+        """Pede uma faixa; {"range": None, "finished": bool} se não houver"""
+        return await self._post("/lease", {"worker": worker})
+
+    async def renew(self, range_id: int, worker: str) -> bool:
+        """Prorroga o lease; False se ele foi perdido"""
+        return (await self._post("/renew", {"range": range_id, "worker": worker}))["ok"]
+
+    async def complete(self, range_id: int, worker: str, results: List[Tuple[str, str]]) -> bool:
+        """Envia os resultados da faixa; False se o lease foi perdido"""
+        payload = {"range": range_id, "worker": worker, "results": results}
+        return (await self._post("/complete", payload))["ok"]
+
+
+def default_worker_id() -> str:
+    """Identificador padrão do worker: host e PID"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+async def run_worker(
+    checker,
+    url: str,
+    worker_id: str,
+    logger: logging.Logger,
+    poll_interval: float = 5.0
+) -> int:
+    """
+    Loop do worker: pede faixas ao coordenador, verifica e devolve os resultados
+
+    O `checker` (DomainChecker) é reutilizado entre as faixas, então
+    contadores, proxies e cache acumulam durante toda a execução. Enquanto
+    uma faixa é verificada, o lease é renovado a cada terço do prazo; se a
+    renovação falhar (o lease venceu e a faixa pode já estar com outro
+    worker), a verificação da faixa é interrompida e os resultados
+    parciais, descartados. Numa faixa devolvida por erros, só os domínios
+    que faltam são verificados.
+
+    Args:
+        checker: DomainChecker configurado
+        url: URL base do coordenador
+        worker_id: Identificador único do worker
+        logger: Logger
+        poll_interval: Espera (segundos) quando todas as faixas restantes
+            estão com outros workers
+
+    Returns:
+        Quantidade de faixas concluídas por este worker
+    """
+    completed = 0
+    keyspace = None
+
+    async with aiohttp.ClientSession() as session:
+        client = CoordinatorClient(url, session)
+        while True:
+            lease = await client.lease(worker_id)
+            if lease["range"] is None:
+                if lease["finished"]:
+                    break
+                await asyncio.sleep(poll_interval)
+                continue
+
+            range_id, start, stop = lease["range"], lease["start"], lease["stop"]
+            if keyspace is None:
+                keyspace = keyspace_for_pattern(lease["pattern"])
+            domains = lease.get("domains")
+            if domains is None:
+                domains = keyspace[start:stop]
+                logger.info(f"📦 Faixa {range_id} [{start}, {stop}) recebida do coordenador")
+            else:
+                logger.info(f"📦 Faixa {range_id} [{start}, {stop}) devolvida: {len(domains)} domínios a repetir")
+
+            results: List[Tuple[str, str]] = []
+            checker.on_result = lambda domain, status: results.append((domain, status))
+            scan = asyncio.ensure_future(checker.verify_domains(domains, None))
+            lost = False
+
+            async def keep_alive():
+                nonlocal lost
+                while True:
+                    await asyncio.sleep(lease["lease_timeout"] / 3)
+                    if not await client.renew(range_id, worker_id):
+                        logger.warning(f"⚠️ Lease da faixa {range_id} perdido; interrompendo a faixa")
+                        lost = True
+                        scan.cancel()
+                        return
+
+            renewer = asyncio.ensure_future(keep_alive())
+            try:
+                await scan
+            except asyncio.CancelledError:
+                if not lost:
+                    raise
+                continue
+            finally:
+                renewer.cancel()
+                await asyncio.gather(renewer, return_exceptions=True)
+                checker.on_result = None
+
+            if await client.complete(range_id, worker_id, results):
+                completed += 1
+            else:
+                logger.warning(f"⚠️ Faixa {range_id} foi reatribuída; resultados descartados")
+
+    logger.info(f"🏁 Coordenador sem faixas restantes; {completed} faixas concluídas")
+    return completed
+
+
+async def serve(
+    queue: LeaseQueue,
+    host: str,
+    port: int,
+    logger: logging.Logger,
+    progress_interval: float = 10.0
+):
+    """
+    Executa o coordenador até todas as faixas serem concluídas
+
+    Args:
+        queue: Fila preparada com setup()
+        host: Endereço de escuta
+        port: Porta de escuta
+        logger: Logger
+        progress_interval: Segundos entre linhas de progresso
+    """
+    server = CoordinatorServer(queue, host, port)
+    url = await server.start()
+    logger.info(f"🛰️ Coordenador em {url}")
+    try:
+        while not queue.finished():
+            await asyncio.sleep(progress_interval)
+            s = queue.status()
+            logger.info(
+                f"📊 Faixas: {s['done']} concluídas, {s['leased']} em andamento, "
+                f"{s['pending']} pendentes, {s['reassigned']} reatribuídas | "
+                f"Disponíveis: {s['available']} | Erros: {s['error']}"
+            )
+        # Dá tempo aos workers de receberem "finished" antes de sair
+        await asyncio.sleep(progress_interval)
+    finally:
+        await server.stop()
+
+
+def main():
+    """
+    Coordenador da linha de comando
+    """
+    try:
+        from .domain_checker_advanced import DomainChecker, setup_logging
+    except ImportError:
+        from domain_checker_advanced import DomainChecker, setup_logging
+
+    parser = argparse.ArgumentParser(
+        description='Coordenador distribuído do verificador de domínios .com.br',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exemplos de uso:
+
+  # Coordenador para 4 letras em faixas de 2000 domínios
+  python coordinator.py --pattern 4letters --range-size 2000 --host 0.0.0.0
+
+  # Em cada máquina, um worker apontando para o coordenador
+  python domain_checker_advanced.py --coordinator http://coordenador:8765
+        """
+    )
+    parser.add_argument('--pattern', default='3letters', help='Padrão de geração (padrão: 3letters)')
+    parser.add_argument('--db', default='coordinator.sqlite3', help='Arquivo SQLite da fila (padrão: coordinator.sqlite3)')
+    parser.add_argument('--host', default='127.0.0.1', help='Endereço de escuta (padrão: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='Porta de escuta (padrão: 8765)')
+    parser.add_argument('--range-size', type=int, default=1000, help='Domínios por faixa (padrão: 1000)')
+    parser.add_argument('--lease-timeout', type=float, default=120.0, help='Segundos até um lease expirar (padrão: 120)')
+    parser.add_argument(
+        '--max-range-attempts',
+        type=int,
+        default=3,
+        help='Entregas de uma faixa com erros antes de aceitá-la assim (padrão: 3)'
+    )
+    parser.add_argument('--output', default='disponiveis.csv', help='Arquivo de saída (padrão: disponiveis.csv)')
+    parser.add_argument('--log-file', help='Arquivo para salvar logs')
+    args = parser.parse_args()
+
+    logger = setup_logging(args.log_file)
+
+    with LeaseQueue(args.db, lease_timeout=args.lease_timeout, max_attempts=args.max_range_attempts) as queue:
+        try:
+            total = queue.setup(args.pattern, args.range_size)
+        except ValueError as e:
+            logger.error(f"❌ {e}")
+            sys.exit(1)
+        logger.info(f"📝 {total} domínios no padrão '{args.pattern}' ({args.db})")
+
+        try:
+            asyncio.run(serve(queue, args.host, args.port, logger))
+        except KeyboardInterrupt:
+            logger.info("\n⚠️ Coordenador interrompido; o andamento fica salvo em " + args.db)
+
+        DomainChecker(logger).save_results(args.output, queue.available())
+
+
+if __name__ == "__main__":
+    main()
@@ -7,22 +7,96 @@ Versão otimizada com proxy rotativo, logging em tempo real e retry logic
 import asyncio
 import aiohttp
 import itertools
-import csv
 import logging
 import argparse
 import sys
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Set
+from typing import Callable, Deque, Iterable, List, NamedTuple, Optional, Tuple, Union
+import heapq
+from collections import deque
 import random
+import time
+
+try:
+    from .adaptive import AdaptiveConcurrency
+    from .avail_parser import AVAILABLE, DEFINITIVE, LABELS, read_status
+    from .connection_pool import RoutePool
+    from .coordinator import default_worker_id, run_worker
+    from .hedging import HedgePolicy
+    from .journal import ScanJournal
+    from .keyspace import Keyspace, KeyspaceView, domain_chunks, keyspace_for_pattern, known_size
+    from .log_pipeline import SAMPLED, CompressingRotatingFileHandler, attach_handlers
+    from .metrics import ScanMetrics, serve_metrics_during
+    from .normalize import Normalizer
+    from .prefilter import DEFAULT_REFRESH_DAYS, KnownRegistered
+    from .progress import ProgressReporter, ProgressSnapshot, ProgressTracker, format_duration
+    from .proxy_pool import ProxyPool
+    from .rate_limiter import ProxyRateLimiter, TokenBucket
+    from .result_cache import (
+        DEFAULT_CACHE_PATH, DEFAULT_TTL_AVAILABLE, DEFAULT_TTL_TAKEN, ResultCache
+    )
+    from .scan_diff import main as diff_main
+    from .sharding import run_sharded
+    from .sinks import (
+        CheckResult, CsvSink, JsonlSink, ParquetSink, ResultSink, StdoutSink, available_csv
+    )
+    from .status_map import StatusMap, StatusMapSink
+except ImportError:
+    from adaptive import AdaptiveConcurrency
+    from avail_parser import AVAILABLE, DEFINITIVE, LABELS, read_status
+    from connection_pool import RoutePool
+    from coordinator import default_worker_id, run_worker
+    from hedging import HedgePolicy
+    from journal import ScanJournal
+    from keyspace import Keyspace, KeyspaceView, domain_chunks, keyspace_for_pattern, known_size
+    from log_pipeline import SAMPLED, CompressingRotatingFileHandler, attach_handlers
+    from metrics import ScanMetrics, serve_metrics_during
+    from normalize import Normalizer
+    from prefilter import DEFAULT_REFRESH_DAYS, KnownRegistered
+    from progress import ProgressReporter, ProgressSnapshot, ProgressTracker, format_duration
+    from proxy_pool import ProxyPool
+    from rate_limiter import ProxyRateLimiter, TokenBucket
+    from result_cache import (
+        DEFAULT_CACHE_PATH, DEFAULT_TTL_AVAILABLE, DEFAULT_TTL_TAKEN, ResultCache
+    )
+    from scan_diff import main as diff_main
+    from sharding import run_sharded
+    from sinks import (
+        CheckResult, CsvSink, JsonlSink, ParquetSink, ResultSink, StdoutSink, available_csv
+    )
+    from status_map import StatusMap, StatusMapSink
+
+# Domínios por consulta ao cache de resultados
+CACHE_LOOKUP_BATCH = 256
+
 
 # Configuração de logging
-def setup_logging(log_file: str = None) -> logging.Logger:
+def setup_logging(
+    log_file: str = None,
+    prefix: str = "",
+    console_level: int = logging.INFO,
+    max_bytes: int = 50 * 1024 * 1024,
+    backup_count: int = 5,
+    sample_rate: Optional[float] = None,
+    use_queue: bool = True
+) -> logging.Logger:
     """
     Configura logging para arquivo e console
 
+    Por padrão os registros passam por uma fila e são formatados e gravados
+    em uma thread dedicada (log_pipeline.py), sem I/O no event loop.
+
     Args:
         log_file: Caminho do arquivo de log (opcional)
+        prefix: Texto adicionado antes de cada mensagem (ex.: "[shard 1/4] ")
+        console_level: Nível mínimo das mensagens no console
+        max_bytes: Tamanho que dispara a rotação do arquivo (0 desativa);
+            os rotacionados são comprimidos (log.1.gz, ...)
+        backup_count: Arquivos rotacionados mantidos
+        sample_rate: Linhas por domínio (marcadas com SAMPLED) por segundo;
+            None não amostra
+        use_queue: False grava direto na thread que registra
 
     Returns:
         Logger configurado
@@ -32,32 +106,95 @@ def setup_logging(log_file: str = None) -> logging.Logger:
 
     # Formato do log
     formatter = logging.Formatter(
-        '%(asctime)s - %(levelname)s - %(message)s',
+        f'%(asctime)s - %(levelname)s - {prefix}%(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
 
     # Handler para console
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.INFO)
+    console_handler.setLevel(console_level)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    handlers: List[logging.Handler] = [console_handler]
 
-    # Handler para arquivo
+    # Handler para arquivo, com rotação por tamanho
     if log_file:
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        file_handler = CompressingRotatingFileHandler(log_file, max_bytes, backup_count)
         file_handler.setLevel(logging.DEBUG)
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
 
+    attach_handlers(logger, handlers, sample_rate=sample_rate, use_queue=use_queue)
     return logger
 
 
+class RetryQueue:
+    """
+    Fila de novas tentativas ordenada pelo horário de vencimento
+
+    Domínios que falharam aguardam aqui o fim do backoff sem ocupar uma
+    vaga de concorrência.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, str, int]] = []
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, domain: str, attempt: int, delay: float):
+        """
+        Agenda uma nova tentativa
+
+        Args:
+            domain: Domínio a verificar novamente
+            attempt: Índice da próxima tentativa
+            delay: Espera em segundos até a tentativa vencer
+        """
+        due = time.monotonic() + delay
+        heapq.heappush(self._heap, (due, next(self._seq), domain, attempt))
+
+    def time_until_due(self) -> Optional[float]:
+        """
+        Returns:
+            Segundos até a próxima tentativa vencer, ou None se a fila está vazia
+        """
+        if not self._heap:
+            return None
+        return max(0.0, self._heap[0][0] - time.monotonic())
+
+    def pop_due(self) -> List[Tuple[str, int]]:
+        """
+        Remove e retorna as tentativas já vencidas
+
+        Returns:
+            Lista de (domínio, tentativa) em ordem de vencimento
+        """
+        now = time.monotonic()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, _, domain, attempt = heapq.heappop(self._heap)
+            due.append((domain, attempt))
+        return due
+
+
+class RequestOutcome(NamedTuple):
+    """Resultado de uma requisição ao avail/raw"""
+
+    status: str  # status do avail_parser, ou 'timeout', 'connection', 'exception'
+    proxy: Optional[str]
+    latency: float
+    http_status: Optional[int] = None
+    error: Optional[Exception] = None
+
+
 class DomainChecker:
     """
     Classe para verificação assíncrona de domínios .com.br
     """
 
     API_URL = "https://registro.br/v2/ajax/avail/raw/"
+    SCHEDULERS = ("window", "batch")
 
     def __init__(
         self,
@@ -66,7 +203,26 @@ class DomainChecker:
         batch_size: int = 50,
         batch_delay: float = 1.0,
         timeout: int = 10,
-        max_retries: int = 3
+        max_retries: int = 3,
+        scheduler: str = "window",
+        journal: Optional[ScanJournal] = None,
+        cache: Optional[ResultCache] = None,
+        adaptive: bool = False,
+        min_concurrency: int = 1,
+        max_concurrency: int = 200,
+        max_rps: Optional[float] = None,
+        per_proxy_rps: Optional[float] = None,
+        burst: Optional[int] = None,
+        proxy_failure_threshold: int = 5,
+        proxy_cooldown: float = 30.0,
+        connections_per_host: Optional[int] = None,
+        keepalive_timeout: float = 30.0,
+        dns_ttl: int = 300,
+        on_result: Optional[Callable[[str, str], None]] = None,
+        sinks: Optional[List[ResultSink]] = None,
+        progress_interval: Optional[float] = 5.0,
+        hedge_ratio: float = 0.0,
+        prefilter: Optional[KnownRegistered] = None
     ):
         """
         Inicializa o verificador de domínios
@@ -75,30 +231,518 @@ class DomainChecker:
             logger: Logger para registrar eventos
             proxies: Lista de proxies para rotação (opcional)
             batch_size: Quantidade de requisições simultâneas
-            batch_delay: Delay entre lotes (segundos)
+            batch_delay: Delay entre lotes (segundos). No modo 'window', sem
+                max_rps, vira um ritmo contínuo de batch_size/batch_delay req/s
             timeout: Timeout para requisições (segundos)
             max_retries: Número máximo de tentativas em caso de erro
+            scheduler: 'window' (janela deslizante, padrão) ou 'batch'
+                (lotes com barreira, comportamento legado)
+            journal: Journal de checkpoint; domínios já resolvidos nele são
+                pulados e cada novo resultado é registrado (opcional)
+            cache: Cache persistente de resultados; acertos não fazem
+                requisição (opcional)
+            adaptive: Ajusta a concorrência por AIMD a partir de batch_size,
+                entre min_concurrency e max_concurrency (requer 'window')
+            min_concurrency: Limite mínimo do modo adaptativo
+            max_concurrency: Limite máximo do modo adaptativo
+            max_rps: Limite global de requisições por segundo (token bucket);
+                substitui batch_delay quando informado
+            per_proxy_rps: Limite de requisições por segundo de cada proxy
+            burst: Rajada máxima do limite global (padrão: um segundo de max_rps)
+            proxy_failure_threshold: Falhas consecutivas até ejetar um proxy
+            proxy_cooldown: Segundos até um proxy ejetado ser sondado
+            connections_per_host: Conexões simultâneas por host em cada rota
+                (padrão: a concorrência máxima)
+            keepalive_timeout: Segundos que uma conexão ociosa fica aberta
+            dns_ttl: Segundos de cache das resoluções DNS
+            on_result: Função chamada com (domínio, status) a cada resultado
+                final: 'available', 'registered', 'reserved', 'invalid' ou
+                'error' (opcional)
+            sinks: Saídas que recebem cada resultado final assim que ele sai
+                (CSV, JSONL, stdout; ver sinks.py)
+            progress_interval: Segundos entre linhas de progresso (None ou 0
+                desativa; o tracker continua em self.progress)
+            hedge_ratio: Fração máxima do tráfego em cópias hedged (ex.: 0.05);
+                uma tentativa mais lenta que o p95 recente ganha uma cópia por
+                outro proxy. 0 desativa; requer ao menos dois proxies
+            prefilter: Índice de domínios sabidamente registrados; os nomes
+                encontrados nele são pulados ou adiados, exceto no seu dia de
+                reverificação (opcional; ver prefilter.py)
         """
+        if scheduler not in self.SCHEDULERS:
+            raise ValueError(f"Scheduler desconhecido: {scheduler}")
+        if adaptive and scheduler != "window":
+            raise ValueError("O modo adaptativo requer o scheduler 'window'")
+
         self.logger = logger
         self.proxies = proxies or []
+        self.proxy_pool = ProxyPool(
+            self.proxies,
+            failure_threshold=proxy_failure_threshold,
+            cooldown=proxy_cooldown
+        )
         self.batch_size = batch_size
         self.batch_delay = batch_delay
         self.timeout = timeout
         self.max_retries = max_retries
-        self.disponiveis: Set[str] = set()
+        self.scheduler = scheduler
+        self.journal = journal
+        self.cache = cache
+        self.adaptive = adaptive
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.limiter: Optional[AdaptiveConcurrency] = None
+        self.max_rps = max_rps
+        self.per_proxy_rps = per_proxy_rps
+        self.burst = burst
+        self.rate_limiter: Optional[TokenBucket] = (
+            TokenBucket(max_rps, burst) if max_rps else None
+        )
+        self.proxy_rate_limiter: Optional[ProxyRateLimiter] = (
+            ProxyRateLimiter(per_proxy_rps) if per_proxy_rps else None
+        )
+        self.connections_per_host = connections_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_ttl = dns_ttl
+        self.routes: Optional[RoutePool] = None
+        self.connection_stats: Optional[RoutePool] = None
+        self.on_result = on_result
+        self.sinks: List[ResultSink] = list(sinks or [])
+        # Só contadores: os disponíveis em si vão para os sinks (--output)
+        self.disponiveis = 0
         self.verificados = 0
         self.erros = 0
+        self.retentativas = 0
+        self.progress_interval = progress_interval
+        self.hedging: Optional[HedgePolicy] = (
+            HedgePolicy(max_ratio=hedge_ratio) if hedge_ratio and len(self.proxies) > 1 else None
+        )
+        self.prefilter = prefilter
+        self.progress = ProgressTracker()
+        self.metrics = ScanMetrics()
+        self.metrics.concurrency_limit.collect = lambda: (
+            self.limiter.current_limit if self.limiter is not None else self.batch_size
+        )
 
     def get_proxy(self) -> Optional[str]:
         """
-        Retorna um proxy aleatório da lista
+        Retorna um proxy do pool, ponderado pela saúde
 
         Returns:
             URL do proxy ou None se não houver proxies
         """
-        if self.proxies:
-            return random.choice(self.proxies)
-        return None
+        return self.proxy_pool.choose()
+
+    async def _acquire_proxy(self) -> Optional[str]:
+        """
+        Escolhe o proxy da próxima tentativa e espera o seu limite de taxa
+
+        Chamado antes de entrar no semáforo: um proxy limitado não segura uma
+        vaga de concorrência enquanto espera.
+
+        Returns:
+            URL do proxy ou None se não houver proxies
+        """
+        proxy = self.get_proxy()
+        if self.proxy_rate_limiter is not None:
+            await self.proxy_rate_limiter.acquire(proxy)
+        return proxy
+
+    def retry_delay(self, attempt: int) -> float:
+        """
+        Calcula o backoff exponencial com jitter para a próxima tentativa
+
+        Args:
+            attempt: Índice da tentativa que falhou (0 = primeira)
+
+        Returns:
+            Espera em segundos, entre metade e o total de 2 ** attempt
+        """
+        base = 2 ** attempt
+        return base / 2 + random.uniform(0, base / 2)
+
+    async def _attempt(
+        self,
+        session: aiohttp.ClientSession,
+        domain: str,
+        attempt: int,
+        proxy: Optional[str]
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Executa uma única tentativa de verificação
+
+        Com hedging ativo, a tentativa pode disparar uma cópia por outro
+        proxy (ver _hedged_request); vale a primeira resposta definitiva.
+
+        Args:
+            session: Sessão aiohttp
+            domain: Nome do domínio a verificar
+            attempt: Índice da tentativa (0 = primeira)
+            proxy: Proxy da tentativa, já liberado pelo limite por proxy
+                (ver _acquire_proxy)
+
+        Returns:
+            (concluído, resultado): concluído é False quando a tentativa
+            falhou e deve ser repetida; resultado é o domínio se disponível
+        """
+        if self.hedging is None:
+            outcome = await self._request(session, domain, proxy)
+        else:
+            outcome = await self._hedged_request(session, domain, proxy)
+
+        status = outcome.status
+        if status in DEFINITIVE:
+            self._resolve(domain, status, outcome.latency, outcome.proxy, attempt + 1)
+            # Depois do registro: se um sink falhar, o domínio conta como erro
+            self.verificados += 1
+
+            if status == AVAILABLE:
+                self.logger.info("✅ %s DISPONÍVEL", domain)
+                return True, domain
+            self.logger.debug("❌ %s %s", domain, LABELS[status], extra=SAMPLED)
+            return True, None
+
+        self._count_failure(status, attempt)
+        if status == "timeout":
+            self.logger.warning(
+                "⏱️ %s - Timeout (tentativa %d/%d)", domain, attempt + 1, self.max_retries,
+                extra=SAMPLED
+            )
+        elif outcome.error is not None:
+            self.logger.warning(
+                "⚠️ %s - Erro: %.50s (tentativa %d/%d)",
+                domain, outcome.error, attempt + 1, self.max_retries,
+                extra=SAMPLED
+            )
+        else:
+            self.logger.warning(
+                "⚠️ %s - Status %d (%s) (tentativa %d/%d)",
+                domain, outcome.http_status, LABELS[status], attempt + 1, self.max_retries,
+                extra=SAMPLED
+            )
+        return False, None
+
+    async def _request(
+        self,
+        session: aiohttp.ClientSession,
+        domain: str,
+        proxy: Optional[str]
+    ) -> RequestOutcome:
+        """
+        Faz uma requisição ao avail/raw e contabiliza latência, métricas e saúde do proxy
+
+        O limite por proxy é respeitado pelo chamador (_acquire_proxy, ou a
+        verificação de token livre do hedging).
+
+        Args:
+            session: Sessão aiohttp
+            domain: Nome do domínio a verificar
+            proxy: Proxy da requisição (ou None)
+
+        Returns:
+            Resultado da requisição; erros de rede viram status 'timeout',
+            'connection' ou 'exception' em vez de exceções
+        """
+        route = self._session_for(proxy, session)
+        metrics = self.metrics
+        start = time.monotonic()
+        metrics.in_flight.inc()
+        try:
+            async with route.get(
+                self.API_URL + domain,
+                proxy=proxy,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            ) as resp:
+                status = await read_status(resp)
+                http_status = resp.status
+            metrics.responses.inc(str(http_status))
+            outcome = RequestOutcome(status, proxy, time.monotonic() - start, http_status)
+        except asyncio.TimeoutError:
+            outcome = RequestOutcome("timeout", proxy, time.monotonic() - start)
+        except Exception as e:
+            cause = "connection" if isinstance(e, aiohttp.ClientError) else "exception"
+            outcome = RequestOutcome(cause, proxy, time.monotonic() - start, error=e)
+        finally:
+            metrics.in_flight.dec()
+
+        ok = outcome.status in DEFINITIVE
+        self._observe_request(outcome.latency, outcome.status)
+        self._observe(outcome.latency, ok=ok, proxy=proxy)
+        if ok and self.hedging is not None:
+            self.hedging.observe(outcome.latency)
+        return outcome
+
+    async def _hedged_request(
+        self,
+        session: aiohttp.ClientSession,
+        domain: str,
+        proxy: Optional[str]
+    ) -> RequestOutcome:
+        """
+        Requisição com cópia: se a primária passar do atraso do HedgePolicy
+        (p95 recente), uma cópia sai por outro proxy saudável
+
+        A cópia só sai se houver orçamento (fração máxima do tráfego), outro
+        proxy saudável e, com --max-rps e --per-proxy-rps, tokens livres na
+        hora; caso contrário a primária segue sozinha. Vale a primeira resposta
+        definitiva; a outra requisição é cancelada.
+
+        Args:
+            session: Sessão aiohttp
+            domain: Nome do domínio a verificar
+            proxy: Proxy da requisição primária
+
+        Returns:
+            Resultado vencedor (ou o da primária, se nenhuma for definitiva)
+        """
+        hedging = self.hedging
+        hedging.on_primary()
+        primary = asyncio.ensure_future(self._request(session, domain, proxy))
+        tasks = [primary]
+        try:
+            delay = hedging.delay()
+            if delay is None:
+                return await primary
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return primary.result()
+
+            backup = self.proxy_pool.choose_other(proxy)
+            if backup is None:
+                return await primary
+            if self.rate_limiter is not None and self.rate_limiter.time_until_available() > 0:
+                return await primary
+            backup_bucket = (
+                self.proxy_rate_limiter.bucket(backup) if self.proxy_rate_limiter is not None else None
+            )
+            if backup_bucket is not None and backup_bucket.time_until_available() > 0:
+                return await primary
+            if not hedging.try_hedge():
+                return await primary
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire()
+            if backup_bucket is not None:
+                await backup_bucket.acquire()
+
+            self.metrics.hedges.inc("sent")
+            hedge = asyncio.ensure_future(self._request(session, domain, backup))
+            tasks.append(hedge)
+
+            pending = set(tasks)
+            outcome = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task.result()
+                    if outcome is None or (result.status in DEFINITIVE and outcome.status not in DEFINITIVE):
+                        outcome = result
+                if outcome.status in DEFINITIVE:
+                    break
+
+            if outcome.status in DEFINITIVE and hedge.done() and hedge.result() is outcome:
+                hedging.on_win()
+                self.metrics.hedges.inc("won")
+            return outcome
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _observe_request(self, latency: float, result: str):
+        """Registra a duração de uma requisição nas métricas e no progresso"""
+        self.metrics.request_duration.observe(latency, result)
+        self.progress.record_request(latency)
+
+    def _count_failure(self, cause: str, attempt: int):
+        """
+        Conta nas métricas a nova tentativa que a falha vai gerar
+
+        Args:
+            cause: 'rate_limited', 'error', 'unknown', 'timeout', 'connection'
+                ou 'exception'
+            attempt: Índice da tentativa que falhou; a última não é repetida
+        """
+        if attempt < self.max_retries - 1:
+            self.metrics.retries.inc(cause)
+
+    def _observe(self, latency: float, ok: bool, proxy: Optional[str] = None):
+        """
+        Repassa o resultado de uma tentativa ao controle adaptativo, ao pool de proxies e às métricas
+
+        Args:
+            latency: Duração da tentativa (segundos)
+            ok: True se a API respondeu 200
+            proxy: Proxy usado na tentativa (opcional)
+        """
+        self.metrics.proxy_requests.inc(proxy or "direct", "success" if ok else "failure")
+        if ok:
+            self.proxy_pool.record_success(proxy, latency)
+        else:
+            self.proxy_pool.record_failure(proxy)
+
+        if self.limiter is not None:
+            if ok:
+                self.limiter.on_success(latency)
+            else:
+                self.limiter.on_failure()
+
+    def _session_for(
+        self,
+        proxy: Optional[str],
+        session: aiohttp.ClientSession
+    ) -> aiohttp.ClientSession:
+        """
+        Escolhe a sessão da rota do proxy quando há pool de conexões ativo
+
+        Args:
+            proxy: Proxy da tentativa (ou None)
+            session: Sessão padrão, usada fora de verify_domains
+
+        Returns:
+            Sessão a usar na requisição
+        """
+        if self.routes is not None:
+            return self.routes.session(proxy)
+        return session
+
+    async def _probe_proxies(self, session: aiohttp.ClientSession):
+        """
+        Sonda periodicamente os proxies ejetados e readmite os que voltarem
+
+        Args:
+            session: Sessão aiohttp
+        """
+        async def check(proxy: str) -> bool:
+            async with self._session_for(proxy, session).get(
+                self.API_URL + "registro.br",
+                proxy=proxy,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            ) as resp:
+                ok = resp.status == 200
+            self.logger.info(f"🩺 Proxy {proxy} {'readmitido' if ok else 'continua fora'}")
+            return ok
+
+        interval = max(0.1, min(self.proxy_pool.cooldown, 5.0))
+        while True:
+            await asyncio.sleep(interval)
+            await self.proxy_pool.probe(check)
+
+    def _record(
+        self,
+        domain: str,
+        status: str,
+        latency: Optional[float] = None,
+        proxy: Optional[str] = None,
+        attempts: int = 0
+    ):
+        """Registra o resultado final de um domínio no journal, em on_result e nos sinks"""
+        self.metrics.results.inc(status)
+        self.progress.record_result(status)
+        if status == AVAILABLE:
+            self.disponiveis += 1
+        if self.journal is not None:
+            self.journal.record(domain, status)
+        if self.on_result is not None:
+            self.on_result(domain, status)
+        if self.sinks:
+            self._emit(CheckResult(domain, status, latency, proxy, attempts, time.time()))
+
+    def _emit(self, result: CheckResult):
+        """Entrega um resultado a todos os sinks"""
+        for sink in self.sinks:
+            sink.write(result)
+
+    def _resolve(
+        self,
+        domain: str,
+        status: str,
+        latency: Optional[float] = None,
+        proxy: Optional[str] = None,
+        attempts: int = 0
+    ):
+        """Registra um resultado obtido da API no journal, nos sinks e no cache"""
+        self._record(domain, status, latency, proxy, attempts)
+        # Erros não vão para o cache: o domínio é consultado de novo na próxima vez
+        if self.cache is not None and status in DEFINITIVE:
+            self.cache.store(domain, status)
+
+    def _fail_unexpected(self, domain: str, error: BaseException, attempts: int):
+        """
+        Registra como erro um domínio cuja verificação levantou uma exceção
+
+        O domínio ainda chega ao journal, aos sinks e aos contadores, para
+        que os totais fechem com a entrada. Uma segunda falha ao registrar
+        (por exemplo, o mesmo sink quebrado) só é logada.
+
+        Args:
+            domain: Domínio
+            error: Exceção levantada
+            attempts: Tentativas feitas
+        """
+        self.logger.error("❌ %s - Erro inesperado: %s", domain, error)
+        try:
+            self._give_up(domain, attempts=attempts)
+        except Exception as e:
+            self.logger.error("❌ %s - Falha ao registrar o erro: %s", domain, e)
+
+    async def _lookup_cache(self, domains: List[str]) -> List[str]:
+        """
+        Consulta o cache antes de ir à rede, um lote por vez e fora do event loop
+
+        Os acertos são registrados como resultados finais; erros em cache
+        (de versões antigas) contam como falta.
+
+        Args:
+            domains: Domínios a verificar
+
+        Returns:
+            Os domínios que não estavam em cache, na mesma ordem
+        """
+        if self.cache is None or not domains:
+            return domains
+
+        cached = await self.cache.lookup(domains)
+        misses = []
+        for domain in domains:
+            status = cached.get(domain)
+            if status in DEFINITIVE:
+                self._cache_hit(domain, status)
+            else:
+                self.metrics.cache_lookups.inc("miss")
+                misses.append(domain)
+        return misses
+
+    def _cache_hit(self, domain: str, status: str):
+        """Registra como resultado final um status definitivo vindo do cache"""
+        self.metrics.cache_lookups.inc("hit")
+        self.verificados += 1
+        if status == AVAILABLE:
+            self.logger.info("✅ %s DISPONÍVEL (cache)", domain)
+        else:
+            self.logger.debug("❌ %s %s (cache)", domain, LABELS.get(status, status), extra=SAMPLED)
+        self._record(domain, status)
+
+    def _on_prefilter(self, domain: str, route: str):
+        """Contabiliza um nome encontrado no índice de registrados"""
+        self.metrics.prefilter.inc(route)
+        if route == "skipped":
+            # Conta como concluído para o ETA, sem entrar na taxa
+            self.progress.skip(1)
+            self.logger.debug("🧱 %s - registrado conhecido, pulado", domain, extra=SAMPLED)
+
+    def _give_up(self, domain: str, attempts: Optional[int] = None):
+        """
+        Registra a falha definitiva de um domínio
+
+        Args:
+            domain: Domínio
+            attempts: Tentativas feitas (padrão: max_retries)
+        """
+        attempts = attempts if attempts is not None else self.max_retries
+        self.erros += 1
+        self.logger.error("❌ %s - Falha após %d tentativas", domain, attempts)
+        self._resolve(domain, "error", attempts=attempts)
 
     async def check_domain(
         self,
@@ -109,6 +753,9 @@ class DomainChecker:
         """
         Verifica se um domínio está disponível com retry logic
 
+        O semáforo é mantido apenas durante cada tentativa; a espera do
+        backoff acontece fora dele, liberando a vaga para outros domínios.
+
         Args:
             session: Sessão aiohttp
             domain: Nome do domínio a verificar
@@ -117,154 +764,448 @@ class DomainChecker:
         Returns:
             str: Nome do domínio se disponível, None caso contrário
         """
-        async with semaphore:
-            for attempt in range(self.max_retries):
-                try:
-                    proxy = self.get_proxy()
-                    timeout = aiohttp.ClientTimeout(total=self.timeout)
-
-                    async with session.get(
-                        self.API_URL + domain,
-                        proxy=proxy,
-                        timeout=timeout
-                    ) as resp:
-                        if resp.status == 200:
-                            data = await resp.text()
-                            self.verificados += 1
-
-                            if "disponível" in data.lower():
-                                self.logger.info(f"✅ {domain} DISPONÍVEL")
-                                return domain
-                            else:
-                                self.logger.debug(f"❌ {domain} ocupado")
-                                return None
-                        else:
-                            self.logger.warning(
-                                f"⚠️ {domain} - Status {resp.status} (tentativa {attempt + 1}/{self.max_retries})"
-                            )
-
-                except asyncio.TimeoutError:
-                    self.logger.warning(
-                        f"⏱️ {domain} - Timeout (tentativa {attempt + 1}/{self.max_retries})"
-                    )
-                except Exception as e:
-                    self.logger.warning(
-                        f"⚠️ {domain} - Erro: {str(e)[:50]} (tentativa {attempt + 1}/{self.max_retries})"
-                    )
+        if self.cache is not None:
+            status = (await self.cache.lookup([domain])).get(domain)
+            if status in DEFINITIVE:
+                self._cache_hit(domain, status)
+                return domain if status == AVAILABLE else None
+            self.metrics.cache_lookups.inc("miss")
+        return await self._check_uncached(session, domain, semaphore)
+
+    async def _check_uncached(
+        self,
+        session: aiohttp.ClientSession,
+        domain: str,
+        semaphore: asyncio.Semaphore
+    ) -> Optional[str]:
+        """check_domain() sem a consulta ao cache (já feita pelo chamador)"""
+        for attempt in range(self.max_retries):
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire()
 
-                # Espera exponencial entre tentativas
-                if attempt < self.max_retries - 1:
-                    await asyncio.sleep(2 ** attempt)
+            proxy = await self._acquire_proxy()
+            async with semaphore:
+                done, result = await self._attempt(session, domain, attempt, proxy)
 
-            # Falha após todas as tentativas
-            self.erros += 1
-            self.logger.error(f"❌ {domain} - Falha após {self.max_retries} tentativas")
-            return None
+            if done:
+                return result
+
+            # Espera exponencial entre tentativas (fora do semáforo)
+            if attempt < self.max_retries - 1:
+                self.retentativas += 1
+                await asyncio.sleep(self.retry_delay(attempt))
+
+        # Falha após todas as tentativas
+        self._give_up(domain)
+        return None
 
     async def verify_domains(
         self,
-        domains: List[str],
-        output_file: str = "disponiveis.csv"
+        domains: Iterable[str],
+        output_file: Optional[str] = "disponiveis.csv"
     ):
         """
-        Verifica uma lista de domínios de forma assíncrona
+        Verifica domínios de forma assíncrona
+
+        Os domínios são consumidos incrementalmente, então um Keyspace ou
+        gerador pode ser passado sem materializar a lista.
 
         Args:
-            domains: Lista de domínios a verificar
-            output_file: Arquivo para salvar resultados
+            domains: Domínios a verificar (lista, Keyspace ou qualquer iterável)
+            output_file: CSV de disponíveis, gravado durante a verificação
+                (None para não gravar, como na CLI, que usa um sink próprio,
+                e nos shards, cujo resultado é gravado pelo processo pai)
         """
-        total = len(domains)
-        self.logger.info(f"🚀 Iniciando verificação de {total} domínios")
-        self.logger.info(f"⚙️ Configuração: batch_size={self.batch_size}, delay={self.batch_delay}s")
+        total = known_size(domains)
+        self.logger.info(f"🚀 Iniciando verificação de {total if total is not None else '?'} domínios")
+        self.logger.info(
+            f"⚙️ Configuração: scheduler={self.scheduler}, "
+            f"batch_size={self.batch_size}, delay={self.batch_delay}s"
+        )
+        if self.max_rps:
+            self.logger.info(f"🚦 Limite global: {self.max_rps} req/s (rajada {self.rate_limiter.burst})")
+        if self.per_proxy_rps:
+            self.logger.info(f"🚦 Limite por proxy: {self.per_proxy_rps} req/s")
+        if self.adaptive:
+            self.logger.info(
+                f"📈 Concorrência adaptativa entre {self.min_concurrency} e {self.max_concurrency}"
+            )
 
         if self.proxies:
             self.logger.info(f"🔄 Usando {len(self.proxies)} proxies para rotação")
+        if self.hedging is not None:
+            self.logger.info(
+                f"🪃 Hedging: cópia por outro proxy após o p95, até {self.hedging.max_ratio:.0%} do tráfego"
+            )
+
+        output = None
+        if output_file:
+            output = available_csv(output_file)
+            self.sinks.append(output)
+
+        self.progress.start(total)
+        # Os domínios seguem em blocos (Keyspace.chunks), sem passar um a um
+        # por geradores até o scheduler
+        batches = domain_chunks(domains)
+        if self.journal is not None and len(self.journal):
+            self.logger.info(f"⏩ Retomando: {len(self.journal)} domínios já resolvidos no journal")
+            resumed_available = self.journal.counts["available"]
+            self.disponiveis += resumed_available
+            self.verificados += len(self.journal)
+            self.progress.skip(len(self.journal), available=resumed_available)
+            # Os sinks são recriados a cada execução: repõe o que já foi resolvido
+            if self.sinks:
+                for domain, status in self.journal.entries():
+                    self._emit(CheckResult(domain, status))
+            journal = self.journal
+            batches = ([domain for domain in chunk if domain not in journal] for chunk in batches)
+        if self.prefilter is not None:
+            self.logger.info(f"🧱 Pré-filtro: {self.prefilter.describe()}")
+            # O filtro vê a sequência inteira: no modo 'defer' os registrados
+            # ficam para o fim da varredura, não de cada bloco
+            batches = domain_chunks(
+                self.prefilter.filter(itertools.chain.from_iterable(batches), self._on_prefilter)
+            )
+
+        concurrency = self.max_concurrency if self.adaptive else self.batch_size
+        per_host = self.connections_per_host or concurrency
+        reporter = None
+        if self.progress_interval:
+            reporter = ProgressReporter(self.progress, self._log_progress, self.progress_interval)
+            reporter.start()
+        try:
+            async with RoutePool(
+                limit=max(concurrency, per_host),
+                limit_per_host=per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                dns_ttl=self.dns_ttl
+            ) as routes:
+                self.routes = self.connection_stats = routes
+                session = routes.session(None)
+                prober = None
+                if self.proxies:
+                    prober = asyncio.ensure_future(self._probe_proxies(session))
+                try:
+                    if self.scheduler == "batch":
+                        await self._run_batches(session, itertools.chain.from_iterable(batches))
+                    else:
+                        await self._run_window(session, batches)
+                finally:
+                    if prober is not None:
+                        prober.cancel()
+                        await asyncio.gather(prober, return_exceptions=True)
+        finally:
+            self.routes = None
+            if reporter is not None:
+                await reporter.stop()
+            if output is not None:
+                self.sinks.remove(output)
+            # Esperar as gravações pendentes bloqueia; numa thread, o event
+            # loop segue atendendo (ex.: a renovação do lease no coordinator)
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._flush_outputs, output)
 
-        semaphore = asyncio.Semaphore(self.batch_size)
-
-        async with aiohttp.ClientSession() as session:
-            tasks = []
-
-            for i, domain in enumerate(domains, 1):
-                task = self.check_domain(session, domain, semaphore)
-                tasks.append(task)
-
-                # Processa em lotes
-                if len(tasks) >= self.batch_size or i == total:
-                    results = await asyncio.gather(*tasks, return_exceptions=True)
-
-                    for result in results:
-                        if isinstance(result, str):
-                            self.disponiveis.add(result)
+        self.logger.info("=" * 60)
+        self.logger.info(f"✨ Verificação concluída!")
+        self.logger.info(f"📊 Total verificado: {self.verificados}/{total if total is not None else '?'}")
+        self.logger.info(f"✅ Domínios disponíveis: {self.disponiveis}")
+        self.logger.info(f"❌ Erros: {self.erros}")
+        self.logger.info(f"🔁 Novas tentativas: {self.retentativas}")
+        elapsed = self.progress.snapshot().elapsed
+        self.logger.info(
+            f"⏱️ Duração: {format_duration(elapsed)} "
+            f"({self.progress.requests / max(elapsed, 1e-9):.1f} req/s em média)"
+        )
+        if self.cache is not None:
+            self.logger.info(f"💾 Cache: {self.cache.summary()}")
+        if self.hedging is not None:
+            self.logger.info(f"🪃 Hedging: {self.hedging.summary()}")
+        if self.prefilter is not None:
+            self.logger.info(f"🧱 Pré-filtro: {self.prefilter.summary()}")
+        if self.connection_stats is not None:
+            self.logger.info(f"🔌 Conexões: {self.connection_stats.summary()}")
+        if self.proxies:
+            self.logger.info("🔄 Proxies:")
+            for line in self.proxy_pool.report():
+                self.logger.info(f"   {line}")
+            for line in self.connection_stats.report():
+                self.logger.info(f"   🔌 {line}")
+        if output is not None:
+            self.logger.info(f"💾 {output.written} domínios salvos em {output_file}")
+        for sink in self.sinks:
+            self.logger.info(f"💾 {sink.written} resultados gravados em: {sink!r}")
+        self.logger.info("=" * 60)
 
-                    # Log de progresso
-                    progress = (self.verificados / total) * 100
-                    self.logger.info(
-                        f"📊 Progresso: {self.verificados}/{total} ({progress:.1f}%) | "
-                        f"Disponíveis: {len(self.disponiveis)} | Erros: {self.erros}"
-                    )
+    def _flush_outputs(self, output: Optional[ResultSink] = None):
+        """
+        Grava o que ficou pendente no journal, no cache e nos sinks (bloqueante)
 
-                    tasks = []
+        Args:
+            output: CSV de disponíveis aberto por verify_domains, fechado ao final
+        """
+        if self.journal is not None:
+            self.journal.flush(force=True)
+        if self.cache is not None:
+            self.cache.flush()
+        for sink in self.sinks:
+            sink.flush()
+        if output is not None:
+            output.close()
+
+    def _log_progress(self, snapshot: ProgressSnapshot):
+        """Registra uma linha de progresso (chamado pelo ProgressReporter)"""
+        line = snapshot.format()
+        if self.limiter is not None:
+            line += f" | Limite: {self.limiter.current_limit}"
+        self.logger.info(line)
+
+    async def _run_batches(
+        self,
+        session: aiohttp.ClientSession,
+        domains: Iterable[str]
+    ):
+        """
+        Modo legado: dispara lotes de batch_size e aguarda todos terminarem
 
-                    # Pausa entre lotes (exceto no último)
-                    if i < total:
-                        await asyncio.sleep(self.batch_delay)
+        Args:
+            session: Sessão aiohttp
+            domains: Domínios a verificar
+        """
+        semaphore = asyncio.Semaphore(self.batch_size)
+        batches = iter(domains)
+        batch = list(itertools.islice(batches, self.batch_size))
+
+        while batch:
+            misses = await self._lookup_cache(batch)
+            results = await asyncio.gather(
+                *(self._check_uncached(session, domain, semaphore) for domain in misses),
+                return_exceptions=True
+            )
+            for domain, result in zip(misses, results):
+                if isinstance(result, Exception):
+                    self._fail_unexpected(domain, result, self.max_retries)
+
+            batch = list(itertools.islice(batches, self.batch_size))
+
+            # Pausa entre lotes (exceto no último); com max_rps o ritmo
+            # já é dado pelo token bucket
+            if batch and self.rate_limiter is None:
+                await asyncio.sleep(self.batch_delay)
+
+    async def _run_window(
+        self,
+        session: aiohttp.ClientSession,
+        batches: Iterable[List[str]]
+    ):
+        """
+        Janela deslizante: batch_size workers consomem uma fila de domínios
 
-        # Salva resultados
-        self.save_results(output_file)
+        Uma nova verificação começa assim que qualquer worker fica livre, de
+        modo que um domínio lento não segura os demais. O ritmo é controlado
+        separadamente pelo token bucket global (max_rps, ou
+        batch_size/batch_delay req/s sem rajada). Tentativas que falham vão para a
+        RetryQueue e voltam à fila quando vencem, sem ocupar um worker
+        durante o backoff.
 
-        self.logger.info("=" * 60)
-        self.logger.info(f"✨ Verificação concluída!")
-        self.logger.info(f"📊 Total verificado: {self.verificados}/{total}")
-        self.logger.info(f"✅ Domínios disponíveis: {len(self.disponiveis)}")
-        self.logger.info(f"❌ Erros: {self.erros}")
-        self.logger.info(f"💾 Resultados salvos em: {output_file}")
-        self.logger.info("=" * 60)
+        O produtor entrega cada bloco inteiro de uma vez (um deque.extend,
+        ou um por lote de consulta ao cache) e só busca o próximo quando a
+        fila baixa de 2 domínios por worker; os workers retiram com
+        popleft(), sem um queue.put/get por domínio.
 
-    def save_results(self, output_file: str):
+        Args:
+            session: Sessão aiohttp
+            batches: Listas de domínios a verificar (ver domain_chunks)
         """
-        Salva os domínios disponíveis em um arquivo CSV
+        if self.adaptive:
+            self.limiter = AdaptiveConcurrency(
+                initial=self.batch_size,
+                min_limit=self.min_concurrency,
+                max_limit=self.max_concurrency
+            )
+            semaphore = self.limiter
+            workers = self.max_concurrency
+        else:
+            semaphore = asyncio.Semaphore(self.batch_size)
+            workers = self.batch_size
+
+        # Domínios novos (tentativa 0) e novas tentativas vencidas, que têm prioridade
+        fresh: Deque[str] = deque()
+        due: Deque[Tuple[str, int]] = deque()
+        low_water = workers * 2
+        has_work = asyncio.Event()
+        refill = asyncio.Event()
+        retries = RetryQueue()
+        retry_ready = asyncio.Event()
+        finished = asyncio.Event()
+        pacer = self.rate_limiter
+        if pacer is None and self.batch_delay:
+            pacer = TokenBucket(self.batch_size / self.batch_delay, burst=1)
+        outstanding = 0
+        producer_done = False
+
+        def finish():
+            nonlocal outstanding
+            outstanding -= 1
+            if producer_done and outstanding == 0:
+                finished.set()
+
+        async def producer():
+            nonlocal outstanding, producer_done
+            for chunk in batches:
+                # Com cache, o bloco é consultado (e entregue) em lotes
+                pieces = [chunk] if self.cache is None else [
+                    chunk[i:i + CACHE_LOOKUP_BATCH] for i in range(0, len(chunk), CACHE_LOOKUP_BATCH)
+                ]
+                for piece in pieces:
+                    misses = await self._lookup_cache(piece)
+                    outstanding += len(misses)
+                    fresh.extend(misses)
+                    has_work.set()
+                    while len(fresh) > low_water:
+                        refill.clear()
+                        await refill.wait()
+
+            producer_done = True
+            if outstanding == 0:
+                finished.set()
+
+        async def retry_pump():
+            while True:
+                retry_ready.clear()
+                delay = retries.time_until_due()
+                if delay is None:
+                    await retry_ready.wait()
+                elif delay > 0:
+                    try:
+                        await asyncio.wait_for(retry_ready.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+
+                jobs = retries.pop_due()
+                if jobs:
+                    due.extend(jobs)
+                    has_work.set()
+
+        async def worker():
+            while True:
+                if due:
+                    domain, attempt = due.popleft()
+                elif fresh:
+                    domain, attempt = fresh.popleft(), 0
+                    if len(fresh) <= low_water:
+                        refill.set()
+                else:
+                    has_work.clear()
+                    await has_work.wait()
+                    continue
+
+                if pacer is not None:
+                    await pacer.acquire()
+                try:
+                    proxy = await self._acquire_proxy()
+                    async with semaphore:
+                        done, _ = await self._attempt(session, domain, attempt, proxy)
+                except Exception as e:
+                    self._fail_unexpected(domain, e, attempt + 1)
+                    finish()
+                    continue
+
+                if done:
+                    finish()
+                elif attempt < self.max_retries - 1:
+                    self.retentativas += 1
+                    retries.push(domain, attempt + 1, self.retry_delay(attempt))
+                    retry_ready.set()
+                else:
+                    self._give_up(domain)
+                    finish()
+
+        background = [asyncio.ensure_future(retry_pump())]
+        background += [asyncio.ensure_future(worker()) for _ in range(workers)]
+        try:
+            await producer()
+            await finished.wait()
+        finally:
+            for task in background:
+                task.cancel()
+            await asyncio.gather(*background, return_exceptions=True)
+
+    def save_results(self, output_file: str, domains: Iterable[str]):
+        """
+        Salva domínios disponíveis em um arquivo CSV, sem carregá-los todos
 
         Args:
             output_file: Caminho do arquivo de saída
+            domains: Domínios disponíveis (ex.: LeaseQueue.available())
         """
-        with open(output_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(['dominio', 'verificado_em'])
+        output = available_csv(output_file)
+        checked_at = time.time()
+        try:
+            for domain in domains:
+                output.write(CheckResult(domain, AVAILABLE, checked_at=checked_at))
+        finally:
+            output.close()
+
+        self.logger.info(f"💾 {output.written} domínios salvos em {output_file}")
 
-            timestamp = datetime.now().isoformat()
-            for domain in sorted(self.disponiveis):
-                writer.writerow([domain, timestamp])
 
-        self.logger.info(f"💾 {len(self.disponiveis)} domínios salvos em {output_file}")
+def generate_domains(pattern: str = "3letters", lazy: bool = False) -> Union[List[str], Keyspace]:
+    """
+    Gera domínios baseados no padrão
+
+    Args:
+        pattern: Padrão de geração ('3letters', '2letters', '4letters',
+            'custom:abc' ou 'mask:<máscara>'; ver keyspace.parse_mask)
+        lazy: Se True, retorna um Keyspace que gera os domínios sob demanda
+            (suporta .size e `in` sem materializar a lista)
+
+    Returns:
+        Lista de domínios gerados, ou Keyspace quando lazy=True
+    """
+    keyspace = keyspace_for_pattern(pattern)
+    if lazy:
+        return keyspace
+    domains: List[str] = []
+    for chunk in keyspace.chunks():
+        domains.extend(chunk)
+    return domains
 
 
-def generate_domains(pattern: str = "3letters") -> List[str]:
+def count_domains(pattern: str) -> int:
     """
-    Gera lista de domínios baseada no padrão
+    Conta os domínios de um padrão sem gerá-los
 
     Args:
-        pattern: Padrão de geração ('3letters', '2letters', '4letters', ou 'custom:abc')
+        pattern: Padrão de geração (mesmos valores de generate_domains)
 
     Returns:
-        Lista de domínios gerados
+        Quantidade de domínios
     """
-    if pattern == "3letters":
-        letras = 'abcdefghijklmnopqrstuvwxyz'
-        combos = itertools.product(letras, repeat=3)
-    elif pattern == "2letters":
-        letras = 'abcdefghijklmnopqrstuvwxyz'
-        combos = itertools.product(letras, repeat=2)
-    elif pattern == "4letters":
-        letras = 'abcdefghijklmnopqrstuvwxyz'
-        combos = itertools.product(letras, repeat=4)
-    elif pattern.startswith("custom:"):
-        letras = pattern.split(":", 1)[1]
-        combos = itertools.product(letras, repeat=3)
-    else:
-        raise ValueError(f"Padrão desconhecido: {pattern}")
+    return keyspace_for_pattern(pattern).size
+
+
+def load_domains(args: argparse.Namespace) -> Tuple[Iterable[str], Optional[Normalizer]]:
+    """
+    Abre a fonte de domínios de --input ou --pattern
+
+    Args:
+        args: Argumentos de main()
 
-    return [f"{''.join(combo)}.com.br" for combo in combos]
+    Returns:
+        (domínios, normalizer): iterador do arquivo de --input e o Normalizer
+        que o alimenta (para o resumo ao final), ou Keyspace de --pattern
+        (KeyspaceView com --shuffle) e None
+
+    Raises:
+        ValueError: Se o padrão for inválido
+    """
+    if getattr(args, "input", None):
+        normalizer = Normalizer()
+        return normalizer.read_file(args.input), normalizer
+    keyspace = generate_domains(args.pattern, lazy=True)
+    if getattr(args, "shuffle", None) is not None:
+        return keyspace.shuffled(args.shuffle), None
+    return keyspace, None
 
 
 def load_proxies(proxy_file: str) -> List[str]:
@@ -290,9 +1231,218 @@ def load_proxies(proxy_file: str) -> List[str]:
     return proxies
 
 
-def main():
+def create_checker(
+    args: argparse.Namespace,
+    logger: logging.Logger,
+    proxies: List[str],
+    journal: Optional[ScanJournal] = None,
+    cache: Optional[ResultCache] = None,
+    sinks: Optional[List[ResultSink]] = None,
+    workers: int = 1
+) -> DomainChecker:
     """
-    Função principal com argumentos de linha de comando
+    Cria um DomainChecker a partir dos argumentos da linha de comando
+
+    Com vários processos (--workers), os limites globais de taxa são
+    divididos entre eles para que o total continue respeitando --max-rps
+    e --per-proxy-rps.
+
+    Args:
+        args: Argumentos de main()
+        logger: Logger do processo
+        proxies: URLs dos proxies
+        journal: Journal de checkpoint (opcional)
+        cache: Cache de resultados (opcional)
+        sinks: Saídas de resultados (opcional; ver create_sinks)
+        workers: Quantidade de processos que dividem os limites
+
+    Returns:
+        Verificador configurado
+    """
+    checker = DomainChecker(
+        logger=logger,
+        proxies=proxies,
+        batch_size=args.batch_size,
+        batch_delay=args.batch_delay,
+        timeout=args.timeout,
+        max_retries=args.max_retries,
+        scheduler=args.scheduler,
+        journal=journal,
+        cache=cache,
+        adaptive=args.adaptive,
+        min_concurrency=args.min_concurrency,
+        max_concurrency=args.max_concurrency,
+        max_rps=args.max_rps / workers if args.max_rps else None,
+        per_proxy_rps=args.per_proxy_rps / workers if args.per_proxy_rps else None,
+        burst=args.burst,
+        proxy_failure_threshold=args.proxy_failures,
+        proxy_cooldown=args.proxy_cooldown,
+        connections_per_host=args.connections_per_host,
+        keepalive_timeout=args.keepalive,
+        dns_ttl=args.dns_ttl,
+        sinks=sinks,
+        progress_interval=args.progress_interval,
+        hedge_ratio=args.hedge / 100,
+        prefilter=KnownRegistered.load(
+            args.known, mode=args.known_mode, refresh_days=args.known_refresh_days
+        ) if args.known else None
+    )
+    checker.API_URL = args.api_url
+    return checker
+
+
+def create_sinks(
+    args: argparse.Namespace,
+    include_output: bool = True,
+    suffix: str = "",
+    keyspace: Optional[Keyspace] = None
+) -> List[ResultSink]:
+    """
+    Abre as saídas de resultados pedidas na linha de comando
+
+    Args:
+        args: Argumentos de main()
+        include_output: Inclui o CSV de disponíveis (--output); os shards
+            deixam essa saída para o processo pai
+        suffix: Sufixo dos arquivos de --results-csv/--results-jsonl (shards)
+        keyspace: Keyspace do padrão, para o mapa de status (--status-map),
+            que já deve ter sido criado por prepare_status_map()
+
+    Returns:
+        Sinks abertos; o chamador deve fechá-los
+    """
+    sinks: List[ResultSink] = []
+    if include_output:
+        sinks.append(available_csv(args.output))
+    if args.results_csv:
+        sinks.append(CsvSink(args.results_csv + suffix))
+    if args.results_jsonl:
+        sinks.append(JsonlSink(args.results_jsonl + suffix))
+    if args.results_parquet:
+        sinks.append(ParquetSink(args.results_parquet + suffix))
+    if args.stdout:
+        sinks.append(StdoutSink())
+    if getattr(args, "status_map", None) and keyspace is not None:
+        # Os shards gravam no mesmo arquivo, com trava por byte
+        status_map = StatusMap(
+            args.status_map, keyspace.size, args.pattern, resume=True, shared=args.workers > 1
+        )
+        sinks.append(StatusMapSink(status_map, keyspace))
+    return sinks
+
+
+def prepare_status_map(args: argparse.Namespace, keyspace: Keyspace) -> StatusMap:
+    """
+    Cria (ou, com --resume, valida) o arquivo de --status-map antes da
+    varredura, para que todos os processos abram o mesmo mapa
+
+    Args:
+        args: Argumentos de main()
+        keyspace: Keyspace do padrão
+
+    Returns:
+        Mapa aberto (o chamador fecha)
+
+    Raises:
+        ValueError: Se o keyspace for grande demais ou o mapa for de outro padrão
+    """
+    return StatusMap(args.status_map, keyspace.size, args.pattern, resume=args.resume)
+
+
+def run_sharded_scan(
+    args: argparse.Namespace,
+    logger: logging.Logger,
+    proxies: List[str],
+    total: Optional[int]
+):
+    """
+    Executa a verificação em --workers processos e grava a saída combinada
+
+    Args:
+        args: Argumentos de main() (com --journal já resolvido)
+        logger: Logger do processo pai
+        proxies: URLs dos proxies
+        total: Quantidade total de domínios do padrão (None com --input)
+    """
+    start = time.monotonic()
+    try:
+        merged = run_sharded(vars(args), proxies, args.workers, logger, total, args.output)
+    except KeyboardInterrupt:
+        # run_sharded já gravou o parcial; os journals dos shards permitem retomar
+        logger.info("\n⚠️ Verificação interrompida pelo usuário")
+        logger.info(f"⏩ Use --resume --workers {args.workers} para continuar")
+        sys.exit(0)
+
+    elapsed = time.monotonic() - start
+    logger.info("=" * 60)
+    logger.info(f"✨ Verificação concluída em {args.workers} processos!")
+    position = f"{merged.verificados}/{total}" if total is not None else f"{merged.verificados}"
+    logger.info(f"📊 Total verificado: {position} ({merged.verificados / max(elapsed, 1e-9):.1f}/s)")
+    logger.info(f"✅ Domínios disponíveis: {merged.disponiveis}")
+    logger.info(f"❌ Erros: {merged.erros}")
+    logger.info(f"🔁 Novas tentativas: {merged.retentativas}")
+    logger.info(f"💾 Resultados salvos em: {args.output}")
+    logger.info("=" * 60)
+
+
+def run_coordinated_worker(
+    args: argparse.Namespace,
+    logger: logging.Logger,
+    proxies: List[str]
+):
+    """
+    Trabalha como worker de um coordenador distribuído até acabarem as faixas
+
+    O padrão, as faixas e o checkpoint ficam no coordenador, então não há
+    journal local; o cache de resultados continua valendo.
+
+    Args:
+        args: Argumentos de main()
+        logger: Logger do worker
+        proxies: URLs dos proxies deste worker
+    """
+    worker_id = args.worker_id or default_worker_id()
+    logger.info(f"🛰️ Worker {worker_id} conectando ao coordenador {args.coordinator}")
+
+    try:
+        sinks = create_sinks(args)
+    except ImportError as e:
+        logger.error(f"❌ {e}")
+        sys.exit(1)
+
+    cache = None
+    if args.cache:
+        cache = ResultCache(
+            args.cache_file,
+            ttl_taken=args.cache_ttl_taken,
+            ttl_available=args.cache_ttl_available,
+            max_entries=args.cache_max_entries
+        )
+
+    checker = create_checker(args, logger, proxies, cache=cache, sinks=sinks)
+    try:
+        asyncio.run(serve_metrics_during(
+            run_worker(checker, args.coordinator, worker_id, logger),
+            checker.metrics, args.metrics_port, logger=logger
+        ))
+    except KeyboardInterrupt:
+        # A faixa em andamento volta para a fila quando o lease expirar
+        logger.info("\n⚠️ Worker interrompido pelo usuário")
+        sys.exit(0)
+    except Exception as e:
+        logger.error(f"❌ Erro fatal: {e}", exc_info=True)
+        sys.exit(1)
+    finally:
+        for sink in sinks:
+            sink.close()
+        if cache is not None:
+            cache.close()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Returns:
+        Parser de argumentos da linha de comando
     """
     parser = argparse.ArgumentParser(
         description='Verificador Assíncrono de Domínios .com.br - Versão Avançada',
@@ -315,15 +1465,74 @@ Exemplos de uso:
   # Domínios de 2 letras
   python domain_checker_advanced.py --pattern 2letters
 
+  # Máscara: 'loja' + 2 letras em .com.br, .net.br e .org.br
+  python domain_checker_advanced.py --pattern 'mask:loja?l?l.{com,net,org}.br'
+
+  # Palavras de um arquivo seguidas de 2 dígitos
+  python domain_checker_advanced.py --pattern 'mask:<palavras.txt>?d?d'
+
+  # Verificar uma lista própria (normalizada e sem repetidos)
+  python domain_checker_advanced.py --input candidatos.txt
+
+  # Pular os já registrados em varreduras anteriores (ver prefilter.py)
+  python prefilter.py resultados.jsonl --output registrados.bloom
+  python domain_checker_advanced.py --pattern 4letters --known registrados.bloom
+
   # Especificar arquivo de saída
   python domain_checker_advanced.py --output dominios_disponiveis.csv
+
+  # Retomar uma verificação interrompida (usa o journal da saída)
+  python domain_checker_advanced.py --pattern 4letters --resume
+
+  # Limitar a 20 req/s no total e 2 req/s por proxy
+  python domain_checker_advanced.py --proxy-file proxies.txt --max-rps 20 --per-proxy-rps 2
+
+  # Concorrência adaptativa: começa em 50 e ajusta entre 5 e 300
+  python domain_checker_advanced.py --adaptive --min-concurrency 5 --max-concurrency 300
+
+  # Reaproveitar resultados recentes do cache (ocupados por 7 dias, disponíveis por 1 hora)
+  python domain_checker_advanced.py --cache
+
+  # Worker de uma varredura distribuída (ver coordinator.py)
+  python domain_checker_advanced.py --coordinator http://coordenador:8765
+
+  # 4 letras em 8 processos (um shard do padrão por processo)
+  python domain_checker_advanced.py --pattern 4letters --workers 8 --max-rps 400
+
+  # Métricas Prometheus em http://127.0.0.1:9108/metrics durante a varredura
+  python domain_checker_advanced.py --pattern 4letters --metrics-port 9108
+
+  # Cortar a cauda de latência: cópia por outro proxy em até 5% das tentativas
+  python domain_checker_advanced.py --proxy-file proxies.txt --hedge 5
+
+  # Modo legado em lotes (aguarda cada lote terminar)
+  python domain_checker_advanced.py --scheduler batch
+
+  # O que mudou desde a varredura de ontem (mapas de --status-map)
+  python domain_checker_advanced.py diff ontem.status hoje.status
         """
     )
 
-    parser.add_argument(
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument(
         '--pattern',
         default='3letters',
-        help='Padrão de geração: 3letters, 2letters, 4letters, ou custom:abc (padrão: 3letters)'
+        help="Padrão de geração: 3letters, 2letters, 4letters, custom:abc ou mask:MÁSCARA "
+             "(ex.: 'mask:?l?l?d', 'mask:loja?l?l.{com,net}.br', 'mask:<palavras.txt>?d'; "
+             "ver README) (padrão: 3letters)"
+    )
+    source.add_argument(
+        '--input',
+        metavar='ARQUIVO',
+        help='Arquivo com um domínio por linha (- para a entrada padrão), no lugar de --pattern; '
+             'normalizado, validado e sem repetidos antes de qualquer requisição'
+    )
+    parser.add_argument(
+        '--shuffle',
+        type=int,
+        metavar='SEMENTE',
+        help='Percorre o padrão numa ordem embaralhada e reproduzível (a mesma semente '
+             'dá a mesma ordem; use a mesma no --resume)'
     )
     parser.add_argument(
         '--batch-size',
@@ -337,6 +1546,60 @@ Exemplos de uso:
         default=1.0,
         help='Delay entre lotes em segundos (padrão: 1.0)'
     )
+    parser.add_argument(
+        '--scheduler',
+        choices=DomainChecker.SCHEDULERS,
+        default='window',
+        help='Agendamento: window (janela deslizante) ou batch (lotes com barreira) (padrão: window)'
+    )
+    parser.add_argument(
+        '--max-rps',
+        type=float,
+        help='Limite global de requisições por segundo; substitui --batch-delay'
+    )
+    parser.add_argument(
+        '--per-proxy-rps',
+        type=float,
+        help='Limite de requisições por segundo de cada proxy'
+    )
+    parser.add_argument(
+        '--burst',
+        type=int,
+        help='Rajada máxima do limite global (padrão: um segundo de --max-rps)'
+    )
+    parser.add_argument(
+        '--adaptive',
+        action='store_true',
+        help='Ajusta a concorrência automaticamente (AIMD) a partir de --batch-size'
+    )
+    parser.add_argument(
+        '--min-concurrency',
+        type=int,
+        default=1,
+        help='Concorrência mínima no modo adaptativo (padrão: 1)'
+    )
+    parser.add_argument(
+        '--max-concurrency',
+        type=int,
+        default=200,
+        help='Concorrência máxima no modo adaptativo (padrão: 200)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Processos em paralelo, cada um com um shard do padrão (padrão: 1)'
+    )
+    parser.add_argument(
+        '--coordinator',
+        metavar='URL',
+        help='Trabalha como worker de um coordenador distribuído (coordinator.py); '
+             'o padrão e as faixas vêm dele'
+    )
+    parser.add_argument(
+        '--worker-id',
+        help='Identificador do worker no coordenador (padrão: host-pid)'
+    )
     parser.add_argument(
         '--timeout',
         type=int,
@@ -353,25 +1616,237 @@ Exemplos de uso:
         '--proxy-file',
         help='Arquivo com lista de proxies (um por linha)'
     )
+    parser.add_argument(
+        '--proxy-failures',
+        type=int,
+        default=5,
+        help='Falhas consecutivas até ejetar um proxy (padrão: 5)'
+    )
+    parser.add_argument(
+        '--proxy-cooldown',
+        type=float,
+        default=30.0,
+        help='Segundos até sondar um proxy ejetado (padrão: 30)'
+    )
+    parser.add_argument(
+        '--hedge',
+        type=float,
+        default=0.0,
+        metavar='PCT',
+        help='Tentativas mais lentas que o p95 recente ganham uma cópia por outro proxy; '
+             'vale a primeira resposta. Limita as cópias a PCT%% do tráfego (ex.: 5). '
+             'Requer ao menos dois proxies (padrão: 0, desativado)'
+    )
+    parser.add_argument(
+        '--connections-per-host',
+        type=int,
+        help='Conexões simultâneas por host em cada rota (padrão: a concorrência máxima)'
+    )
+    parser.add_argument(
+        '--keepalive',
+        type=float,
+        default=30.0,
+        help='Segundos que uma conexão ociosa fica aberta para reuso (padrão: 30)'
+    )
+    parser.add_argument(
+        '--dns-ttl',
+        type=int,
+        default=300,
+        help='Segundos de cache das resoluções DNS (padrão: 300)'
+    )
+    parser.add_argument(
+        '--api-url',
+        default=DomainChecker.API_URL,
+        help='Endpoint de disponibilidade (padrão: API do Registro.br)'
+    )
     parser.add_argument(
         '--output',
         default='disponiveis.csv',
         help='Arquivo de saída para domínios disponíveis (padrão: disponiveis.csv)'
     )
+    parser.add_argument(
+        '--results-csv',
+        metavar='ARQUIVO',
+        help='Grava todos os resultados (disponível, registrado, reservado, inválido, erro) em CSV'
+    )
+    parser.add_argument(
+        '--results-jsonl',
+        metavar='ARQUIVO',
+        help='Grava todos os resultados em JSON Lines, conforme saem'
+    )
+    parser.add_argument(
+        '--results-parquet',
+        metavar='ARQUIVO',
+        help='Grava todos os resultados em Parquet (colunas tipadas, requer pyarrow)'
+    )
+    parser.add_argument(
+        '--status-map',
+        metavar='ARQUIVO',
+        help='Grava o status de cada índice do padrão em 2 bits num arquivo mapeado '
+             '(~112 KiB para 4 letras), legível durante a varredura com status_map.py'
+    )
+    parser.add_argument(
+        '--stdout',
+        action='store_true',
+        help='Imprime cada domínio disponível assim que encontrado'
+    )
+    parser.add_argument(
+        '--progress-interval',
+        type=float,
+        default=5.0,
+        metavar='S',
+        help='Segundos entre linhas de progresso, 0 desativa (padrão: 5)'
+    )
+    parser.add_argument(
+        '--metrics-port',
+        type=int,
+        metavar='PORTA',
+        help='Expõe métricas no formato Prometheus em http://127.0.0.1:PORTA/metrics '
+             '(com --workers, o shard i usa PORTA+i)'
+    )
+    parser.add_argument(
+        '--journal',
+        help='Journal de checkpoint dos domínios resolvidos (padrão: <output>.journal)'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Retoma a partir do journal, pulando domínios já resolvidos'
+    )
+    parser.add_argument(
+        '--cache-file',
+        default=str(DEFAULT_CACHE_PATH),
+        help=f'Cache persistente de resultados usado com --cache (padrão: {DEFAULT_CACHE_PATH})'
+    )
+    parser.add_argument(
+        '--cache',
+        action='store_true',
+        help='Reaproveita resultados recentes do cache persistente sem consultar a API '
+             '(erros nunca entram no cache)'
+    )
+    parser.add_argument(
+        '--cache-ttl-taken',
+        type=float,
+        default=DEFAULT_TTL_TAKEN,
+        help=f'TTL em segundos de domínios ocupados (padrão: {DEFAULT_TTL_TAKEN})'
+    )
+    parser.add_argument(
+        '--cache-ttl-available',
+        type=float,
+        default=DEFAULT_TTL_AVAILABLE,
+        help=f'TTL em segundos de domínios disponíveis (padrão: {DEFAULT_TTL_AVAILABLE})'
+    )
+    parser.add_argument(
+        '--cache-max-entries',
+        type=int,
+        default=1_000_000,
+        help='Quantidade máxima de entradas no cache (padrão: 1000000)'
+    )
+    parser.add_argument(
+        '--known',
+        metavar='ARQUIVO',
+        help='Índice de domínios sabidamente registrados (montado com prefilter.py); '
+             'esses nomes não são consultados, exceto no seu dia de reverificação'
+    )
+    parser.add_argument(
+        '--known-mode',
+        choices=KnownRegistered.MODES,
+        default='skip',
+        help="'skip' pula os registrados conhecidos; 'defer' os consulta depois de todos os outros (padrão: skip)"
+    )
+    parser.add_argument(
+        '--known-refresh-days',
+        type=int,
+        default=DEFAULT_REFRESH_DAYS,
+        help=f'Cada registrado conhecido é reverificado uma vez a cada N dias; 0 nunca (padrão: {DEFAULT_REFRESH_DAYS})'
+    )
     parser.add_argument(
         '--log-file',
         help='Arquivo para salvar logs (padrão: domain_checker_YYYYMMDD_HHMMSS.log)'
     )
+    parser.add_argument(
+        '--log-max-mb',
+        type=float,
+        default=50.0,
+        help='Tamanho em MB que dispara a rotação do log; os antigos são '
+             'comprimidos com gzip, 0 desativa (padrão: 50)'
+    )
+    parser.add_argument(
+        '--log-backups',
+        type=int,
+        default=5,
+        help='Arquivos de log rotacionados mantidos (padrão: 5)'
+    )
+    parser.add_argument(
+        '--log-sample-rate',
+        type=float,
+        default=50.0,
+        help='Máximo de linhas por domínio (tentativas, ocupados) por segundo no log; '
+             'disponíveis e erros finais sempre saem, 0 desativa (padrão: 50)'
+    )
+    parser.add_argument(
+        '--log-sync',
+        action='store_true',
+        help='Grava o log na própria thread do event loop, sem fila'
+    )
+    return parser
+
 
+def logging_options(args: argparse.Namespace) -> dict:
+    """
+    Args:
+        args: Argumentos de main()
+
+    Returns:
+        Parâmetros de setup_logging vindos de --log-max-mb, --log-backups,
+        --log-sample-rate e --log-sync
+    """
+    return {
+        "max_bytes": int(args.log_max_mb * 1024 * 1024),
+        "backup_count": args.log_backups,
+        "sample_rate": args.log_sample_rate or None,
+        "use_queue": not args.log_sync,
+    }
+
+
+def main():
+    """
+    Função principal com argumentos de linha de comando
+    """
+    # Subcomando: diff entre mapas de status de duas varreduras
+    if sys.argv[1:2] == ['diff']:
+        diff_main(sys.argv[2:])
+        return
+
+    parser = build_parser()
     args = parser.parse_args()
 
+    if args.adaptive and args.scheduler != 'window':
+        parser.error('--adaptive requer --scheduler window')
+    if args.workers < 1:
+        parser.error('--workers deve ser pelo menos 1')
+    if not 0 <= args.hedge <= 100:
+        parser.error('--hedge deve estar entre 0 e 100')
+    if args.coordinator and args.workers > 1:
+        parser.error('--coordinator não pode ser combinado com --workers')
+    if args.coordinator and args.input:
+        parser.error('--coordinator não pode ser combinado com --input (o padrão vem do coordenador)')
+    if args.known and not Path(args.known).is_file():
+        parser.error(f'--known: índice não encontrado: {args.known}')
+    if args.status_map and (args.input or args.coordinator):
+        parser.error('--status-map só se aplica a --pattern local')
+    if args.shuffle is not None and (args.input or args.coordinator):
+        parser.error('--shuffle só se aplica a --pattern local')
+    if args.input == '-' and args.workers > 1:
+        parser.error('--input - (entrada padrão) não pode ser combinado com --workers')
+
     # Configurar arquivo de log padrão
     if not args.log_file:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         args.log_file = f'domain_checker_{timestamp}.log'
 
     # Configurar logging
-    logger = setup_logging(args.log_file)
+    logger = setup_logging(args.log_file, **logging_options(args))
 
     logger.info("=" * 60)
     logger.info("🔍 Verificador Assíncrono de Domínios .com.br - Versão Avançada")
@@ -386,35 +1861,91 @@ Exemplos de uso:
         else:
             logger.warning(f"⚠️ Nenhum proxy encontrado em {args.proxy_file}")
 
-    # Gerar lista de domínios
+    if args.coordinator:
+        run_coordinated_worker(args, logger, proxies)
+        return
+
+    # Gerar domínios sob demanda (sem materializar a lista)
     try:
-        domains = generate_domains(args.pattern)
-        logger.info(f"📝 {len(domains)} domínios gerados com padrão '{args.pattern}'")
+        domains, normalizer = load_domains(args)
     except ValueError as e:
         logger.error(f"❌ Erro ao gerar domínios: {e}")
         sys.exit(1)
+    if normalizer is not None:
+        if args.input != '-' and not Path(args.input).is_file():
+            logger.error(f"❌ Arquivo de entrada não encontrado: {args.input}")
+            sys.exit(1)
+        logger.info(f"📝 Domínios lidos de {args.input}")
+    else:
+        logger.info(f"📝 {domains.size} domínios no padrão '{args.pattern}' ({domains.mask()})")
+
+    # Mapa de status: índices do padrão na ordem original, mesmo com --shuffle
+    keyspace = None
+    if args.status_map and normalizer is None:
+        keyspace = domains.keyspace if isinstance(domains, KeyspaceView) else domains
+        try:
+            with prepare_status_map(args, keyspace) as status_map:
+                resolved = status_map.size - status_map.counts()["unknown"]
+        except ValueError as e:
+            logger.error(f"❌ {e}")
+            sys.exit(1)
+        logger.info(f"🗺️ Mapa de status: {args.status_map} ({resolved} índices já resolvidos)")
+
+    # Journal de checkpoint
+    journal_file = args.journal or f"{args.output}.journal"
+
+    if args.workers > 1:
+        args.journal = journal_file
+        run_sharded_scan(args, logger, proxies, domains.size if normalizer is None else None)
+        return
+
+    # Saídas em fluxo: cada resultado é gravado assim que sai
+    try:
+        sinks = create_sinks(args, keyspace=keyspace)
+    except ImportError as e:
+        logger.error(f"❌ {e}")
+        sys.exit(1)
+
+    journal = ScanJournal(journal_file, resume=args.resume)
+    if args.resume:
+        logger.info(f"📒 Journal {journal_file}: {len(journal)} domínios já resolvidos")
+    else:
+        logger.info(f"📒 Journal de checkpoint: {journal_file}")
+
+    # Cache de resultados
+    cache = None
+    if args.cache:
+        cache = ResultCache(
+            args.cache_file,
+            ttl_taken=args.cache_ttl_taken,
+            ttl_available=args.cache_ttl_available,
+            max_entries=args.cache_max_entries
+        )
+        logger.info(f"💾 Cache de resultados: {args.cache_file} ({len(cache)} entradas)")
 
     # Criar verificador
-    checker = DomainChecker(
-        logger=logger,
-        proxies=proxies,
-        batch_size=args.batch_size,
-        batch_delay=args.batch_delay,
-        timeout=args.timeout,
-        max_retries=args.max_retries
-    )
+    checker = create_checker(args, logger, proxies, journal=journal, cache=cache, sinks=sinks)
 
     # Executar verificação
     try:
-        asyncio.run(checker.verify_domains(domains, args.output))
+        asyncio.run(serve_metrics_during(
+            checker.verify_domains(domains, None), checker.metrics, args.metrics_port, logger=logger
+        ))
     except KeyboardInterrupt:
         logger.info("\n⚠️ Verificação interrompida pelo usuário")
-        if checker.disponiveis:
-            checker.save_results(args.output)
+        logger.info(f"⏩ Use --resume para continuar a partir de {journal_file}")
         sys.exit(0)
     except Exception as e:
         logger.error(f"❌ Erro fatal: {e}", exc_info=True)
         sys.exit(1)
+    finally:
+        for sink in sinks:
+            sink.close()
+        journal.close()
+        if cache is not None:
+            cache.close()
+        if normalizer is not None:
+            logger.info(f"🧹 Entrada: {normalizer.summary()}")
 
 
 if __name__ == "__main__":
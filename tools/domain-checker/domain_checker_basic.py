@@ -9,6 +9,8 @@ import aiohttp
 import itertools
 import csv
 
+from avail_parser import AVAILABLE, LABELS, read_status
+
 API_URL = "https://registro.br/v2/ajax/avail/raw/"  # endpoint interno usado pelo site do registro.br
 
 async def check_domain(session, domain):
@@ -24,12 +26,12 @@ async def check_domain(session, domain):
     """
     try:
         async with session.get(API_URL + domain) as resp:
-            data = await resp.text()
-            if "disponível" in data.lower():
+            status = await read_status(resp)
+            if status == AVAILABLE:
                 print(f"✅ {domain} disponível")
                 return domain
             else:
-                print(f"❌ {domain} ocupado")
+                print(f"❌ {domain} {LABELS[status]}")
                 return None
     except Exception as e:
         print(f"⚠️ Erro ao verificar {domain}: {e}")
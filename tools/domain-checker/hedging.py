@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Requisições Hedged (duplicadas sob demanda)
+Se uma consulta demora mais que o p95 recente, uma cópia sai por outro
+proxy e vale a primeira resposta; as cópias são limitadas a uma fração do
+tráfego
+"""
+
+import time
+from collections import deque
+from typing import Callable, Deque, Optional
+
+
+class HedgePolicy:
+    """
+    Decide quando e se uma requisição lenta ganha uma cópia
+
+    O atraso é o percentil `percentile` das latências bem-sucedidas
+    recentes, recalculado no máximo a cada `refresh` segundos para não
+    ordenar amostras a cada requisição. Cada cópia consome orçamento: só há
+    hedge enquanto cópias <= `max_ratio` das requisições primárias, então o
+    tráfego extra fica limitado mesmo quando o servidor inteiro fica lento.
+    """
+
+    def __init__(
+        self,
+        max_ratio: float = 0.05,
+        percentile: float = 0.95,
+        min_delay: float = 0.05,
+        min_samples: int = 50,
+        samples: int = 1024,
+        refresh: float = 1.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            max_ratio: Fração máxima de cópias em relação às primárias (0.05 = 5%)
+            percentile: Percentil da latência usado como atraso
+            min_delay: Atraso mínimo (segundos)
+            min_samples: Latências necessárias antes do primeiro hedge
+            samples: Latências recentes guardadas
+            refresh: Segundos entre recálculos do percentil
+            clock: Relógio monotônico (substituível em testes)
+        """
+        if not 0 < max_ratio <= 1:
+            raise ValueError(f"Fração de hedge inválida: {max_ratio}")
+
+        self.max_ratio = max_ratio
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.refresh = refresh
+        self.clock = clock
+        self.primaries = 0
+        self.hedges = 0
+        self.wins = 0
+        self._latencies: Deque[float] = deque(maxlen=samples)
+        self._delay: Optional[float] = None
+        self._computed_at = float("-inf")
+
+    def observe(self, latency: float):
+        """Registra a latência de uma resposta bem-sucedida"""
+        self._latencies.append(latency)
+
+    def on_primary(self):
+        """Conta uma requisição primária (base do orçamento)"""
+        self.primaries += 1
+
+    def delay(self) -> Optional[float]:
+        """
+        Returns:
+            Segundos de espera antes de duplicar, ou None enquanto houver
+            poucas amostras
+        """
+        if len(self._latencies) < self.min_samples:
+            return None
+
+        now = self.clock()
+        if now - self._computed_at >= self.refresh:
+            ordered = sorted(self._latencies)
+            value = ordered[int(self.percentile * (len(ordered) - 1))]
+            self._delay = max(value, self.min_delay)
+            self._computed_at = now
+        return self._delay
+
+    def try_hedge(self) -> bool:
+        """
+        Reserva orçamento para uma cópia
+
+        Returns:
+            True se a cópia pode sair (e já foi contada)
+        """
+        if self.hedges + 1 > self.max_ratio * self.primaries:
+            return False
+        self.hedges += 1
+        return True
+
+    def on_win(self):
+        """A cópia respondeu antes da primária"""
+        self.wins += 1
+
+    def summary(self) -> str:
+        """
+        Returns:
+            Resumo para o log final
+        """
+        ratio = self.hedges / self.primaries * 100 if self.primaries else 0.0
+        delay = f"{self._delay * 1000:.0f}ms" if self._delay is not None else "-"
+        return (
+            f"{self.hedges} cópias ({ratio:.1f}% das requisições), "
+            f"{self.wins} venceram a primária, atraso atual {delay}"
+        )
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Journal de Verificação (checkpoint/resume)
+Registro append-only dos domínios resolvidos para retomar varreduras longas
+"""
+
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from collections import Counter
+from typing import Iterator, List, Optional, Set, Tuple
+
+# Status que encerram um domínio: não precisam ser verificados novamente
+# ("taken" vem de journals gravados antes dos status explícitos)
+RESOLVED_STATUSES = ("available", "registered", "reserved", "invalid", "taken")
+
+
+class ScanJournal:
+    """
+    Journal append-only de resultados, uma linha `dominio<TAB>status` por domínio
+
+    As escritas são agrupadas e sincronizadas com fsync a cada `sync_every`
+    registros ou `sync_interval` segundos, o que vier primeiro; a gravação
+    e o fsync de cada grupo rodam numa thread dedicada, fora do event loop,
+    como nos sinks em arquivo. Após um crash, no máximo esse último grupo é
+    perdido; uma linha incompleta no final do arquivo é descartada ao
+    retomar.
+
+    Em memória ficam só os nomes resolvidos (para pular na retomada) e a
+    contagem por status; os status em si são relidos do arquivo por
+    entries() quando precisam ser repostos nas saídas.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        resume: bool = False,
+        sync_every: int = 256,
+        sync_interval: float = 1.0
+    ):
+        """
+        Args:
+            path: Caminho do arquivo de journal
+            resume: Se True, carrega o journal existente e continua nele;
+                caso contrário o arquivo é recriado
+            sync_every: Quantidade de registros entre fsyncs
+            sync_interval: Tempo máximo (segundos) entre fsyncs
+        """
+        self.path = Path(path)
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self._resolved: Set[str] = set()
+        self.counts: Counter = Counter()
+
+        if resume and self.path.exists():
+            self._load()
+
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+        self._buffer: List[str] = []
+        self._last_sync = time.monotonic()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="journal")
+        self._sync: Optional[Future] = None
+
+    def _load(self):
+        """Carrega os domínios resolvidos e descarta uma linha final incompleta"""
+        valid_bytes = 0
+        for domain, status, size in self._read():
+            valid_bytes += size
+            if status in RESOLVED_STATUSES and domain not in self._resolved:
+                self._resolved.add(domain)
+                self.counts[status] += 1
+
+        if valid_bytes != self.path.stat().st_size:
+            os.truncate(self.path, valid_bytes)
+
+    def _read(self) -> Iterator[Tuple[str, str, int]]:
+        """Lê as linhas completas do arquivo como (domínio, status, bytes)"""
+        with open(self.path, 'rb') as f:
+            for raw in f:
+                if not raw.endswith(b'\n'):
+                    break
+                domain, _, status = raw.decode('utf-8').rstrip('\n').partition('\t')
+                yield domain, status, len(raw)
+
+    def __contains__(self, domain: object) -> bool:
+        return domain in self._resolved
+
+    def __len__(self) -> int:
+        return len(self._resolved)
+
+    def entries(self) -> Iterator[Tuple[str, str]]:
+        """
+        Relê do arquivo os resultados carregados na retomada
+
+        Deve ser consumido antes de novos registros serem gravados.
+
+        Returns:
+            Iterador de (domínio, status) dos domínios resolvidos
+        """
+        if not self._resolved:
+            return
+        for domain, status, _ in self._read():
+            if status in RESOLVED_STATUSES:
+                yield domain, status
+
+    def available(self) -> Iterator[str]:
+        """
+        Returns:
+            Iterador dos domínios disponíveis carregados do journal
+        """
+        return (domain for domain, status in self.entries() if status == "available")
+
+    def record(self, domain: str, status: str):
+        """
+        Acrescenta um resultado ao journal
+
+        Args:
+            domain: Domínio verificado
+            status: 'available', 'registered', 'reserved', 'invalid' ou 'error'
+        """
+        self._buffer.append(f"{domain}\t{status}\n")
+        self.flush()
+
+    def flush(self, force: bool = False):
+        """
+        Entrega os registros pendentes à thread de gravação, se o lote estiver cheio
+
+        Args:
+            force: Entrega mesmo que o lote ainda não esteja cheio e espera
+                o fsync terminar (bloqueia)
+        """
+        if self._buffer and (
+            force
+            or len(self._buffer) >= self.sync_every
+            or time.monotonic() - self._last_sync >= self.sync_interval
+        ):
+            chunk, self._buffer = self._buffer, []
+            self._last_sync = time.monotonic()
+            self._sync = self._executor.submit(self._write_chunk, chunk)
+
+        if force and self._sync is not None:
+            self._sync.result()
+
+    def _write_chunk(self, chunk: List[str]):
+        self._file.write("".join(chunk))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        """Sincroniza o que falta e fecha o arquivo"""
+        if not self._file.closed:
+            self.flush(force=True)
+            self._executor.shutdown(wait=True)
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,956 @@
+#!/usr/bin/env python3
+"""
+Espaço de Domínios (Keyspace)
+Geração preguiçosa de domínios .br a partir de padrões e máscaras, com
+contagem exata sem materializar a lista inteira. Cada domínio tem um
+índice (número em base mista sobre as posições), então faixas, shards e
+embaralhamentos são expressos por inteiros
+"""
+
+import itertools
+import math
+import mmap
+import random
+import re
+import sys
+from abc import ABC, abstractmethod
+from array import array
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+DIGITS = '0123456789'
+
+# Limites do Registro.br para o nome (sem a categoria)
+MIN_LABEL = 2
+MAX_LABEL = 26
+
+DEFAULT_SUFFIX = ".com.br"
+
+# Maior keyspace aceito por parse_mask: acima disso len() não funciona e
+# nenhuma varredura terminaria
+MAX_KEYSPACE_SIZE = sys.maxsize
+
+# Classes da máscara: ?l letras, ?d dígitos, ?a letras e dígitos, ?h também hífen
+MASK_CLASSES = {
+    "l": LETTERS,
+    "d": DIGITS,
+    "a": LETTERS + DIGITS,
+    "h": LETTERS + DIGITS + "-",
+}
+
+_LITERAL = re.compile(r"[a-z0-9-]+")
+_SUFFIX = re.compile(r"(?:\.[a-z0-9-]+)*\.br")
+# Palavra válida como trecho de nome: sem hífen nas pontas
+_WORD = re.compile(rb"^[ \t]*([A-Za-z0-9](?:[A-Za-z0-9-]*[A-Za-z0-9])?)[ \t]*\r?$", re.M)
+
+# Tamanho máximo do bloco final de posições materializado na iteração
+TAIL_BLOCK = 4096
+
+# Domínios por bloco gerado com NumPy
+CHUNK_SIZE = 65536
+# Índices até aqui cabem em int64, inclusive a*i da permutação embaralhada
+_NUMPY_MAX_SIZE = 3_000_000_000
+
+
+class Slot(ABC):
+    """
+    Uma posição do nome: a sequência de trechos que pode ocupá-la
+
+    `lengths` são os tamanhos dos trechos (`min_len`/`max_len` os extremos);
+    `hyphen_start` e `hyphen_end` dizem se algum trecho pode começar ou
+    terminar com hífen.
+    """
+
+    lengths: FrozenSet[int] = frozenset()
+    min_len = 0
+    max_len = 0
+    hyphen_start = False
+    hyphen_end = False
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Quantidade de trechos"""
+
+    @abstractmethod
+    def __iter__(self) -> Iterator[str]:
+        """Trechos em ordem"""
+
+    @abstractmethod
+    def __getitem__(self, digit: int) -> str:
+        """Trecho na posição `digit`"""
+
+    @abstractmethod
+    def index(self, piece: str) -> Optional[int]:
+        """
+        Returns:
+            Posição do trecho no slot, ou None se não pertencer
+        """
+
+    def __contains__(self, piece: object) -> bool:
+        return isinstance(piece, str) and self.index(piece) is not None
+
+
+class CharSlot(Slot):
+    """Um caractere de um conjunto (?l, ?d, [a-f], ...)"""
+
+    def __init__(self, chars: str):
+        self.chars = ''.join(dict.fromkeys(chars))
+        if not self.chars:
+            raise ValueError("Alfabeto vazio")
+        self.lengths = frozenset((1,))
+        self.min_len = self.max_len = 1
+        self.hyphen_start = self.hyphen_end = "-" in self.chars
+        self._index = {c: i for i, c in enumerate(self.chars)}
+
+    def __len__(self) -> int:
+        return len(self.chars)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.chars)
+
+    def __getitem__(self, digit: int) -> str:
+        return self.chars[digit]
+
+    def index(self, piece: str) -> Optional[int]:
+        return self._index.get(piece)
+
+    def __repr__(self) -> str:
+        for kind, chars in MASK_CLASSES.items():
+            if self.chars == chars:
+                return f"?{kind}"
+        return f"[{self.chars}]"
+
+
+class ChoiceSlot(Slot):
+    """Um trecho fixo ou uma de várias alternativas ({loja,shop})"""
+
+    def __init__(self, choices: Sequence[str]):
+        self.choices = tuple(dict.fromkeys(choices))
+        for choice in self.choices:
+            if not _LITERAL.fullmatch(choice):
+                raise ValueError(f"Trecho inválido na máscara: {choice!r}")
+        self.lengths = frozenset(map(len, self.choices))
+        self.min_len = min(self.lengths)
+        self.max_len = max(self.lengths)
+        self.hyphen_start = any(c.startswith("-") for c in self.choices)
+        self.hyphen_end = any(c.endswith("-") for c in self.choices)
+        self._index = {c: i for i, c in enumerate(self.choices)}
+
+    def __len__(self) -> int:
+        return len(self.choices)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.choices)
+
+    def __getitem__(self, digit: int) -> str:
+        return self.choices[digit]
+
+    def index(self, piece: str) -> Optional[int]:
+        return self._index.get(piece)
+
+    def __repr__(self) -> str:
+        return self.choices[0] if len(self.choices) == 1 else "{" + ",".join(self.choices) + "}"
+
+
+class WordlistSlot(Slot):
+    """
+    Uma palavra de um arquivo (um por linha), lido por mmap
+
+    Só as posições (início, fim) de cada palavra válida ficam em memória,
+    num array de inteiros; as palavras são lidas do arquivo mapeado na
+    iteração ou no acesso por índice. Linhas vazias, com caracteres fora de
+    [a-z0-9-], com hífen nas pontas ou mais longas que `max_len` são
+    ignoradas. Palavras repetidas não são removidas (index() devolve a
+    primeira ocorrência).
+    """
+
+    def __init__(self, path: str, max_len: int = MAX_LABEL):
+        """
+        Args:
+            path: Arquivo de palavras
+            max_len: Tamanho máximo aceito (o que sobra do nome para a palavra)
+        """
+        self.path = str(path)
+        self.hyphen_start = self.hyphen_end = False
+        self._spans = array("Q")
+        self._index: Optional[Dict[str, int]] = None
+
+        with open(self.path, "rb") as f:
+            if Path(self.path).stat().st_size == 0:
+                self._mm = None
+            else:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        lengths = []
+        if self._mm is not None:
+            for match in _WORD.finditer(self._mm):
+                start, end = match.span(1)
+                if end - start <= max_len:
+                    self._spans.extend((start, end))
+                    lengths.append(end - start)
+        if not lengths:
+            raise ValueError(f"Nenhuma palavra válida em {self.path}")
+        self.lengths = frozenset(lengths)
+        self.min_len = min(self.lengths)
+        self.max_len = max(self.lengths)
+
+    def __len__(self) -> int:
+        return len(self._spans) // 2
+
+    def __iter__(self) -> Iterator[str]:
+        mm = self._mm
+        spans = self._spans
+        for i in range(0, len(spans), 2):
+            yield mm[spans[i]:spans[i + 1]].decode("ascii").lower()
+
+    def __getitem__(self, digit: int) -> str:
+        spans = self._spans
+        return self._mm[spans[2 * digit]:spans[2 * digit + 1]].decode("ascii").lower()
+
+    def index(self, piece: str) -> Optional[int]:
+        # O dicionário só é montado se alguém perguntar (ex.: `in` no Keyspace)
+        if self._index is None:
+            self._index = {}
+            for i, word in enumerate(self):
+                self._index.setdefault(word, i)
+        return self._index.get(piece)
+
+    def __repr__(self) -> str:
+        return f"<{self.path}>"
+
+
+class Keyspace:
+    """
+    Conjunto de domínios formado por todas as combinações das posições de
+    um nome, em cada categoria
+
+    Keyspace(alfabeto, n) cobre os nomes de n caracteres do alfabeto; para
+    máscaras e listas de palavras use parse_mask() ou keyspace_for_pattern().
+    Os domínios são produzidos sob demanda na iteração, então a memória
+    usada não depende do tamanho do espaço. `.size` e `in` são calculados
+    sem enumerar nada (len() também, até sys.maxsize). A categoria é a
+    posição mais externa: todos os nomes em .com.br, depois todos em
+    .net.br, etc.
+
+    Cada índice gera um nome diferente, exceto com listas de palavras:
+    palavras repetidas, ou combinações de trechos de tamanhos variados que
+    parse_mask() não confere (ex.: {a,ab}<palavras.txt>), podem repetir
+    nomes, e aí `.size` é um limite superior.
+    """
+
+    def __init__(self, alphabet: str, length: int, suffix: str = DEFAULT_SUFFIX):
+        """
+        Args:
+            alphabet: Caracteres permitidos em cada posição (duplicatas são ignoradas)
+            length: Comprimento do nome antes do sufixo
+            suffix: Sufixo adicionado a cada nome (padrão: .com.br)
+        """
+        if length < 1:
+            raise ValueError(f"Comprimento inválido: {length}")
+
+        slot = CharSlot(alphabet)
+        self.alphabet = slot.chars
+        self.length = length
+        self._setup([slot] * length, (suffix,))
+
+    @classmethod
+    def from_slots(cls, slots: Sequence[Slot], suffixes: Sequence[str] = (DEFAULT_SUFFIX,)) -> "Keyspace":
+        """
+        Args:
+            slots: Posições do nome, em ordem
+            suffixes: Categorias (ex.: ('.com.br', '.net.br'))
+
+        Returns:
+            Keyspace com todas as combinações
+        """
+        keyspace = cls.__new__(cls)
+        keyspace.alphabet = None
+        keyspace.length = None
+        keyspace._setup(slots, suffixes)
+        return keyspace
+
+    def _setup(self, slots: Sequence[Slot], suffixes: Sequence[str]):
+        if not slots:
+            raise ValueError("Máscara vazia")
+        if not suffixes:
+            raise ValueError("Nenhuma categoria")
+        self.slots = tuple(slots)
+        self.suffixes = tuple(dict.fromkeys(suffixes))
+        self.suffix = self.suffixes[0]
+        self._radix = tuple(len(slot) for slot in self.slots)
+        self._names = math.prod(self._radix)
+        self.size = self._names * len(self.suffixes)
+
+        # Bloco final: as últimas posições cujo produto cabe em TAIL_BLOCK são
+        # materializadas uma vez; a iteração só decodifica o prefixo por bloco
+        split = len(self.slots)
+        block = 1
+        while split and block * self._radix[split - 1] <= TAIL_BLOCK:
+            split -= 1
+            block *= self._radix[split]
+        self._split = split
+        self._block = block
+        self._tails: Optional[List[str]] = None
+        self._tails_suffix: Optional[str] = None
+        self._tables = None  # tabelas de bytes do caminho NumPy (ver _byte_tables)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _decode(self, number: int, stop: int) -> str:
+        """Nome das posições [0, stop) para o número em base mista"""
+        pieces = []
+        for position in range(stop - 1, -1, -1):
+            number, digit = divmod(number, self._radix[position])
+            pieces.append(self.slots[position][digit])
+        return "".join(reversed(pieces))
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, "KeyspaceView"]:
+        """
+        Domínio na posição `index` (O(número de posições)), ou uma visão
+        preguiçosa para fatias (keyspace[início:fim:passo])
+
+        Raises:
+            IndexError: Se o índice estiver fora do keyspace
+        """
+        if isinstance(index, slice):
+            return KeyspaceView(self, range(self.size)[index])
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError(f"Índice fora do keyspace: {index}")
+        category, number = divmod(index, self._names)
+        return self._decode(number, len(self.slots)) + self.suffixes[category]
+
+    def _digits(self, name: str, position: int) -> Optional[List[int]]:
+        """Dígitos (do último para o primeiro) de `name` a partir de `position`"""
+        if position == len(self.slots):
+            return [] if not name else None
+        slot = self.slots[position]
+        if isinstance(slot, CharSlot):
+            digit = slot.index(name[:1])
+            if digit is None:
+                return None
+            rest = self._digits(name[1:], position + 1)
+            if rest is not None:
+                rest.append(digit)
+            return rest
+        for size in range(slot.min_len, min(slot.max_len, len(name)) + 1):
+            digit = slot.index(name[:size])
+            if digit is not None:
+                rest = self._digits(name[size:], position + 1)
+                if rest is not None:
+                    rest.append(digit)
+                    return rest
+        return None
+
+    def index(self, domain: str) -> int:
+        """
+        Posição do domínio na ordem de iteração (inverso de keyspace[i])
+
+        Se alternativas diferentes formarem o mesmo nome, vale a primeira.
+
+        Raises:
+            ValueError: Se o domínio não pertencer ao keyspace
+        """
+        if isinstance(domain, str):
+            for category, suffix in enumerate(self.suffixes):
+                if not domain.endswith(suffix):
+                    continue
+                digits = self._digits(domain[:len(domain) - len(suffix)], 0)
+                if digits is None:
+                    continue
+                number = category
+                for radix, digit in zip(self._radix, reversed(digits)):
+                    number = number * radix + digit
+                return number
+        raise ValueError(f"{domain!r} não pertence ao keyspace")
+
+    def __contains__(self, domain: object) -> bool:
+        if not isinstance(domain, str):
+            return False
+
+        if self.length is not None:
+            if not domain.endswith(self.suffix):
+                return False
+            name = domain[:len(domain) - len(self.suffix)]
+            return len(name) == self.length and all(c in self.alphabet for c in name)
+        try:
+            self.index(domain)
+        except ValueError:
+            return False
+        return True
+
+    def _tail_names(self, suffix: str) -> List[str]:
+        # Guarda só a categoria atual: a iteração percorre uma por vez
+        if self._tails_suffix != suffix:
+            tail = self.slots[self._split:]
+            self._tails = [''.join(combo) + suffix for combo in itertools.product(*tail)]
+            self._tails_suffix = suffix
+        return self._tails
+
+    def _byte_tables(self):
+        """
+        Tabelas do caminho NumPy: bytes de cada trecho por posição e de cada
+        categoria, ou False se o keyspace não tiver largura fixa (listas de
+        palavras, alternativas ou categorias de tamanhos diferentes), for
+        grande demais para int64 ou o numpy não estiver instalado
+        """
+        if self._tables is None:
+            self._tables = False
+            widths = {len(piece) for piece in self.suffixes}
+            fixed = len(widths) == 1 and all(
+                not isinstance(slot, WordlistSlot) and slot.min_len == slot.max_len
+                for slot in self.slots
+            )
+            if fixed and self.size <= _NUMPY_MAX_SIZE:
+                try:
+                    import numpy as np
+                except ImportError:
+                    return False
+
+                def table(pieces) -> "np.ndarray":
+                    return np.frombuffer("".join(pieces).encode("ascii"), np.uint8).reshape(len(pieces), -1)
+
+                self._tables = (np, [table(list(slot)) for slot in self.slots], table(self.suffixes))
+        return self._tables
+
+    def _names_at(self, indices) -> List[str]:
+        """
+        Domínios de um array de índices (qualquer ordem), montados como
+        linhas de bytes de largura fixa: uma divisão por posição para o
+        bloco inteiro e um único decode/split no final
+        """
+        np, slot_tables, suffix_table = self._tables
+        width = sum(t.shape[1] for t in slot_tables) + suffix_table.shape[1]
+        out = np.empty((len(indices), width + 1), np.uint8)
+        out[:, width] = 10  # '\n'
+
+        if len(self.suffixes) == 1:
+            number = indices
+            out[:, width - suffix_table.shape[1]:width] = suffix_table[0]
+        else:
+            category, number = np.divmod(indices, self._names)
+            out[:, width - suffix_table.shape[1]:width] = suffix_table[category]
+
+        column = width - suffix_table.shape[1]
+        for radix, table in zip(reversed(self._radix), reversed(slot_tables)):
+            column -= table.shape[1]
+            if radix == 1:
+                out[:, column:column + table.shape[1]] = table[0]
+            else:
+                number, digit = np.divmod(number, radix)
+                out[:, column:column + table.shape[1]] = table[digit]
+
+        return out.tobytes().decode("ascii").split("\n")[:-1]
+
+    def _chunks(self, indices: range, chunk_size: int) -> Iterator[List[str]]:
+        if not indices:
+            return
+        if self._byte_tables():
+            np = self._tables[0]
+            for start in range(0, len(indices), chunk_size):
+                part = indices[start:start + chunk_size]
+                yield self._names_at(np.arange(part.start, part.stop, part.step, dtype=np.int64))
+            return
+
+        names = self._iter_blocks(indices)
+        while True:
+            chunk = list(itertools.islice(names, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def chunks(self, chunk_size: int = CHUNK_SIZE) -> Iterator[List[str]]:
+        """
+        Domínios em listas de até `chunk_size`, na ordem de iteração
+
+        Com numpy instalado e nomes de largura fixa (classes, conjuntos,
+        alternativas do mesmo tamanho), cada bloco é montado como um array
+        de bytes, sem laço em Python por nome; nos demais casos os blocos
+        vêm da iteração normal.
+
+        Args:
+            chunk_size: Domínios por bloco
+
+        Returns:
+            Iterador de listas de domínios
+        """
+        return self._chunks(range(self.size), chunk_size)
+
+    def _iter_blocks(self, indices: range) -> Iterator[str]:
+        """Domínios das posições de `indices` (passo positivo), em ordem, sem numpy"""
+        if not indices:
+            return
+        step = indices.step
+        block = self._block
+        if step >= block:
+            # No máximo um domínio por bloco: decodifica cada um
+            yield from map(self.__getitem__, indices)
+            return
+
+        start, last = indices[0], indices[-1]
+        heads = self._names // block
+        for number in range(start // block, last // block + 1):
+            base = number * block
+            lo = max(start, base)
+            lo += (start - lo) % step
+            hi = min(last + 1, base + block)
+            category, head = divmod(number, heads)
+            tails = self._tail_names(self.suffixes[category])
+            prefix = self._decode(head, self._split)
+            yield from map(prefix.__add__, tails[lo - base:hi - base:step])
+
+    def _iter_range(self, indices: range) -> Iterator[str]:
+        """Domínios das posições de `indices` (passo positivo), em ordem"""
+        return itertools.chain.from_iterable(self._chunks(indices, CHUNK_SIZE))
+
+    def __iter__(self) -> Iterator[str]:
+        return self._iter_range(range(self.size))
+
+    def shuffled(self, seed: int = 0) -> "KeyspaceView":
+        """
+        Todos os domínios numa ordem embaralhada e reproduzível
+
+        A permutação é afim (i -> a*i + b mod n, com a e n primos entre si):
+        não guarda estado, o i-ésimo domínio sai em O(1) e a mesma semente
+        dá a mesma ordem em qualquer processo, então shards e faixas de uma
+        ordem embaralhada continuam disjuntos. Não é criptográfica; serve
+        para espalhar a varredura pelo alfabeto.
+
+        Args:
+            seed: Semente
+
+        Returns:
+            Visão com todos os domínios, embaralhados
+        """
+        return KeyspaceView(self, range(self.size), _affine(self.size, seed))
+
+    def mask(self) -> str:
+        """
+        Returns:
+            Máscara equivalente, para logs
+        """
+        body = "".join(map(repr, self.slots))
+        if len(self.suffixes) == 1:
+            return body + self.suffix
+        return body + "{" + ",".join(self.suffixes) + "}"
+
+    def __repr__(self) -> str:
+        if self.length is not None:
+            return f"Keyspace(alphabet={self.alphabet!r}, length={self.length}, suffix={self.suffix!r})"
+        return f"Keyspace({self.mask()!r})"
+
+
+def _affine(size: int, seed: int) -> Tuple[int, int]:
+    """Multiplicador (primo com `size`) e deslocamento da permutação de `seed`"""
+    if size <= 1:
+        return 1, 0
+    rng = random.Random(seed)
+    # Perto de size/φ os vizinhos da ordem original ficam bem separados
+    multiplier = int(size * 0.6180339887) + rng.randrange(max(size // 100, 1))
+    while math.gcd(multiplier, size) != 1:
+        multiplier += 1
+    return multiplier % size or 1, rng.randrange(size)
+
+
+class KeyspaceView:
+    """
+    Faixa de um Keyspace: posições [início, fim) com passo, opcionalmente
+    numa ordem embaralhada (Keyspace.shuffled)
+
+    É só um range de índices: criar, fatiar, len(), view[i] e index() não
+    enumeram nada, então shards e faixas de trabalho de qualquer tamanho
+    custam alguns inteiros. Fatiar uma visão devolve outra visão.
+    """
+
+    def __init__(self, keyspace: Keyspace, indices: range, order: Tuple[int, int] = (1, 0)):
+        """
+        Args:
+            keyspace: Keyspace de origem
+            indices: Posições da visão (na ordem `order`)
+            order: Permutação afim (multiplicador, deslocamento); (1, 0) é a ordem original
+        """
+        if indices.step < 0:
+            raise ValueError("Passo negativo não é suportado")
+        self.keyspace = keyspace
+        self.indices = indices
+        self.order = order
+
+    @property
+    def size(self) -> int:
+        """Quantidade de domínios (sem o limite de len())"""
+        r = self.indices
+        return max(0, -(-(r.stop - r.start) // r.step))
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def _position(self, index: int) -> int:
+        multiplier, offset = self.order
+        return (multiplier * index + offset) % self.keyspace.size
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, "KeyspaceView"]:
+        if isinstance(index, slice):
+            return KeyspaceView(self.keyspace, self.indices[index], self.order)
+        return self.keyspace[self._position(self.indices[index])]
+
+    def chunks(self, chunk_size: int = CHUNK_SIZE) -> Iterator[List[str]]:
+        """
+        Domínios da visão em listas de até `chunk_size` (ver Keyspace.chunks)
+
+        Returns:
+            Iterador de listas de domínios
+        """
+        keyspace = self.keyspace
+        if self.order == (1, 0):
+            return keyspace._chunks(self.indices, chunk_size)
+        if keyspace._byte_tables():
+            return self._shuffled_chunks(chunk_size)
+
+        names = (keyspace[self._position(i)] for i in self.indices)
+        return iter(lambda: list(itertools.islice(names, chunk_size)), [])
+
+    def _shuffled_chunks(self, chunk_size: int) -> Iterator[List[str]]:
+        # A permutação também é vetorizada: a*i + b mod n por bloco
+        keyspace = self.keyspace
+        np = keyspace._tables[0]
+        multiplier, offset = self.order
+        indices = self.indices
+        for start in range(0, len(indices), chunk_size):
+            part = indices[start:start + chunk_size]
+            positions = np.arange(part.start, part.stop, part.step, dtype=np.int64)
+            yield keyspace._names_at((positions * multiplier + offset) % keyspace.size)
+
+    def __iter__(self) -> Iterator[str]:
+        return itertools.chain.from_iterable(self.chunks())
+
+    def index(self, domain: str) -> int:
+        """
+        Posição do domínio nesta visão
+
+        Raises:
+            ValueError: Se o domínio não estiver na visão
+        """
+        position = self.keyspace.index(domain)
+        multiplier, offset = self.order
+        if self.order != (1, 0):
+            size = self.keyspace.size
+            position = (position - offset) * pow(multiplier, -1, size) % size
+        return self.indices.index(position)
+
+    def __contains__(self, domain: object) -> bool:
+        try:
+            self.index(domain)
+        except ValueError:
+            return False
+        return True
+
+    def mask(self) -> str:
+        """
+        Returns:
+            Máscara do keyspace e a faixa, para logs
+        """
+        r = self.indices
+        shuffled = ", embaralhado" if self.order != (1, 0) else ""
+        step = f":{r.step}" if r.step != 1 else ""
+        return f"{self.keyspace.mask()}[{r.start}:{r.stop}{step}{shuffled}]"
+
+    def __repr__(self) -> str:
+        return f"KeyspaceView({self.mask()!r})"
+
+
+def known_size(domains: Iterable[str]) -> Optional[int]:
+    """
+    Quantidade de domínios de uma fonte, quando conhecida
+
+    Keyspaces e visões usam `.size`: len() exige um int que caiba em
+    sys.maxsize e falha (OverflowError) em espaços maiores.
+
+    Args:
+        domains: Keyspace, KeyspaceView, lista ou qualquer iterável
+
+    Returns:
+        Quantidade de domínios, ou None para iteradores sem len()
+    """
+    if isinstance(domains, (Keyspace, KeyspaceView)):
+        return domains.size
+    return len(domains) if hasattr(domains, '__len__') else None
+
+
+def domain_chunks(domains: Iterable[str], chunk_size: int = CHUNK_SIZE) -> Iterator[List[str]]:
+    """
+    Domínios de uma fonte em listas de até `chunk_size`
+
+    Keyspaces e visões entregam os blocos de chunks() (montados com NumPy
+    quando possível); os demais iteráveis são agrupados com islice.
+
+    Args:
+        domains: Keyspace, KeyspaceView, lista ou qualquer iterável
+        chunk_size: Domínios por lista
+
+    Returns:
+        Iterador de listas de domínios
+    """
+    if isinstance(domains, (Keyspace, KeyspaceView)):
+        return domains.chunks(chunk_size)
+    iterator = iter(domains)
+    return iter(lambda: list(itertools.islice(iterator, chunk_size)), [])
+
+
+def _read_group(mask: str, start: int, close: str) -> Tuple[str, int]:
+    end = mask.find(close, start)
+    if end < 0:
+        raise ValueError(f"Máscara sem '{close}': {mask}")
+    return mask[start:end], end + 1
+
+
+def _char_class(spec: str) -> str:
+    """Expande [a-f0-9-] em 'abcdef0123456789-'"""
+    chars = []
+    i = 0
+    while i < len(spec):
+        if i + 2 < len(spec) and spec[i + 1] == "-":
+            first, last = spec[i], spec[i + 2]
+            if first > last:
+                raise ValueError(f"Faixa inválida na máscara: [{spec}]")
+            chars.extend(chr(c) for c in range(ord(first), ord(last) + 1))
+            i += 3
+        else:
+            chars.append(spec[i])
+            i += 1
+    chars = ''.join(chars)
+    if not _LITERAL.fullmatch(chars):
+        raise ValueError(f"Classe inválida na máscara: [{spec}]")
+    return chars
+
+
+def _split_suffix(mask: str) -> Tuple[str, str]:
+    """Separa nome e categoria no primeiro '.' fora de {} e <>"""
+    depth = 0
+    for i, c in enumerate(mask):
+        if c in "{<[":
+            depth += 1
+        elif c in "}>]":
+            depth -= 1
+        elif c == "." and depth == 0:
+            return mask[:i], mask[i:]
+    return mask, ""
+
+
+def _expand_suffixes(spec: str) -> List[str]:
+    """'.{com,net}.br' -> ['.com.br', '.net.br']"""
+    parts: List[Sequence[str]] = []
+    i = 0
+    while i < len(spec):
+        if spec[i] == "{":
+            group, i = _read_group(spec, i + 1, "}")
+            parts.append(group.split(","))
+        else:
+            end = spec.find("{", i)
+            end = len(spec) if end < 0 else end
+            parts.append((spec[i:end],))
+            i = end
+    suffixes = [''.join(combo) for combo in itertools.product(*parts)]
+    for suffix in suffixes:
+        if not _SUFFIX.fullmatch(suffix):
+            raise ValueError(f"Categoria inválida: {suffix!r} (ex.: .com.br, .{{com,net,org}}.br)")
+    return suffixes
+
+
+def parse_mask(mask: str) -> Keyspace:
+    """
+    Converte uma máscara em Keyspace
+
+    Sintaxe do nome:
+        ?l letra, ?d dígito, ?a letra ou dígito, ?h letra, dígito ou hífen
+        [abc], [a-f0-9]  um caractere do conjunto
+        {loja,shop}      uma das alternativas
+        <arquivo.txt>    uma palavra do arquivo (uma por linha)
+        loja, 24h        trechos fixos (prefixos, sufixos)
+    Depois do primeiro '.', a categoria, com alternativas:
+        .com.br (padrão), .{com,net,org}.br
+
+    Exemplos: '?l?l?d', 'loja?l?l', '{meu,minha}<palavras.txt>',
+    '<palavras.txt>?d?d.{com,net}.br'.
+
+    O nome gerado sempre respeita as regras do .br: a máscara é rejeitada se
+    puder gerar hífen no início ou no fim, dois hífens seguidos entre
+    posições, '--' na 3ª e 4ª posições ou nomes fora de 2 a 26 caracteres;
+    palavras que não caibam no espaço restante são ignoradas. Também são
+    rejeitadas máscaras que gerem o mesmo nome por dois caminhos (ex.:
+    {a,ab}{bc,c} gera 'abc' duas vezes) e máscaras com mais de
+    MAX_KEYSPACE_SIZE domínios.
+
+    Args:
+        mask: Máscara
+
+    Returns:
+        Keyspace da máscara
+
+    Raises:
+        ValueError: Se a máscara for inválida
+    """
+    body, suffix_spec = _split_suffix(mask.strip().lower())
+    suffixes = _expand_suffixes(suffix_spec) if suffix_spec else [DEFAULT_SUFFIX]
+
+    # Primeiro passo: posições fixas; listas de palavras ficam para depois,
+    # quando se sabe quanto do nome sobra para elas
+    pending: List[object] = []
+    i = 0
+    while i < len(body):
+        c = body[i]
+        if c == "?":
+            kind = body[i + 1:i + 2]
+            if kind not in MASK_CLASSES:
+                raise ValueError(f"Classe desconhecida na máscara: ?{kind}")
+            pending.append(CharSlot(MASK_CLASSES[kind]))
+            i += 2
+        elif c == "[":
+            spec, i = _read_group(body, i + 1, "]")
+            pending.append(CharSlot(_char_class(spec)))
+        elif c == "{":
+            group, i = _read_group(body, i + 1, "}")
+            pending.append(ChoiceSlot(group.split(",")))
+        elif c == "<":
+            path, i = _read_group(mask.strip(), i + 1, ">")  # caminho sem lower()
+            pending.append(Path(path))
+        else:
+            match = _LITERAL.match(body, i)
+            if match is None:
+                raise ValueError(f"Caractere inválido na máscara: {c!r}")
+            pending.append(ChoiceSlot([match.group()]))
+            i = match.end()
+
+    fixed = [slot for slot in pending if isinstance(slot, Slot)]
+    wordlists = len(pending) - len(fixed)
+    room = MAX_LABEL - sum(slot.min_len for slot in fixed)
+    slots: List[Slot] = []
+    for item in pending:
+        if isinstance(item, Path):
+            # Cada lista pode usar o que sobra, descontado o mínimo das outras
+            slots.append(WordlistSlot(str(item), max_len=room - (wordlists - 1)))
+        else:
+            slots.append(item)
+
+    _check_rules(slots, mask)
+    _check_unambiguous(slots, mask)
+    keyspace = Keyspace.from_slots(slots, suffixes)
+    if keyspace.size > MAX_KEYSPACE_SIZE:
+        raise ValueError(
+            f"A máscara gera {keyspace.size:.3e} domínios, acima do limite de "
+            f"{MAX_KEYSPACE_SIZE:.3e}: {mask}"
+        )
+    return keyspace
+
+
+def _check_rules(slots: Sequence[Slot], mask: str):
+    """Rejeita máscaras que gerariam nomes fora das regras do .br"""
+    if slots[0].hyphen_start or slots[-1].hyphen_end:
+        raise ValueError(f"A máscara pode gerar hífen no início ou no fim do nome: {mask}")
+    for left, right in zip(slots, slots[1:]):
+        if left.hyphen_end and right.hyphen_start:
+            raise ValueError(f"A máscara pode gerar hífens seguidos: {mask}")
+
+    # '--' na 3ª e 4ª posições é reservado (xn--). Entre posições já foi
+    # barrado acima; falta dentro de um trecho que comece até a 3ª posição
+    offsets = {0}
+    for slot in slots:
+        if offsets and _double_hyphen_at(slot, {2 - offset for offset in offsets}):
+            raise ValueError(f"A máscara pode gerar '--' na 3ª e 4ª posições: {mask}")
+        offsets = {offset + size for offset in offsets for size in slot.lengths if offset + size <= 2}
+
+    shortest = sum(slot.min_len for slot in slots)
+    longest = sum(slot.max_len for slot in slots)
+    if shortest < MIN_LABEL or longest > MAX_LABEL:
+        raise ValueError(
+            f"A máscara gera nomes de {shortest} a {longest} caracteres "
+            f"(permitido: {MIN_LABEL} a {MAX_LABEL}): {mask}"
+        )
+
+
+def _double_hyphen_at(slot: Slot, starts: Iterable[int]) -> bool:
+    """True se algum trecho do slot tem '--' começando em um dos índices `starts`"""
+    if isinstance(slot, CharSlot):
+        return False
+    if isinstance(slot, WordlistSlot) and (slot._mm is None or slot._mm.find(b"--") < 0):
+        return False  # evita percorrer a lista quando nenhuma linha tem '--'
+    return any(piece[start:start + 2] == "--" for piece in slot for start in starts)
+
+
+def _check_unambiguous(slots: Sequence[Slot], mask: str):
+    """
+    Rejeita máscaras em que dois caminhos geram o mesmo nome
+
+    Só é possível com duas ou mais posições de tamanho variável. Dois
+    caminhos são acompanhados juntos: o estado é (posição de A, posição de
+    B, o que A gerou a mais que B), e há repetição se, depois de
+    divergirem, eles se alinham de novo na mesma posição. Listas de
+    palavras não são conferidas (ver Keyspace).
+    """
+    variable = [slot for slot in slots if len(slot.lengths) > 1]
+    if len(variable) < 2 or any(isinstance(slot, WordlistSlot) for slot in slots):
+        return
+
+    pieces = [tuple(slot) for slot in slots]
+    end = len(pieces)
+    # Divergência: na mesma posição, A escolhe um trecho que estende o de B
+    pending = [
+        (k + 1, k + 1, longer[len(shorter):])
+        for k, options in enumerate(pieces)
+        for shorter in options
+        for longer in options
+        if len(longer) > len(shorter) and longer.startswith(shorter)
+    ]
+    seen = set()
+    while pending:
+        state = pending.pop()
+        if state in seen:
+            continue
+        seen.add(state)
+        ahead, behind, rest = state
+        if rest:
+            # B alcança A com o próximo trecho da sua posição
+            if behind == end:
+                continue
+            for piece in pieces[behind]:
+                if rest.startswith(piece):
+                    pending.append((ahead, behind + 1, rest[len(piece):]))
+                elif piece.startswith(rest):
+                    pending.append((behind + 1, ahead, piece[len(rest):]))
+        elif ahead == behind:
+            raise ValueError(f"A máscara pode gerar o mesmo nome mais de uma vez: {mask}")
+        elif ahead < end and behind < end:
+            # Alinhados em posições diferentes: os dois avançam
+            for first in pieces[ahead]:
+                for second in pieces[behind]:
+                    if first.startswith(second):
+                        pending.append((ahead + 1, behind + 1, first[len(second):]))
+                    elif second.startswith(first):
+                        pending.append((behind + 1, ahead + 1, second[len(first):]))
+
+
+def keyspace_for_pattern(pattern: str) -> Keyspace:
+    """
+    Converte um padrão da CLI em Keyspace
+
+    Args:
+        pattern: Padrão de geração ('3letters', '2letters', '4letters',
+            'custom:abc' ou 'mask:<máscara>'; ver parse_mask)
+
+    Returns:
+        Keyspace correspondente
+    """
+    if pattern == "3letters":
+        return Keyspace(LETTERS, 3)
+    elif pattern == "2letters":
+        return Keyspace(LETTERS, 2)
+    elif pattern == "4letters":
+        return Keyspace(LETTERS, 4)
+    elif pattern.startswith("custom:"):
+        return Keyspace(pattern.split(":", 1)[1], 3)
+    elif pattern.startswith("mask:"):
+        return parse_mask(pattern.split(":", 1)[1])
+    else:
+        raise ValueError(f"Padrão desconhecido: {pattern}")
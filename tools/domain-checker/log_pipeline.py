@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Pipeline de Logging Fora do Event Loop
+Os registros vão para uma fila e uma thread dedicada formata e grava no
+console e no arquivo (com rotação por tamanho e compressão gzip); linhas
+por domínio podem ser amostradas para não inundar o log
+"""
+
+import atexit
+import gzip
+import logging
+import os
+import queue
+import shutil
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Callable, Dict, List, Optional, Tuple
+
+# `extra` das linhas por domínio sujeitas à amostragem:
+#   logger.warning("⏱️ %s - Timeout", domain, extra=SAMPLED)
+SAMPLED = {"sampled": True}
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Limita as linhas marcadas com SAMPLED a `rate` por segundo (token bucket)
+
+    ERROR e acima sempre passam, assim como linhas sem a marca. A primeira
+    linha que passa depois de um período de descarte informa quantas foram
+    omitidas.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            rate: Linhas amostradas por segundo
+            burst: Rajada máxima (padrão: um segundo de `rate`)
+            clock: Relógio monotônico (substituível em testes)
+        """
+        super().__init__()
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1.0)
+        self.clock = clock
+        self.tokens = self.burst
+        self.updated = clock()
+        self.dropped = 0  # omitidas desde a última linha aceita
+        self.dropped_total = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "sampled", False) or record.levelno >= logging.ERROR:
+            return True
+
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            self.dropped += 1
+            self.dropped_total += 1
+            return False
+
+        self.tokens -= 1
+        if self.dropped:
+            record.msg = f"{record.msg} (+{self.dropped} linhas omitidas pela amostragem)"
+            self.dropped = 0
+        return True
+
+
+class CompressingRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler que comprime com gzip os arquivos rotacionados (log.1.gz, ...)"""
+
+    def __init__(self, filename: str, max_bytes: int, backup_count: int, encoding: str = 'utf-8'):
+        """
+        Args:
+            filename: Arquivo de log
+            max_bytes: Tamanho que dispara a rotação (0 desativa)
+            backup_count: Arquivos rotacionados mantidos
+            encoding: Codificação do arquivo
+        """
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding=encoding)
+        self.namer = lambda name: name + ".gz"
+        self.rotator = _gzip_rotate
+
+
+def _gzip_rotate(source: str, dest: str):
+    with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler que não formata no chamador
+
+    O QueueHandler padrão monta a mensagem em prepare(), na thread que
+    registrou; aqui o registro vai intacto e a formatação acontece na thread
+    do listener. Os argumentos da mensagem não devem ser alterados depois
+    (strings e números, como no verificador).
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+# Pipelines ativos por nome de logger: (handlers ligados ao logger,
+# listener da fila ou None no modo síncrono, filtro de amostragem)
+_pipelines: Dict[
+    str, Tuple[List[logging.Handler], Optional[QueueListener], Optional[SamplingFilter]]
+] = {}
+
+
+def attach_handlers(
+    logger: logging.Logger,
+    handlers: List[logging.Handler],
+    sample_rate: Optional[float] = None,
+    use_queue: bool = True
+):
+    """
+    Liga os handlers ao logger, por uma fila e thread dedicada
+
+    Chamadas repetidas para o mesmo logger substituem o pipeline anterior,
+    que é drenado antes, com ou sem fila. O filtro de amostragem fica num
+    só lugar (o handler da fila ou, no modo síncrono, o próprio logger), para
+    que cada linha consuma uma única ficha qualquer que seja o número de
+    destinos.
+
+    Args:
+        logger: Logger a configurar
+        handlers: Destinos (console, arquivo); o nível de cada um é respeitado
+        sample_rate: Linhas SAMPLED por segundo (None ou 0 não amostra)
+        use_queue: False grava direto no chamador (comportamento síncrono)
+    """
+    stop_logging(logger)
+
+    sampler = SamplingFilter(sample_rate) if sample_rate else None
+    if not use_queue:
+        if sampler is not None:
+            logger.addFilter(sampler)
+        for handler in handlers:
+            logger.addHandler(handler)
+        _pipelines[logger.name] = (list(handlers), None, sampler)
+        return
+
+    records: queue.Queue = queue.Queue(-1)
+    queue_handler = _DeferredQueueHandler(records)
+    if sampler is not None:
+        queue_handler.addFilter(sampler)
+    listener = QueueListener(records, *handlers, respect_handler_level=True)
+    listener.start()
+    logger.addHandler(queue_handler)
+    _pipelines[logger.name] = ([queue_handler], listener, sampler)
+
+
+def stop_logging(logger: logging.Logger):
+    """
+    Drena a fila, grava o total omitido pela amostragem, desliga e fecha os handlers
+
+    Registrada com atexit; pode ser chamada antes (ex.: fim de um shard).
+
+    Args:
+        logger: Logger configurado por attach_handlers
+    """
+    pipeline = _pipelines.pop(logger.name, None)
+    if pipeline is None:
+        return
+
+    attached, listener, sampler = pipeline
+    if sampler is not None and sampler.dropped_total:
+        logger.info(f"🔇 {sampler.dropped_total} linhas por domínio omitidas pela amostragem")
+    if listener is not None:
+        listener.stop()
+    for handler in attached:
+        logger.removeHandler(handler)
+    if sampler is not None:
+        logger.removeFilter(sampler)
+    for handler in listener.handlers if listener is not None else attached:
+        handler.close()
+
+
+@atexit.register
+def _stop_all():
+    for name in list(_pipelines):
+        stop_logging(logging.getLogger(name))
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Métricas da Verificação (formato de exposição do Prometheus)
+Contadores, gauges e histogramas em memória, servidos opcionalmente em
+/metrics por HTTP local
+"""
+
+import bisect
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from aiohttp import web
+
+# Buckets (segundos) do histograma de latência das requisições
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric(ABC):
+    """Base das métricas: nome, ajuda, nomes de labels e amostras por labels"""
+
+    TYPE = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+
+    def render(self) -> List[str]:
+        """
+        Returns:
+            Linhas no formato de exposição, incluindo HELP e TYPE
+        """
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.TYPE}"] + self._samples()
+
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        """Linhas das amostras, sem HELP e TYPE"""
+
+
+class Counter(Metric):
+    """Contador monotônico com labels"""
+
+    TYPE = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        """Soma `amount` à série dos labels informados"""
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        """Valor atual da série"""
+        return self._values.get(labels, 0)
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}"
+            for labels, value in sorted(self._values.items())
+        ]
+
+
+class Gauge(Metric):
+    """
+    Valor que sobe e desce; pode ser lido na hora da coleta por uma função
+    """
+
+    TYPE = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        collect: Optional[Callable[[], float]] = None
+    ):
+        """
+        Args:
+            name: Nome da métrica
+            help: Descrição
+            labels: Nomes dos labels
+            collect: Função lida a cada coleta (só para gauges sem labels)
+        """
+        super().__init__(name, help, labels)
+        self._values: Dict[LabelValues, float] = {}
+        self.collect = collect
+
+    def set(self, value: float, *labels: str):
+        self._values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def value(self, *labels: str) -> float:
+        if self.collect is not None:
+            return self.collect()
+        return self._values.get(labels, 0)
+
+    def _samples(self) -> List[str]:
+        if self.collect is not None:
+            return [f"{self.name} {_format_value(self.collect())}"]
+        return [
+            f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}"
+            for labels, value in sorted(self._values.items())
+        ]
+
+
+class Histogram(Metric):
+    """Histograma cumulativo com buckets fixos"""
+
+    TYPE = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Por série: contagem por bucket (não cumulativa), soma e total
+        self._series: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, *labels: str):
+        """Registra uma observação"""
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return series[2] if series else 0
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for labels, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(float(bound))}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}"
+                )
+            suffix = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{suffix} {_format_value(total)}")
+            lines.append(f"{self.name}_count{suffix} {count}")
+        return lines
+
+
+class Registry:
+    """Conjunto de métricas renderizado junto"""
+
+    def __init__(self):
+        self.metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """
+        Returns:
+            Todas as métricas no formato de exposição de texto (versão 0.0.4)
+        """
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class ScanMetrics:
+    """
+    Métricas de uma verificação de domínios
+
+    Atualizadas pelo DomainChecker a cada tentativa; o limite de concorrência
+    é lido na hora da coleta.
+    """
+
+    def __init__(self):
+        self.registry = Registry()
+        r = self.registry.register
+        self.request_duration = r(Histogram(
+            "domain_checker_request_duration_seconds",
+            "Latência das requisições ao avail/raw, por resultado da tentativa",
+            ["result"]
+        ))
+        self.in_flight = r(Gauge(
+            "domain_checker_requests_in_flight",
+            "Requisições em andamento"
+        ))
+        self.responses = r(Counter(
+            "domain_checker_http_responses_total",
+            "Respostas HTTP recebidas, por código",
+            ["code"]
+        ))
+        self.results = r(Counter(
+            "domain_checker_results_total",
+            "Resultados finais por status (available, registered, reserved, invalid, error)",
+            ["status"]
+        ))
+        self.retries = r(Counter(
+            "domain_checker_retries_total",
+            "Novas tentativas agendadas, por causa da falha",
+            ["cause"]
+        ))
+        self.hedges = r(Counter(
+            "domain_checker_hedges_total",
+            "Cópias hedged enviadas ('sent') e que responderam antes da primária ('won')",
+            ["result"]
+        ))
+        self.proxy_requests = r(Counter(
+            "domain_checker_proxy_requests_total",
+            "Tentativas por proxy ('direct' sem proxy) e resultado",
+            ["proxy", "result"]
+        ))
+        self.cache_lookups = r(Counter(
+            "domain_checker_cache_lookups_total",
+            "Consultas ao cache de resultados",
+            ["result"]
+        ))
+        self.prefilter = r(Counter(
+            "domain_checker_prefilter_total",
+            "Nomes encontrados no índice de registrados: pulados, adiados ou reverificados",
+            ["result"]
+        ))
+        self.concurrency_limit = r(Gauge(
+            "domain_checker_concurrency_limit",
+            "Limite atual de concorrência (adaptativo ou fixo)"
+        ))
+
+    def render(self) -> str:
+        return self.registry.render()
+
+
+class MetricsServer:
+    """Servidor HTTP local com GET /metrics"""
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self, metrics: ScanMetrics, host: str = "127.0.0.1", port: int = 9108):
+        """
+        Args:
+            metrics: Métricas a expor
+            host: Endereço de escuta
+            port: Porta de escuta (0 escolhe uma livre)
+        """
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self.url: Optional[str] = None
+        self._runner: Optional[web.AppRunner] = None
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        return web.Response(
+            body=self.metrics.render().encode("utf-8"),
+            headers={"Content-Type": self.CONTENT_TYPE}
+        )
+
+    async def start(self) -> str:
+        """
+        Returns:
+            URL do endpoint /metrics
+        """
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        port = self._runner.addresses[0][1]
+        self.url = f"http://{self.host}:{port}/metrics"
+        return self.url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+async def serve_metrics_during(
+    coro: Awaitable,
+    metrics: ScanMetrics,
+    port: Optional[int],
+    host: str = "127.0.0.1",
+    logger=None
+):
+    """
+    Aguarda `coro` com /metrics no ar (se `port` não for None)
+
+    Args:
+        coro: Corrotina da verificação
+        metrics: Métricas a expor
+        port: Porta do endpoint, ou None para não expor
+        host: Endereço de escuta
+        logger: Logger para anunciar a URL (opcional)
+
+    Returns:
+        Resultado de `coro`
+    """
+    if port is None:
+        return await coro
+
+    server = MetricsServer(metrics, host, port)
+    url = await server.start()
+    if logger is not None:
+        logger.info(f"📈 Métricas em {url}")
+    try:
+        return await coro
+    finally:
+        await server.stop()
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Pré-filtro de Domínios Sabidamente Registrados
+Filtro de Bloom em disco montado a partir de resultados anteriores ou
+listas de domínios; a varredura pula (ou deixa para o fim) os nomes já
+registrados e só os reverifica num ciclo lento
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import math
+import sqlite3
+import struct
+import sys
+import time
+import zlib
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+try:
+    from .normalize import Normalizer
+except ImportError:
+    from normalize import Normalizer
+
+# Status que indicam um nome que não vale consultar de novo tão cedo
+# ("taken" vem de resultados gravados antes dos status explícitos)
+KNOWN_STATUSES = ("registered", "reserved", "invalid", "taken")
+
+DEFAULT_ERROR_RATE = 0.001
+DEFAULT_REFRESH_DAYS = 30
+DAY = 24 * 3600
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom com k posições por dupla hash (blake2b de 128 bits)
+
+    Sem falsos negativos: um nome adicionado sempre é encontrado. Nomes
+    nunca adicionados são encontrados com probabilidade ~`error_rate`
+    (falso positivo), e isso é o que limita o quanto se pode confiar no
+    filtro para pular consultas. Para 1 milhão de nomes a 0,1% o arquivo
+    tem cerca de 1,8 MB.
+    """
+
+    MAGIC = b"DCBLOOM1"
+    # magic, bits, hashes, nomes adicionados, montado em (time.time())
+    HEADER = struct.Struct("<8sQIQd")
+
+    def __init__(self, bits: int, hashes: int):
+        """
+        Args:
+            bits: Tamanho do filtro em bits
+            hashes: Posições marcadas por nome
+        """
+        self.bits = max(bits, 8)
+        self.hashes = max(hashes, 1)
+        self.count = 0
+        self.built_at = time.time()
+        self._array = bytearray((self.bits + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity: int, error_rate: float = DEFAULT_ERROR_RATE) -> "BloomFilter":
+        """
+        Args:
+            capacity: Quantidade de nomes esperada
+            error_rate: Taxa de falsos positivos desejada (0 a 1)
+
+        Returns:
+            Filtro dimensionado (bits e hashes ótimos)
+        """
+        if not 0 < error_rate < 1:
+            raise ValueError(f"Taxa de falsos positivos inválida: {error_rate}")
+        capacity = max(capacity, 1)
+        bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        hashes = round(bits / capacity * math.log(2))
+        return cls(bits, hashes)
+
+    def _positions(self, name: str) -> Iterator[int]:
+        digest = hashlib.blake2b(name.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        bits = self.bits
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % bits
+
+    def add(self, name: str):
+        array = self._array
+        for position in self._positions(name):
+            array[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, name: object) -> bool:
+        if not isinstance(name, str):
+            return False
+        array = self._array
+        return all(array[position >> 3] & (1 << (position & 7)) for position in self._positions(name))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def save(self, path: str):
+        """Grava o filtro (cabeçalho + bits) de forma atômica"""
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(self.HEADER.pack(self.MAGIC, self.bits, self.hashes, self.count, self.built_at))
+            f.write(self._array)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: str) -> "BloomFilter":
+        """
+        Raises:
+            ValueError: Se o arquivo não for um filtro válido
+        """
+        data = Path(path).read_bytes()
+        if len(data) < cls.HEADER.size:
+            raise ValueError(f"Filtro inválido: {path}")
+        magic, bits, hashes, count, built_at = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC or len(data) - cls.HEADER.size != (bits + 7) // 8:
+            raise ValueError(f"Filtro inválido: {path}")
+
+        bloom = cls(bits, hashes)
+        bloom.count = count
+        bloom.built_at = built_at
+        bloom._array = bytearray(data[cls.HEADER.size:])
+        return bloom
+
+
+def read_statuses(path: str) -> Iterator[Tuple[str, Optional[str]]]:
+    """
+    Lê pares (domínio, status) de uma fonte
+
+    O formato é deduzido da extensão: resultados .jsonl, .csv (com coluna
+    status) e .parquet das saídas do verificador, cache .sqlite3, journal
+    (linhas `dominio<TAB>status`) ou lista de domínios, um por linha
+    (status None: todos considerados registrados, como numa exportação da
+    zona).
+
+    Args:
+        path: Arquivo de origem
+
+    Returns:
+        Iterador de (domínio, status)
+
+    Raises:
+        ValueError: Se um CSV não tiver as colunas dominio e status
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix == ".jsonl":
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    yield row["dominio"], row["status"]
+    elif suffix == ".csv":
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            if not {"dominio", "status"} <= set(reader.fieldnames or ()):
+                raise ValueError(f"{path}: CSV sem as colunas dominio e status")
+            for row in reader:
+                yield row["dominio"], row["status"]
+    elif suffix == ".parquet":
+        from pyarrow import parquet
+        table = parquet.read_table(path, columns=["dominio", "status"])
+        yield from zip(table.column("dominio").to_pylist(), table.column("status").to_pylist())
+    elif suffix in (".sqlite3", ".sqlite", ".db"):
+        conn = sqlite3.connect(path)
+        try:
+            yield from conn.execute("SELECT domain, status FROM results")
+        finally:
+            conn.close()
+    else:
+        with open(path, "rb") as f:
+            journal = b"\t" in f.readline()
+        if journal:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                for line in f:
+                    domain, _, status = line.rstrip("\n").partition("\t")
+                    if status:
+                        yield domain, status
+        else:
+            for domain in Normalizer().read_file(path):
+                yield domain, None
+
+
+def build_index(
+    sources: Sequence[str],
+    output: str,
+    error_rate: float = DEFAULT_ERROR_RATE
+) -> BloomFilter:
+    """
+    Monta e grava o filtro de nomes registrados
+
+    As fontes são lidas em ordem e o último status de cada domínio vale:
+    um domínio registrado numa varredura antiga e disponível numa recente
+    fica fora do filtro.
+
+    Args:
+        sources: Arquivos de resultados, caches, journals ou listas
+        output: Arquivo do filtro
+        error_rate: Taxa de falsos positivos
+
+    Returns:
+        Filtro gravado
+    """
+    known: Dict[str, bool] = {}
+    for source in sources:
+        for domain, status in read_statuses(source):
+            if status != "error":  # erro não diz nada sobre o registro
+                known[domain] = status is None or status in KNOWN_STATUSES
+
+    registered = [domain for domain, is_known in known.items() if is_known]
+    bloom = BloomFilter.for_capacity(len(registered), error_rate)
+    for domain in registered:
+        bloom.add(domain)
+    bloom.save(output)
+    return bloom
+
+
+class KnownRegistered:
+    """
+    Aplica o filtro de registrados a uma varredura
+
+    Um nome encontrado no filtro é pulado (modo 'skip') ou deixado para o
+    fim da varredura (modo 'defer'), a menos que esteja no seu dia de
+    reverificação: cada nome conhecido volta a ser consultado uma vez a cada
+    `refresh_days` dias, escolhido por hash, então varreduras diárias
+    reverificam ~1/refresh_days dos registrados e expirações aparecem com
+    no máximo esse atraso. Falsos positivos do filtro (nomes livres
+    tratados como registrados) também são corrigidos nesse ciclo.
+    """
+
+    MODES = ("skip", "defer")
+
+    def __init__(
+        self,
+        bloom: BloomFilter,
+        mode: str = "skip",
+        refresh_days: int = DEFAULT_REFRESH_DAYS,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Args:
+            bloom: Filtro de nomes registrados
+            mode: 'skip' (não consulta) ou 'defer' (consulta depois dos demais)
+            refresh_days: Ciclo de reverificação em dias (0 nunca reverifica)
+            clock: Relógio de parede (substituível em testes)
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Modo de pré-filtro desconhecido: {mode}")
+        self.bloom = bloom
+        self.mode = mode
+        self.refresh_days = refresh_days
+        self.clock = clock
+        self.skipped = 0
+        self.deferred = 0
+        self.rechecked = 0
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "KnownRegistered":
+        """
+        Args:
+            path: Arquivo gravado por build_index
+            **kwargs: mode, refresh_days e clock
+
+        Returns:
+            Pré-filtro com o filtro do arquivo
+        """
+        return cls(BloomFilter.load(path), **kwargs)
+
+    def is_due(self, domain: str) -> bool:
+        """
+        Returns:
+            True se hoje é o dia de reverificar `domain`
+        """
+        if not self.refresh_days:
+            return False
+        today = int(self.clock() // DAY)
+        return zlib.crc32(domain.encode("utf-8")) % self.refresh_days == today % self.refresh_days
+
+    def filter(
+        self,
+        domains: Iterable[str],
+        on_route: Optional[Callable[[str, str], None]] = None
+    ) -> Iterator[str]:
+        """
+        Filtra a sequência de domínios a verificar
+
+        Args:
+            domains: Domínios da varredura
+            on_route: Chamado com (domínio, 'skipped' | 'deferred' | 'rechecked')
+                para cada nome encontrado no filtro
+
+        Returns:
+            Iterador com os domínios a consultar; no modo 'defer', os
+            registrados vêm depois de todos os outros
+        """
+        bloom = self.bloom
+        deferred = []
+        for domain in domains:
+            if domain in bloom:
+                if self.is_due(domain):
+                    route = "rechecked"
+                    self.rechecked += 1
+                elif self.mode == "defer":
+                    route = "deferred"
+                    self.deferred += 1
+                    deferred.append(domain)
+                else:
+                    route = "skipped"
+                    self.skipped += 1
+                if on_route is not None:
+                    on_route(domain, route)
+                if route != "rechecked":
+                    continue
+            yield domain
+        yield from deferred
+
+    def describe(self) -> str:
+        """
+        Returns:
+            Descrição para o log de início
+        """
+        built = time.strftime("%Y-%m-%d %H:%M", time.localtime(self.bloom.built_at))
+        refresh = f"reverificação a cada {self.refresh_days} dias" if self.refresh_days else "sem reverificação"
+        action = "pulados" if self.mode == "skip" else "deixados para o fim"
+        return f"{len(self.bloom)} registrados conhecidos (índice de {built}) {action}, {refresh}"
+
+    def summary(self) -> str:
+        """
+        Returns:
+            Resumo para o log final
+        """
+        return f"{self.skipped} pulados, {self.deferred} adiados, {self.rechecked} reverificados"
+
+
+def main():
+    """
+    Monta o índice de registrados pela linha de comando
+    """
+    try:
+        from .domain_checker_advanced import setup_logging
+    except ImportError:
+        from domain_checker_advanced import setup_logging
+
+    parser = argparse.ArgumentParser(
+        description='Monta o índice de domínios .com.br sabidamente registrados (filtro de Bloom)',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exemplos de uso:
+
+  # A partir dos resultados de varreduras anteriores (o último status vale)
+  python prefilter.py resultados_maio.jsonl resultados_junho.parquet
+
+  # A partir de uma lista de domínios (um por linha) e do cache local
+  python prefilter.py lista_registrados.txt ~/.cache/osintlab/domain_cache.sqlite3
+
+  # Usar na varredura
+  python domain_checker_advanced.py --pattern 4letters --known known_registered.bloom
+        """
+    )
+    parser.add_argument('sources', nargs='+', metavar='FONTE', help='Resultados (.jsonl, .csv, .parquet), cache (.sqlite3), journal ou lista')
+    parser.add_argument('--output', default='known_registered.bloom', help='Arquivo do índice (padrão: known_registered.bloom)')
+    parser.add_argument('--error-rate', type=float, default=DEFAULT_ERROR_RATE, help=f'Taxa de falsos positivos (padrão: {DEFAULT_ERROR_RATE})')
+    args = parser.parse_args()
+
+    logger = setup_logging(None)
+    start = time.monotonic()
+    try:
+        bloom = build_index(args.sources, args.output, args.error_rate)
+    except (OSError, ValueError, KeyError) as e:
+        logger.error(f"❌ {e}")
+        sys.exit(1)
+
+    size = Path(args.output).stat().st_size
+    logger.info(
+        f"🧱 {len(bloom)} registrados em {args.output} ({size / 1024:.0f} KiB, "
+        f"{bloom.hashes} hashes, {args.error_rate:.2%} de falsos positivos) "
+        f"em {time.monotonic() - start:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Progresso da Verificação por Tempo
+Acompanha resultados e requisições e informa, a cada N segundos,
+concluídos/total, taxa recente, latência p50/p95 e ETA, independente do
+agendamento (lotes, janela, shards ou a interface web)
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Callable, Deque, List, NamedTuple, Optional
+
+
+def format_duration(seconds: float) -> str:
+    """
+    Args:
+        seconds: Duração em segundos
+
+    Returns:
+        Duração compacta: '45s', '12m05s' ou '3h20m'
+    """
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return f"{minutes}m{seconds:02d}s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m"
+
+
+class ProgressSnapshot(NamedTuple):
+    """Estado do progresso em um instante"""
+
+    completed: int  # domínios com resultado final, inclusive erros
+    total: Optional[int]
+    available: int
+    errors: int
+    elapsed: float  # segundos desde o início
+    rps: float  # requisições por segundo na janela recente
+    rate: float  # domínios concluídos por segundo na janela recente
+    p50: Optional[float]  # latência mediana recente (segundos)
+    p95: Optional[float]
+    eta: Optional[float]  # segundos até concluir, pela taxa recente
+
+    @property
+    def fraction(self) -> Optional[float]:
+        """Fração concluída (0 a 1), ou None sem total"""
+        if self.total is None:
+            return None
+        return min(self.completed / self.total, 1.0) if self.total else 1.0
+
+    def format(self) -> str:
+        """
+        Returns:
+            Linha de progresso para o log
+        """
+        if self.fraction is None:
+            position = f"{self.completed}"
+        else:
+            position = f"{self.completed}/{self.total} ({self.fraction * 100:.1f}%)"
+
+        parts = [f"📊 Progresso: {position}", f"{self.rps:.1f} req/s"]
+        if self.p50 is not None:
+            parts.append(f"p50 {self.p50 * 1000:.0f}ms p95 {self.p95 * 1000:.0f}ms")
+        if self.eta is not None:
+            parts.append(f"ETA {format_duration(self.eta)}")
+        parts.append(f"Disponíveis: {self.available}")
+        parts.append(f"Erros: {self.errors}")
+        return " | ".join(parts)
+
+
+class ProgressTracker:
+    """
+    Contadores de progresso com taxa e latência em janela deslizante
+
+    As taxas são somadas em baldes de um segundo dos últimos `window`
+    segundos, e as latências são as `latency_samples` mais recentes, então a
+    memória é constante e o ETA acompanha mudanças de ritmo (limitação de
+    taxa, proxies ejetados) em vez da média desde o início.
+    """
+
+    def __init__(
+        self,
+        window: float = 30.0,
+        latency_samples: int = 2048,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            window: Segundos considerados nas taxas
+            latency_samples: Latências guardadas para os percentis
+            clock: Relógio monotônico (substituível em testes)
+        """
+        self.window = window
+        self.clock = clock
+        self.total: Optional[int] = None
+        self.completed = 0
+        self.requests = 0
+        self.available = 0
+        self.errors = 0
+        self.started = clock()
+        # Baldes [segundo, requisições, concluídos]
+        self._buckets: Deque[List[int]] = deque()
+        self._latencies: Deque[float] = deque(maxlen=latency_samples)
+
+    def start(self, total: Optional[int] = None):
+        """Marca o início (ou recomeço) da verificação"""
+        self.total = total
+        self.started = self.clock()
+
+    def _bucket(self) -> List[int]:
+        second = int(self.clock())
+        if not self._buckets or self._buckets[-1][0] != second:
+            self._buckets.append([second, 0, 0])
+        return self._buckets[-1]
+
+    def record_request(self, latency: float):
+        """Registra uma requisição concluída (com sucesso ou não)"""
+        self._bucket()[1] += 1
+        self.requests += 1
+        self._latencies.append(latency)
+
+    def record_result(self, status: str):
+        """Registra o resultado final de um domínio"""
+        self._bucket()[2] += 1
+        self.completed += 1
+        if status == "available":
+            self.available += 1
+        elif status == "error":
+            self.errors += 1
+
+    def advance(self, completed: int = 0, requests: int = 0, available: int = 0, errors: int = 0):
+        """
+        Soma contagens agregadas de outra fonte (ex.: shards), contando na taxa
+
+        Args:
+            completed: Novos resultados finais
+            requests: Novas requisições
+            available: Novos disponíveis
+            errors: Novos erros
+        """
+        bucket = self._bucket()
+        bucket[1] += requests
+        bucket[2] += completed
+        self.requests += requests
+        self.completed += completed
+        self.available += available
+        self.errors += errors
+
+    def skip(self, count: int, available: int = 0, errors: int = 0):
+        """
+        Conta resultados já conhecidos (retomada do journal) sem afetar a taxa
+
+        Args:
+            count: Domínios já resolvidos
+            available: Quantos deles disponíveis
+            errors: Quantos deles com erro
+        """
+        self.completed += count
+        self.available += available
+        self.errors += errors
+
+    def snapshot(self) -> ProgressSnapshot:
+        """
+        Returns:
+            Estado atual do progresso
+        """
+        now = self.clock()
+        horizon = int(now) - int(self.window)
+        while self._buckets and self._buckets[0][0] <= horizon:
+            self._buckets.popleft()
+
+        elapsed = now - self.started
+        span = max(min(self.window, elapsed), 1.0)
+        requests = sum(bucket[1] for bucket in self._buckets)
+        completions = sum(bucket[2] for bucket in self._buckets)
+        rps = requests / span
+        rate = completions / span
+
+        p50 = p95 = None
+        if self._latencies:
+            ordered = sorted(self._latencies)
+            p50 = ordered[int(0.50 * (len(ordered) - 1))]
+            p95 = ordered[int(0.95 * (len(ordered) - 1))]
+
+        eta = None
+        if self.total is not None:
+            remaining = max(self.total - self.completed, 0)
+            if remaining == 0:
+                eta = 0.0
+            elif rate > 0:
+                eta = remaining / rate
+
+        return ProgressSnapshot(
+            self.completed, self.total, self.available, self.errors,
+            elapsed, rps, rate, p50, p95, eta
+        )
+
+
+class ProgressReporter:
+    """
+    Tarefa de fundo que entrega um ProgressSnapshot a cada `interval` segundos
+
+    O callback pode registrar no log ou atualizar widgets; ao parar, é
+    chamado uma última vez com o estado final.
+    """
+
+    def __init__(
+        self,
+        tracker: ProgressTracker,
+        callback: Callable[[ProgressSnapshot], None],
+        interval: float = 5.0
+    ):
+        """
+        Args:
+            tracker: Fonte do progresso
+            callback: Recebe cada snapshot
+            interval: Segundos entre relatórios
+        """
+        self.tracker = tracker
+        self.callback = callback
+        self.interval = interval
+        self._task: Optional[asyncio.Future] = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            self.callback(self.tracker.snapshot())
+
+    def start(self):
+        """Inicia o relatório periódico (requer um event loop rodando)"""
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self, final: bool = True):
+        """
+        Encerra o relatório periódico
+
+        Args:
+            final: Entrega um último snapshot ao callback
+        """
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if final:
+            self.callback(self.tracker.snapshot())
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.stop()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Pool de Proxies com Saúde e Circuit Breaker
+Escolhe proxies ponderando taxa de sucesso e latência, e isola os que falham
+"""
+
+import random
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+
+class ProxyStats:
+    """
+    Estatísticas e estado do circuit breaker de um proxy
+
+    Estados: 'closed' (recebe tráfego) e 'open' (ejetado até passar na sonda).
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self.requests = 0
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.success_ewma = 1.0
+        self.latency_ewma: Optional[float] = None
+        self.state = "closed"
+        self.opened_at = 0.0
+        self.ejections = 0
+
+    @property
+    def success_rate(self) -> float:
+        """Taxa de sucesso acumulada"""
+        return self.successes / self.requests if self.requests else 0.0
+
+    def weight(self) -> float:
+        """Peso de escolha: sucesso recente dividido pela latência média"""
+        latency = self.latency_ewma if self.latency_ewma is not None else 1.0
+        return max(self.success_ewma, 0.01) / max(latency, 0.01)
+
+
+class ProxyPool:
+    """
+    Pool de proxies com pontuação de saúde
+
+    Cada proxy mantém médias móveis (EWMA) de sucesso e latência. A escolha
+    é aleatória ponderada por sucesso/latência, então proxies rápidos e
+    estáveis recebem mais tráfego. Após `failure_threshold` falhas seguidas
+    o proxy é ejetado (circuito aberto) e só volta quando uma sonda em
+    segundo plano passa, depois de `cooldown` segundos. O sorteio usa `rng`,
+    que pode ser um random.Random com semente para uma escolha reproduzível.
+    """
+
+    def __init__(
+        self,
+        proxies: List[str],
+        failure_threshold: int = 5,
+        cooldown: float = 30.0,
+        smoothing: float = 0.2,
+        rng: Optional[random.Random] = None
+    ):
+        """
+        Args:
+            proxies: URLs dos proxies
+            failure_threshold: Falhas consecutivas até ejetar o proxy
+            cooldown: Segundos até um proxy ejetado ser sondado
+            smoothing: Peso da amostra nova nas médias móveis
+            rng: Gerador do sorteio ponderado (padrão: o módulo random)
+        """
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.smoothing = smoothing
+        self.rng = rng if rng is not None else random.Random()
+        self.stats: Dict[str, ProxyStats] = {url: ProxyStats(url) for url in proxies}
+
+    def __len__(self) -> int:
+        return len(self.stats)
+
+    def healthy(self) -> List[ProxyStats]:
+        """Proxies com circuito fechado"""
+        return [s for s in self.stats.values() if s.state == "closed"]
+
+    def choose(self) -> Optional[str]:
+        """
+        Escolhe um proxy ponderado pela saúde
+
+        Returns:
+            URL do proxy, ou None se o pool estiver vazio. Se todos estiverem
+            ejetados, retorna o ejetado há mais tempo (nunca cai para conexão
+            direta quando há proxies configurados).
+        """
+        if not self.stats:
+            return None
+
+        candidates = self.healthy()
+        if not candidates:
+            return min(self.stats.values(), key=lambda s: s.opened_at).url
+
+        weights = [s.weight() for s in candidates]
+        return self.rng.choices(candidates, weights=weights)[0].url
+
+    def choose_other(self, proxy: Optional[str]) -> Optional[str]:
+        """
+        Escolhe um proxy saudável diferente de `proxy`, ponderado pela saúde
+
+        Args:
+            proxy: Proxy a evitar (ex.: o da requisição que se quer duplicar)
+
+        Returns:
+            URL do proxy, ou None se não houver outro proxy saudável
+        """
+        candidates = [s for s in self.healthy() if s.url != proxy]
+        if not candidates:
+            return None
+        weights = [s.weight() for s in candidates]
+        return self.rng.choices(candidates, weights=weights)[0].url
+
+    def record_success(self, proxy: Optional[str], latency: float):
+        """
+        Registra uma resposta bem-sucedida pelo proxy
+
+        Args:
+            proxy: URL do proxy (None é ignorado)
+            latency: Latência da requisição (segundos)
+        """
+        stats = self.stats.get(proxy) if proxy else None
+        if stats is None:
+            return
+
+        stats.requests += 1
+        stats.successes += 1
+        stats.consecutive_failures = 0
+        stats.success_ewma += self.smoothing * (1.0 - stats.success_ewma)
+        if stats.latency_ewma is None:
+            stats.latency_ewma = latency
+        else:
+            stats.latency_ewma += self.smoothing * (latency - stats.latency_ewma)
+
+    def record_failure(self, proxy: Optional[str]):
+        """
+        Registra uma falha pelo proxy, ejetando-o após falhas consecutivas
+
+        Args:
+            proxy: URL do proxy (None é ignorado)
+        """
+        stats = self.stats.get(proxy) if proxy else None
+        if stats is None:
+            return
+
+        stats.requests += 1
+        stats.failures += 1
+        stats.consecutive_failures += 1
+        stats.success_ewma -= self.smoothing * stats.success_ewma
+
+        if stats.state == "closed" and stats.consecutive_failures >= self.failure_threshold:
+            stats.state = "open"
+            stats.opened_at = time.monotonic()
+            stats.ejections += 1
+
+    def due_for_probe(self) -> List[str]:
+        """Proxies ejetados cujo cooldown já passou"""
+        now = time.monotonic()
+        return [
+            s.url for s in self.stats.values()
+            if s.state == "open" and now - s.opened_at >= self.cooldown
+        ]
+
+    async def probe(self, check: Callable[[str], Awaitable[bool]]):
+        """
+        Sonda os proxies ejetados e readmite os que responderem
+
+        Args:
+            check: Corrotina que recebe a URL do proxy e retorna True se ele
+                respondeu corretamente
+        """
+        for url in self.due_for_probe():
+            stats = self.stats[url]
+            try:
+                ok = await check(url)
+            except Exception:
+                ok = False
+
+            if ok:
+                stats.state = "closed"
+                stats.consecutive_failures = 0
+                stats.success_ewma = 0.5
+            else:
+                stats.opened_at = time.monotonic()
+
+    def report(self) -> List[str]:
+        """
+        Returns:
+            Uma linha de estatísticas por proxy, do mais ao menos usado
+        """
+        lines = []
+        for s in sorted(self.stats.values(), key=lambda s: s.requests, reverse=True):
+            latency = f"{s.latency_ewma * 1000:.0f}ms" if s.latency_ewma is not None else "-"
+            lines.append(
+                f"{s.url} | {s.requests} req | {s.success_rate * 100:.1f}% ok | "
+                f"latência {latency} | ejeções {s.ejections} | {s.state}"
+            )
+        return lines
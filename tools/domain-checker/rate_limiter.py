@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Limitador de Taxa (Token Bucket)
+Limita requisições por segundo com capacidade de rajada, global ou por proxy
+"""
+
+import asyncio
+import time
+from typing import Dict, Optional
+
+
+class TokenBucket:
+    """
+    Token bucket assíncrono
+
+    O balde enche a `rate` tokens por segundo até `burst`. Cada requisição
+    consome um token; sem tokens, a requisição reserva o próximo (o saldo
+    fica negativo) e dorme até ele ficar disponível. Como a reserva é feita
+    sem `await` no meio, não é preciso lock dentro de um event loop. Uma
+    espera cancelada devolve a reserva.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        """
+        Args:
+            rate: Requisições por segundo
+            burst: Capacidade do balde (padrão: um segundo de taxa, mínimo 1)
+        """
+        if rate <= 0:
+            raise ValueError(f"Taxa inválida: {rate}")
+
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def time_until_available(self) -> float:
+        """
+        Returns:
+            Segundos até haver um token livre (0 se já houver)
+        """
+        self._refill(time.monotonic())
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    async def acquire(self):
+        """Consome um token, aguardando se necessário"""
+        self._refill(time.monotonic())
+        self._tokens -= 1
+        if self._tokens < 0:
+            try:
+                await asyncio.sleep(-self._tokens / self.rate)
+            except asyncio.CancelledError:
+                self._tokens += 1
+                raise
+
+
+class ProxyRateLimiter:
+    """
+    Um TokenBucket por proxy, criado sob demanda
+
+    Requisições sem proxy (conexão direta) compartilham o balde da chave None.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        """
+        Args:
+            rate: Requisições por segundo por proxy
+            burst: Capacidade de rajada por proxy
+        """
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[Optional[str], TokenBucket] = {}
+
+    def bucket(self, proxy: Optional[str]) -> TokenBucket:
+        """
+        Args:
+            proxy: URL do proxy (ou None)
+
+        Returns:
+            TokenBucket do proxy
+        """
+        bucket = self._buckets.get(proxy)
+        if bucket is None:
+            bucket = self._buckets[proxy] = TokenBucket(self.rate, self.burst)
+        return bucket
+
+    async def acquire(self, proxy: Optional[str]):
+        """Consome um token do balde do proxy"""
+        await self.bucket(proxy).acquire()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Cache Persistente de Resultados
+Cache em disco (SQLite) com TTL por status na frente da API do Registro.br
+"""
+
+import asyncio
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "osintlab" / "domain_cache.sqlite3"
+
+# TTLs padrão em segundos
+DEFAULT_TTL_TAKEN = 7 * 24 * 3600
+DEFAULT_TTL_AVAILABLE = 3600
+DEFAULT_TTL_ERROR = 0
+
+# Parâmetros por consulta em lote (o SQLite antigo aceita até 999)
+LOOKUP_CHUNK = 500
+
+
+class ResultCache:
+    """
+    Cache de resultados de verificação com TTL separado por status
+
+    Domínios ocupados raramente mudam e podem ficar em cache por dias;
+    disponíveis mudam mais e ficam pouco tempo; erros não são guardados
+    por padrão (ttl_error=0). Quando o cache passa de `max_entries`, as
+    entradas vencidas e depois as mais antigas são removidas.
+
+    Dentro do event loop, use lookup() e store(): as consultas saem em lote
+    e as gravações são agrupadas, ambas numa thread dedicada, para que um
+    banco WAL disputado por vários processos não trave as requisições em
+    andamento. get() e put() são as versões síncronas, uma por domínio.
+    """
+
+    STATUSES = ("available", "registered", "reserved", "invalid", "taken", "error")
+
+    def __init__(
+        self,
+        path: str = str(DEFAULT_CACHE_PATH),
+        ttl_taken: float = DEFAULT_TTL_TAKEN,
+        ttl_available: float = DEFAULT_TTL_AVAILABLE,
+        ttl_error: float = DEFAULT_TTL_ERROR,
+        max_entries: int = 1_000_000,
+        write_batch: int = 256,
+        write_interval: float = 1.0
+    ):
+        """
+        Args:
+            path: Arquivo SQLite do cache (diretórios são criados se preciso)
+            ttl_taken: TTL (segundos) de domínios ocupados (registrados,
+                reservados ou inválidos)
+            ttl_available: TTL (segundos) de domínios disponíveis
+            ttl_error: TTL (segundos) de erros; 0 (padrão) não os guarda
+            max_entries: Quantidade máxima de entradas antes da remoção
+            write_batch: Resultados por gravação de store()
+            write_interval: Tempo máximo (segundos) que um resultado de
+                store() espera para ser gravado
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttls = {
+            "available": ttl_available,
+            "registered": ttl_taken,
+            "reserved": ttl_taken,
+            "invalid": ttl_taken,
+            "taken": ttl_taken,
+            "error": ttl_error,
+        }
+        self.max_entries = max_entries
+        self.write_batch = write_batch
+        self.write_interval = write_interval
+        self.hits = 0
+        self.misses = 0
+        self._puts_since_evict = 0
+        self._writes: List[Tuple[str, str]] = []
+        self._last_write = time.monotonic()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cache")
+        self._pending: Optional[Future] = None
+        # A conexão é usada pela thread do cache e pela que criou o objeto
+        self._lock = threading.RLock()
+
+        # timeout: vários processos (--workers) podem escrever no mesmo arquivo
+        self._conn = sqlite3.connect(
+            str(self.path), isolation_level=None, timeout=30, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " domain TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " stored_at REAL NOT NULL,"
+            " expires_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS results_stored_at ON results (stored_at)"
+        )
+
+    def get(self, domain: str) -> Optional[str]:
+        """
+        Busca um resultado ainda válido
+
+        Args:
+            domain: Domínio a consultar
+
+        Returns:
+            Status em cache (um de STATUSES) ou None
+        """
+        return self.get_many([domain]).get(domain)
+
+    def get_many(self, domains: Sequence[str]) -> Dict[str, str]:
+        """
+        Busca os resultados ainda válidos de vários domínios, em poucas consultas
+
+        Args:
+            domains: Domínios a consultar
+
+        Returns:
+            Status em cache (um de STATUSES) dos domínios encontrados
+        """
+        found: Dict[str, str] = {}
+        now = time.time()
+        with self._lock:
+            for i in range(0, len(domains), LOOKUP_CHUNK):
+                chunk = domains[i:i + LOOKUP_CHUNK]
+                rows = self._conn.execute(
+                    "SELECT domain, status FROM results WHERE expires_at > ?"
+                    f" AND domain IN ({','.join('?' * len(chunk))})",
+                    (now, *chunk)
+                )
+                found.update(rows)
+
+        self.hits += len(found)
+        self.misses += len(domains) - len(found)
+        return found
+
+    def put(self, domain: str, status: str):
+        """
+        Armazena um resultado com o TTL do seu status
+
+        Args:
+            domain: Domínio verificado
+            status: Um de STATUSES
+        """
+        self.put_many([(domain, status)])
+
+    def put_many(self, results: Iterable[Tuple[str, str]]):
+        """
+        Armazena vários resultados numa única transação
+
+        Args:
+            results: Pares (domínio, status)
+        """
+        now = time.time()
+        rows = [
+            (domain, status, now, now + self.ttls[status])
+            for domain, status in results
+            if self.ttls[status] > 0
+        ]
+        if not rows:
+            return
+
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO results (domain, status, stored_at, expires_at)"
+                    " VALUES (?, ?, ?, ?)",
+                    rows
+                )
+
+            self._puts_since_evict += len(rows)
+            if self._puts_since_evict >= max(1, self.max_entries // 100):
+                self.evict()
+
+    async def lookup(self, domains: Sequence[str]) -> Dict[str, str]:
+        """
+        get_many() na thread do cache, sem bloquear o event loop
+
+        Enxerga os resultados de store() já entregues à thread.
+
+        Args:
+            domains: Domínios a consultar
+
+        Returns:
+            Status em cache dos domínios encontrados
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.get_many, list(domains))
+
+    def store(self, domain: str, status: str):
+        """
+        Agenda a gravação de um resultado, sem bloquear
+
+        Os resultados são entregues à thread do cache a cada `write_batch`
+        resultados ou `write_interval` segundos; flush() grava o que falta.
+
+        Args:
+            domain: Domínio verificado
+            status: Um de STATUSES
+        """
+        if self.ttls[status] <= 0:
+            return
+        self._writes.append((domain, status))
+        if (len(self._writes) >= self.write_batch
+                or time.monotonic() - self._last_write >= self.write_interval):
+            self._submit()
+
+    def _submit(self):
+        self._last_write = time.monotonic()
+        if not self._writes:
+            return
+        batch, self._writes = self._writes, []
+        self._pending = self._executor.submit(self.put_many, batch)
+
+    def flush(self):
+        """Grava os resultados de store() pendentes e espera a thread (bloqueia)"""
+        self._submit()
+        if self._pending is not None:
+            self._pending.result()
+
+    def evict(self):
+        """Remove entradas vencidas e, se necessário, as mais antigas"""
+        with self._lock:
+            self._puts_since_evict = 0
+            self._conn.execute("DELETE FROM results WHERE expires_at <= ?", (time.time(),))
+
+            excess = len(self) - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM results WHERE domain IN"
+                    " (SELECT domain FROM results ORDER BY stored_at LIMIT ?)",
+                    (excess,)
+                )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def summary(self) -> str:
+        """
+        Returns:
+            Linha de resumo com hits e misses
+        """
+        total = self.hits + self.misses
+        rate = (self.hits / total) * 100 if total else 0.0
+        return f"{self.hits} hits / {self.misses} misses ({rate:.1f}% hit rate)"
+
+    def close(self):
+        """Grava o que falta e fecha a conexão com o banco"""
+        if self._executor is None:
+            return
+        self.flush()
+        self._executor.shutdown(wait=True)
+        self._executor = None
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
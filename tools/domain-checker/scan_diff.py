@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Diferença entre Varreduras
+Compara mapas de status (--status-map) de execuções do mesmo padrão, com
+operações vetorizadas sobre os códigos de cada índice: o que ficou
+disponível, o que foi registrado e o que oscila entre os dois
+"""
+
+import argparse
+import contextlib
+import csv
+import json
+import sys
+from typing import Dict, List, Optional, Sequence, TextIO
+
+try:
+    from .keyspace import keyspace_for_pattern
+    from .status_map import AVAILABLE, CODES_CHUNK, TAKEN, StatusMap
+except ImportError:
+    from keyspace import keyspace_for_pattern
+    from status_map import AVAILABLE, CODES_CHUNK, TAKEN, StatusMap
+
+# Tipos de mudança, na ordem de saída
+CHANGES = ("newly_available", "newly_taken", "flapping")
+CHANGE_LABELS = {
+    "newly_available": "passaram a disponíveis",
+    "newly_taken": "foram registrados",
+    "flapping": "oscilando",
+}
+
+# Trocas de status definitivo a partir das quais o domínio é "oscilando"
+FLAP_CHANGES = 2
+
+
+class ScanDiff:
+    """
+    Mudanças entre mapas de status, como índices do keyspace
+
+    Só disponível e registrado contam como status definitivos: desconhecido
+    e erro numa execução não apagam o que se sabia, então "antes" é o último
+    status definitivo de cada índice nas execuções anteriores à mais nova.
+    """
+
+    def __init__(self, pattern: str, size: int, indices: Dict[str, Sequence[int]], scans: int):
+        """
+        Args:
+            pattern: Padrão comum aos mapas
+            size: Quantidade de índices
+            indices: Arrays de índices por tipo de mudança (CHANGES)
+            scans: Quantidade de mapas comparados
+        """
+        self.pattern = pattern
+        self.size = size
+        self.indices = indices
+        self.scans = scans
+        self._keyspace = None
+
+    def domains(self, change: str) -> List[str]:
+        """
+        Args:
+            change: Um de CHANGES
+
+        Returns:
+            Domínios com essa mudança, na ordem do padrão
+        """
+        if self._keyspace is None:
+            self._keyspace = keyspace_for_pattern(self.pattern)
+        keyspace = self._keyspace
+        return [keyspace[int(i)] for i in self.indices[change]]
+
+    def counts(self) -> Dict[str, int]:
+        return {change: int(len(self.indices[change])) for change in CHANGES}
+
+    def write_json(self, out: TextIO):
+        data = {
+            "pattern": self.pattern,
+            "size": self.size,
+            "scans": self.scans,
+            "counts": self.counts(),
+        }
+        for change in CHANGES:
+            data[change] = self.domains(change)
+        json.dump(data, out, ensure_ascii=False, indent=2)
+        out.write("\n")
+
+    def write_csv(self, out: TextIO):
+        writer = csv.writer(out)
+        writer.writerow(("dominio", "mudanca"))
+        for change in CHANGES:
+            for domain in self.domains(change):
+                writer.writerow((domain, change))
+
+
+def diff_codes(series: Sequence) -> Dict[str, Sequence[int]]:
+    """
+    Compara códigos de status (arrays NumPy, da execução mais antiga para a
+    mais nova)
+
+    Args:
+        series: Arrays de StatusMap.codes(), todos da mesma faixa
+
+    Returns:
+        Arrays de índices (relativos à faixa) por tipo de mudança (CHANGES)
+    """
+    import numpy as np
+
+    newest = series[-1]
+    # Último status definitivo visto e quantas vezes ele trocou
+    last = np.zeros(len(newest), dtype=np.uint8)
+    flips = np.zeros(len(newest), dtype=np.uint16)
+    previous = last
+    for codes in series:
+        previous = last
+        # AVAILABLE (1) e TAKEN (2): em uint8, 0 - 1 vira 255
+        definitive = (codes - np.uint8(1)) <= 1
+        flips += definitive & (last != 0) & (codes != last)
+        last = np.where(definitive, codes, last)
+
+    return {
+        "newly_available": np.flatnonzero((newest == AVAILABLE) & (previous == TAKEN)),
+        "newly_taken": np.flatnonzero((newest == TAKEN) & (previous == AVAILABLE)),
+        "flapping": np.flatnonzero(flips >= FLAP_CHANGES),
+    }
+
+
+def diff_status_maps(paths: Sequence[str]) -> ScanDiff:
+    """
+    Compara mapas de status do mesmo padrão
+
+    Os mapas são comparados em faixas de CODES_CHUNK índices, então a
+    memória depende da faixa e da quantidade de mudanças, não do tamanho
+    do padrão.
+
+    Args:
+        paths: Mapas, do mais antigo para o mais novo (pelo menos dois)
+
+    Returns:
+        ScanDiff com as mudanças
+
+    Raises:
+        ValueError: Se houver menos de dois mapas ou forem de padrões diferentes
+        ImportError: Se numpy não estiver instalado
+    """
+    if len(paths) < 2:
+        raise ValueError("Informe pelo menos dois mapas de status")
+
+    pattern: Optional[str] = None
+    size = 0
+    found: Dict[str, list] = {change: [] for change in CHANGES}
+    with contextlib.ExitStack() as stack:
+        maps = []
+        for path in paths:
+            status_map = stack.enter_context(StatusMap.open(path))
+            if pattern is None:
+                pattern, size = status_map.pattern, status_map.size
+            elif (status_map.pattern, status_map.size) != (pattern, size):
+                raise ValueError(
+                    f"{path} é do padrão '{status_map.pattern}', não de '{pattern}'"
+                )
+            maps.append(status_map)
+
+        for start in range(0, size, CODES_CHUNK):
+            stop = start + CODES_CHUNK
+            changes = diff_codes([status_map.codes(start, stop) for status_map in maps])
+            for change, indices in changes.items():
+                if len(indices):
+                    found[change].append(indices + start)
+
+    import numpy as np
+
+    indices = {
+        change: np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+        for change, parts in found.items()
+    }
+    return ScanDiff(pattern, size, indices, len(paths))
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    """
+    Compara varreduras pela linha de comando
+    (`domain_checker_advanced.py diff ...` ou `scan_diff.py ...`)
+
+    Args:
+        argv: Argumentos (padrão: sys.argv[1:])
+    """
+    parser = argparse.ArgumentParser(
+        prog='domain_checker_advanced.py diff',
+        description='Compara mapas de status (--status-map) de varreduras do mesmo padrão',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exemplos de uso:
+
+  # O que mudou desde ontem
+  python domain_checker_advanced.py diff ontem.status hoje.status
+
+  # Em CSV, com a semana inteira para detectar domínios oscilando
+  python domain_checker_advanced.py diff seg.status ter.status qua.status --format csv -o mudancas.csv
+        """
+    )
+    parser.add_argument('maps', nargs='+', metavar='MAPA', help='Mapas de status, do mais antigo para o mais novo')
+    parser.add_argument('--format', choices=('json', 'csv'), default='json', help='Formato da saída (padrão: json)')
+    parser.add_argument('-o', '--output', metavar='ARQUIVO', help='Arquivo de saída (padrão: saída padrão)')
+    args = parser.parse_args(argv)
+
+    if len(args.maps) < 2:
+        parser.error('informe pelo menos dois mapas')
+    try:
+        diff = diff_status_maps(args.maps)
+    except (OSError, ValueError, ImportError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+
+    out = open(args.output, 'w', newline='', encoding='utf-8') if args.output else sys.stdout
+    try:
+        if args.format == 'csv':
+            diff.write_csv(out)
+        else:
+            diff.write_json(out)
+    finally:
+        if args.output:
+            out.close()
+
+    summary = ", ".join(f"{count} {CHANGE_LABELS[change]}" for change, count in diff.counts().items())
+    print(f"🔀 {diff.pattern}: {summary}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
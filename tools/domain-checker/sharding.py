@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Verificação Multiprocesso por Shards
+Divide o espaço de domínios em shards disjuntos, cada um verificado em um
+processo com event loop e DomainChecker próprios, e junta os resultados
+"""
+
+import argparse
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import queue
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+try:
+    from .keyspace import Keyspace, KeyspaceView
+    from .sinks import CheckResult, ResultSink
+except ImportError:
+    from keyspace import Keyspace, KeyspaceView
+    from sinks import CheckResult, ResultSink
+
+# Intervalo (segundos) entre relatórios dos shards e linhas de progresso do pai
+REPORT_INTERVAL = 1.0
+PROGRESS_INTERVAL = 5.0
+
+
+class AvailableReport(ResultSink):
+    """Sink de um shard que guarda os disponíveis até o próximo relatório ao pai"""
+
+    def __init__(self):
+        super().__init__(statuses=("available",))
+        self._pending: List[str] = []
+
+    def _write(self, result: CheckResult):
+        self._pending.append(result.domain)
+
+    def drain(self) -> List[str]:
+        """
+        Returns:
+            Disponíveis recebidos desde a chamada anterior
+        """
+        pending, self._pending = self._pending, []
+        return pending
+
+    def __repr__(self) -> str:
+        return "processo pai"
+
+
+def shard_domains(domains: Iterable[str], index: int, count: int) -> Iterable[str]:
+    """
+    Seleciona o shard `index` de `count` por passo (domínios index, index+count, ...)
+
+    Os shards são disjuntos e juntos cobrem todos os domínios. Intercalar,
+    em vez de cortar em faixas contíguas, mantém os shards com carga
+    parecida mesmo quando a latência varia ao longo do alfabeto.
+
+    Args:
+        domains: Domínios (Keyspace ou qualquer iterável em ordem estável)
+        index: Índice do shard (0 a count-1)
+        count: Quantidade de shards
+
+    Returns:
+        KeyspaceView (com .size e sem gerar os domínios dos outros shards)
+        para um Keyspace; iterador preguiçoso para os demais iteráveis
+    """
+    if not 0 <= index < count:
+        raise ValueError(f"Shard inválido: {index}/{count}")
+    if isinstance(domains, (Keyspace, KeyspaceView)):
+        return domains[index::count]
+    return itertools.islice(domains, index, None, count)
+
+
+def shard_path(path: str, index: int, count: int) -> str:
+    """
+    Args:
+        path: Arquivo base (journal ou log)
+        index: Índice do shard
+        count: Quantidade de shards
+
+    Returns:
+        Arquivo do shard; inclui `count` para que --resume com outro número
+        de workers não misture journals de divisões diferentes
+    """
+    return f"{path}.shard{index}of{count}"
+
+
+def run_shard(options: dict, proxies: List[str], index: int, count: int, events):
+    """
+    Ponto de entrada de um processo de shard
+
+    Envia ao processo pai, pela fila `events`, tuplas
+    ("progress", index, verificados, erros, novos_disponiveis, requisicoes) a
+    cada REPORT_INTERVAL segundos e, ao final, ("done", index, verificados,
+    erros, novos_disponiveis, requisicoes, retentativas).
+
+    Args:
+        options: Argumentos de main() (vars(args))
+        proxies: URLs dos proxies
+        index: Índice do shard
+        count: Quantidade de shards
+        events: multiprocessing.Queue para os relatórios
+    """
+    try:
+        from .domain_checker_advanced import (
+            create_checker, create_sinks, load_domains, logging_options, setup_logging
+        )
+        from .journal import ScanJournal
+        from .log_pipeline import stop_logging
+        from .metrics import serve_metrics_during
+        from .result_cache import ResultCache
+    except ImportError:
+        from domain_checker_advanced import (
+            create_checker, create_sinks, load_domains, logging_options, setup_logging
+        )
+        from journal import ScanJournal
+        from log_pipeline import stop_logging
+        from metrics import serve_metrics_during
+        from result_cache import ResultCache
+
+    args = argparse.Namespace(**options)
+    log_file = shard_path(args.log_file, index, count) if args.log_file else None
+    logger = setup_logging(
+        log_file,
+        prefix=f"[shard {index + 1}/{count}] ",
+        console_level=logging.WARNING,
+        **logging_options(args)
+    )
+
+    journal = ScanJournal(shard_path(args.journal, index, count), resume=args.resume)
+    cache = None
+    if args.cache:
+        cache = ResultCache(
+            args.cache_file,
+            ttl_taken=args.cache_ttl_taken,
+            ttl_available=args.cache_ttl_available,
+            max_entries=args.cache_max_entries
+        )
+
+    # Com --input, cada shard normaliza o arquivo inteiro e fica com a sua
+    # parte da sequência sem repetidos, igual em todos os shards
+    source, normalizer = load_domains(args)
+    keyspace = None
+    if normalizer is None:
+        keyspace = source.keyspace if isinstance(source, KeyspaceView) else source
+
+    # O CSV de disponíveis é gravado pelo pai; as demais saídas, por shard
+    # (o mapa de status é um só, criado pelo pai)
+    sinks = create_sinks(
+        args, include_output=False, suffix=shard_path("", index, count), keyspace=keyspace
+    )
+    available = AvailableReport()
+    checker = create_checker(
+        args, logger, proxies, journal=journal, cache=cache, sinks=sinks + [available],
+        workers=count
+    )
+
+    async def report():
+        while True:
+            await asyncio.sleep(REPORT_INTERVAL)
+            events.put((
+                "progress", index, checker.verificados, checker.erros,
+                available.drain(), checker.progress.requests
+            ))
+
+    async def scan():
+        domains = shard_domains(source, index, count)
+        reporter = asyncio.ensure_future(report())
+        try:
+            metrics_port = args.metrics_port + index if args.metrics_port is not None else None
+            await serve_metrics_during(
+                checker.verify_domains(domains, None), checker.metrics, metrics_port, logger=logger
+            )
+        finally:
+            reporter.cancel()
+            await asyncio.gather(reporter, return_exceptions=True)
+
+    try:
+        asyncio.run(scan())
+    except KeyboardInterrupt:
+        logger.warning("⚠️ Shard interrompido")
+    finally:
+        for sink in sinks:
+            sink.close()
+        journal.close()
+        if cache is not None:
+            cache.close()
+        if normalizer is not None:
+            logger.info(f"🧹 Entrada: {normalizer.summary()}")
+        events.put((
+            "done", index, checker.verificados, checker.erros,
+            available.drain(), checker.progress.requests, checker.retentativas
+        ))
+        stop_logging(logger)
+
+
+def run_sharded(
+    options: dict,
+    proxies: List[str],
+    workers: int,
+    logger: logging.Logger,
+    total: Optional[int],
+    output_file: str
+):
+    """
+    Executa a verificação em `workers` processos e junta os resultados
+
+    Cada processo recebe um shard disjunto do padrão, journal próprio
+    (`<journal>.shardIofN`) e, se ativado, abre o mesmo cache SQLite. O
+    processo pai soma os contadores, registra o progresso combinado e grava
+    em um único CSV os disponíveis de todos os shards, conforme chegam.
+    --results-csv/--results-jsonl são gravados por shard, com o sufixo
+    `.shardIofN`.
+
+    Args:
+        options: Argumentos de main() (vars(args)); precisam ser serializáveis
+        proxies: URLs dos proxies (compartilhados por todos os shards)
+        workers: Quantidade de processos
+        logger: Logger do processo pai
+        total: Quantidade total de domínios do padrão (None se desconhecida)
+        output_file: Arquivo CSV de saída combinado
+
+    Returns:
+        DomainChecker com os contadores combinados (apenas para consulta;
+        não é usado para verificar)
+    """
+    try:
+        from .domain_checker_advanced import DomainChecker
+        from .progress import ProgressTracker
+        from .sinks import available_csv
+    except ImportError:
+        from domain_checker_advanced import DomainChecker
+        from progress import ProgressTracker
+        from sinks import available_csv
+
+    # spawn: cada shard começa limpo, sem herdar o event loop nem sockets do pai
+    context = multiprocessing.get_context("spawn")
+    events = context.Queue()
+    processes = [
+        context.Process(
+            target=run_shard,
+            args=(options, proxies, index, workers, events),
+            name=f"domain-shard-{index}",
+            daemon=True
+        )
+        for index in range(workers)
+    ]
+
+    merged = DomainChecker(logger)
+    output = available_csv(output_file)
+    # Último (verificados, erros, requisições) de cada shard
+    counters: Dict[int, tuple] = {}
+    done: Set[int] = set()
+    tracker = ProgressTracker()
+    tracker.start(total)
+    interval = options.get("progress_interval", PROGRESS_INTERVAL)
+
+    def apply(event: tuple):
+        kind, index, verificados, erros, available, requests = event[:6]
+        previous = counters.get(index)
+        counters[index] = (verificados, erros, requests)
+        # Os shards são disjuntos: cada disponível chega uma única vez
+        now = time.time()
+        for domain in available:
+            output.write(CheckResult(domain, "available", checked_at=now))
+        fresh = len(available)
+        merged.disponiveis += fresh
+
+        if previous is None and options.get("resume"):
+            # O primeiro relatório de um shard retomado inclui o journal,
+            # que não deve entrar na taxa
+            tracker.skip(verificados + erros, available=fresh, errors=erros)
+        else:
+            previous = previous or (0, 0, 0)
+            tracker.advance(
+                completed=verificados + erros - previous[0] - previous[1],
+                requests=requests - previous[2],
+                available=fresh,
+                errors=erros - previous[1]
+            )
+
+        if kind == "done":
+            merged.retentativas += event[6]
+            done.add(index)
+
+    def log_progress():
+        merged.verificados = sum(c[0] for c in counters.values())
+        merged.erros = sum(c[1] for c in counters.values())
+        logger.info(
+            f"{tracker.snapshot().format()} | "
+            f"Shards ativos: {workers - len(done)}/{workers}"
+        )
+
+    logger.info(f"🧩 Dividindo {total if total is not None else 'os'} domínios em {workers} processos")
+    for process in processes:
+        process.start()
+
+    def reap():
+        # Um shard que morreu sem enviar "done" (ex.: OOM) não trava o pai.
+        # Código 0 é um shard que terminou normalmente e cujo "done" ainda
+        # está na fila
+        for index, process in enumerate(processes):
+            if index not in done and not process.is_alive() and process.exitcode != 0:
+                logger.error(f"❌ Shard {index + 1}/{workers} terminou com código {process.exitcode}")
+                done.add(index)
+
+    # A verificação é por tempo, não só quando a fila esvazia: shards ativos
+    # mantêm a fila ocupada e esconderiam um shard morto até terminarem
+    last_log = last_reap = time.monotonic()
+    try:
+        while len(done) < workers:
+            try:
+                apply(events.get(timeout=REPORT_INTERVAL))
+            except queue.Empty:
+                pass
+            if time.monotonic() - last_reap >= REPORT_INTERVAL:
+                reap()
+                last_reap = time.monotonic()
+
+            if interval and time.monotonic() - last_log >= interval:
+                log_progress()
+                last_log = time.monotonic()
+    finally:
+        # Interrompido: os shards também recebem o Ctrl+C e enviam "done"
+        # com o parcial; a fila é drenada antes do join para não travá-los
+        deadline = time.monotonic() + 10
+        while len(done) < workers and time.monotonic() < deadline:
+            try:
+                apply(events.get(timeout=0.5))
+            except queue.Empty:
+                reap()
+        for process in processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+        log_progress()
+        output.close()
+        logger.info(f"💾 {output.written} domínios salvos em {output_file}")
+
+    return merged
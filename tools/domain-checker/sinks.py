@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Saídas de Resultados em Fluxo
+Cada resultado final é entregue aos sinks assim que sai, em vez de
+acumular tudo em memória até o fim da varredura
+"""
+
+import csv
+import io
+import json
+import sys
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Collection, List, NamedTuple, Optional, Sequence, TextIO
+
+# Colunas disponíveis para CSV/JSONL
+FIELDS = ("dominio", "status", "latencia_ms", "proxy", "tentativas", "verificado_em")
+
+# Colunas do CSV de disponíveis (--output), o mesmo formato de save_results
+AVAILABLE_FIELDS = ("dominio", "verificado_em")
+
+
+class CheckResult(NamedTuple):
+    """Resultado final da verificação de um domínio"""
+
+    domain: str
+    status: str  # 'available', 'registered', 'reserved', 'invalid' ou 'error'
+    latency: Optional[float] = None  # segundos da tentativa que resolveu
+    proxy: Optional[str] = None
+    attempts: int = 0  # 0 quando veio do cache ou do journal
+    checked_at: Optional[float] = None  # time.time(); None se retomado do journal
+
+    def as_row(self) -> dict:
+        """
+        Returns:
+            Dicionário com as colunas de FIELDS
+        """
+        return {
+            "dominio": self.domain,
+            "status": self.status,
+            "latencia_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+            "proxy": self.proxy,
+            "tentativas": self.attempts,
+            "verificado_em": (
+                datetime.fromtimestamp(self.checked_at).isoformat()
+                if self.checked_at is not None else None
+            ),
+        }
+
+
+class ResultSink(ABC):
+    """
+    Interface dos sinks: write() por resultado, flush() e close()
+
+    `statuses` restringe os resultados aceitos (None aceita todos).
+    Subclasses implementam _write().
+    """
+
+    def __init__(self, statuses: Optional[Collection[str]] = None):
+        self.statuses = set(statuses) if statuses is not None else None
+        self.written = 0
+
+    def accepts(self, result: CheckResult) -> bool:
+        """True se o status do resultado deve ser gravado"""
+        return self.statuses is None or result.status in self.statuses
+
+    def write(self, result: CheckResult):
+        """Recebe um resultado (chamado no event loop; não deve bloquear)"""
+        if self.accepts(result):
+            self.written += 1
+            self._write(result)
+
+    @abstractmethod
+    def _write(self, result: CheckResult):
+        """Grava um resultado já aceito por accepts()"""
+
+    def flush(self):
+        """Garante que os resultados recebidos até aqui foram gravados"""
+
+    def close(self):
+        """Grava o que falta e libera recursos"""
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class BufferedFileSink(ResultSink):
+    """
+    Base de sinks em arquivo: formata no event loop e grava em outra thread
+
+    Os itens formatados são acumulados e entregues a uma thread dedicada a
+    cada `buffer_size` resultados ou `flush_interval` segundos, o que vier
+    primeiro. Com uma única thread as gravações mantêm a ordem. Subclasses
+    implementam _format() e, se não gravarem texto, _open() e _write_chunk().
+    """
+
+    def __init__(
+        self,
+        path: str,
+        statuses: Optional[Collection[str]] = None,
+        buffer_size: int = 512,
+        flush_interval: float = 1.0
+    ):
+        """
+        Args:
+            path: Arquivo de saída (recriado)
+            statuses: Status aceitos (None para todos)
+            buffer_size: Resultados por gravação
+            flush_interval: Tempo máximo (segundos) que um resultado espera no buffer
+        """
+        super().__init__(statuses)
+        self.path = Path(path)
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self._buffer: list = []
+        self._last_flush = time.monotonic()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sink")
+        self._pending: Optional[Future] = None
+        self._closed = False
+        self._open()
+
+    def _open(self):
+        self._file = open(self.path, 'w', newline='', encoding='utf-8')
+        header = self._header()
+        if header:
+            self._file.write(header)
+            self._file.flush()
+
+    def _header(self) -> str:
+        return ""
+
+    @abstractmethod
+    def _format(self, result: CheckResult):
+        """Item do buffer para um resultado (uma linha de texto, por padrão)"""
+
+    def _write(self, result: CheckResult):
+        self._buffer.append(self._format(result))
+        if (len(self._buffer) >= self.buffer_size
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self._submit()
+
+    def _submit(self):
+        """Entrega o buffer à thread de gravação sem esperar"""
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        chunk, self._buffer = self._buffer, []
+        self._pending = self._executor.submit(self._write_chunk, chunk)
+
+    def _write_chunk(self, chunk: list):
+        self._file.write("".join(chunk))
+        self._file.flush()
+
+    def flush(self):
+        """Grava o buffer e espera a thread terminar (bloqueia)"""
+        self._submit()
+        if self._pending is not None:
+            self._pending.result()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self.flush()
+        self._executor.shutdown(wait=True)
+        self._close_file()
+
+    def _close_file(self):
+        self._file.close()
+
+    def __repr__(self) -> str:
+        return str(self.path)
+
+
+class CsvSink(BufferedFileSink):
+    """Resultados em CSV, com as colunas escolhidas de FIELDS"""
+
+    def __init__(
+        self,
+        path: str,
+        statuses: Optional[Collection[str]] = None,
+        fields: Sequence[str] = FIELDS,
+        **kwargs
+    ):
+        """
+        Args:
+            path: Arquivo CSV
+            statuses: Status aceitos (None para todos)
+            fields: Colunas, na ordem
+            **kwargs: buffer_size e flush_interval de BufferedFileSink
+        """
+        self.fields = tuple(fields)
+        super().__init__(path, statuses, **kwargs)
+
+    def _csv_line(self, values) -> str:
+        out = io.StringIO()
+        csv.writer(out).writerow(values)
+        return out.getvalue()
+
+    def _header(self) -> str:
+        return self._csv_line(self.fields)
+
+    def _format(self, result: CheckResult) -> str:
+        row = result.as_row()
+        return self._csv_line(["" if row[f] is None else row[f] for f in self.fields])
+
+
+class JsonlSink(BufferedFileSink):
+    """Resultados em JSON Lines, um objeto com todas as colunas por linha"""
+
+    def _format(self, result: CheckResult) -> str:
+        return json.dumps(result.as_row(), ensure_ascii=False) + "\n"
+
+
+class ParquetSink(BufferedFileSink):
+    """
+    Resultados em Parquet (Arrow), um row group a cada `buffer_size` resultados
+
+    Colunas tipadas: status e proxy com dicionário, verificado_em como
+    timestamp, latência float32 e tentativas uint8. Carregar a tabela
+    completa de uma varredura de 4 letras leva uma fração de segundo, contra
+    vários segundos do CSV equivalente. O rodapé do Parquet só é gravado em
+    close(), então o arquivo fica legível ao fim da execução.
+
+    Requer pyarrow (`pip install pyarrow`).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        statuses: Optional[Collection[str]] = None,
+        buffer_size: int = 65536,
+        flush_interval: float = 60.0
+    ):
+        """
+        Args:
+            path: Arquivo Parquet
+            statuses: Status aceitos (None para todos)
+            buffer_size: Resultados por row group
+            flush_interval: Tempo máximo (segundos) até gravar um row group parcial
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Saída Parquet requer pyarrow: pip install pyarrow") from e
+
+        self._pa = pa
+        self._pq = pq
+        self.schema = pa.schema([
+            ("dominio", pa.string()),
+            ("status", pa.dictionary(pa.int8(), pa.string())),
+            ("latencia_ms", pa.float32()),
+            ("proxy", pa.dictionary(pa.int32(), pa.string())),
+            ("tentativas", pa.uint8()),
+            ("verificado_em", pa.timestamp("ms")),
+        ])
+        super().__init__(path, statuses, buffer_size, flush_interval)
+
+    def _open(self):
+        self._writer = self._pq.ParquetWriter(
+            str(self.path), self.schema,
+            compression="zstd",
+            use_dictionary=["status", "proxy"]
+        )
+
+    def _format(self, result: CheckResult) -> CheckResult:
+        return result
+
+    def _write_chunk(self, chunk: List[CheckResult]):
+        pa = self._pa
+        domains, statuses, latencies, proxies, attempts, checked = zip(*chunk)
+        table = pa.Table.from_arrays([
+            pa.array(domains, pa.string()),
+            pa.array(statuses, pa.string()).dictionary_encode().cast(self.schema.field("status").type),
+            pa.array([lat * 1000 if lat is not None else None for lat in latencies], pa.float32()),
+            pa.array(proxies, pa.string()).dictionary_encode().cast(self.schema.field("proxy").type),
+            pa.array([min(a, 255) for a in attempts], pa.uint8()),
+            pa.array(
+                [int(t * 1000) if t is not None else None for t in checked],
+                pa.int64()
+            ).cast(pa.timestamp("ms")),
+        ], schema=self.schema)
+        self._writer.write_table(table)
+
+    def _close_file(self):
+        self._writer.close()
+
+
+class StdoutSink(ResultSink):
+    """Imprime cada resultado aceito assim que sai, uma linha `dominio<TAB>status`"""
+
+    def __init__(self, statuses: Optional[Collection[str]] = ("available",), stream: TextIO = None):
+        """
+        Args:
+            statuses: Status impressos (padrão: só disponíveis)
+            stream: Destino (padrão: sys.stdout)
+        """
+        super().__init__(statuses)
+        self.stream = stream
+
+    def _write(self, result: CheckResult):
+        stream = self.stream or sys.stdout
+        stream.write(f"{result.domain}\t{result.status}\n")
+        stream.flush()
+
+    def __repr__(self) -> str:
+        return "stdout"
+
+
+def available_csv(path: str) -> CsvSink:
+    """
+    Args:
+        path: Arquivo CSV
+
+    Returns:
+        Sink que grava só os disponíveis, no formato `dominio,verificado_em`
+    """
+    return CsvSink(path, statuses=("available",), fields=AVAILABLE_FIELDS)
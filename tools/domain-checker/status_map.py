@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Mapa de Status da Varredura
+Array de 2 bits por índice do keyspace (desconhecido, disponível,
+registrado, erro), mapeado em memória e gravado conforme os resultados
+chegam; outros processos leem o estado de uma varredura em andamento
+direto do arquivo
+"""
+
+import argparse
+import mmap
+import re
+import struct
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem trava entre processos
+    fcntl = None
+
+try:
+    from .keyspace import Keyspace, keyspace_for_pattern
+    from .sinks import CheckResult, ResultSink
+except ImportError:
+    from keyspace import Keyspace, keyspace_for_pattern
+    from sinks import CheckResult, ResultSink
+
+# Códigos de 2 bits
+UNKNOWN = 0
+AVAILABLE = 1
+TAKEN = 2
+ERROR = 3
+CODE_NAMES = ("unknown", "available", "taken", "error")
+
+# Status dos resultados -> código ("taken" vem de journals antigos)
+STATUS_CODES = {
+    "available": AVAILABLE,
+    "registered": TAKEN,
+    "reserved": TAKEN,
+    "invalid": TAKEN,
+    "taken": TAKEN,
+    "error": ERROR,
+}
+
+# Limite de entradas (1 GiB de arquivo); acima disso o padrão é grande demais
+MAX_ENTRIES = 1 << 32
+
+# Bytes do mapa lidos por vez em counts() e indices() (4 índices por byte),
+# e índices por faixa de codes() numa comparação completa (scan_diff): a
+# memória usada não cresce com o tamanho do mapa
+DATA_CHUNK = 1 << 20
+CODES_CHUNK = 4 * DATA_CHUNK
+
+# Quantos índices de cada código há em cada valor de byte
+_COUNT_TABLES = [
+    bytes(sum(1 for shift in (0, 2, 4, 6) if (value >> shift) & 3 == code) for value in range(256))
+    for code in range(4)
+]
+_NONZERO = re.compile(rb"[^\x00]")
+
+
+class StatusMap:
+    """
+    Status de cada índice de um keyspace em 2 bits, num arquivo mapeado
+
+    O arquivo tem um cabeçalho (magic, quantidade de índices e o padrão que
+    os gerou) seguido de 4 índices por byte, o índice i nos bits
+    2*(i%4)..2*(i%4)+1 do byte i//4. Um padrão de 4 letras ocupa ~112 KiB.
+    As gravações vão direto para o mapeamento compartilhado: o sistema
+    operacional leva as páginas ao disco, e leitores que abrem o mesmo
+    arquivo veem o estado atual sem cópia. Como quatro índices dividem um
+    byte, processos diferentes (shards intercalados) gravam com uma trava
+    fcntl no byte alterado.
+    """
+
+    MAGIC = b"DCSTAT01"
+    # magic, quantidade de índices, tamanho do padrão em bytes
+    HEADER = struct.Struct("<8sQH")
+    DATA_OFFSET = 512
+
+    def __init__(self, path: str, size: int, pattern: str, resume: bool = False, shared: bool = False):
+        """
+        Args:
+            path: Arquivo do mapa
+            size: Quantidade de índices (tamanho do keyspace)
+            pattern: Padrão que gerou o keyspace, gravado no cabeçalho
+            resume: Reabre um mapa existente do mesmo padrão em vez de zerá-lo
+            shared: Trava cada byte alterado (vários processos gravando)
+
+        Raises:
+            ValueError: Se o keyspace for grande demais ou o mapa existente
+                for de outro padrão
+        """
+        if size > MAX_ENTRIES:
+            raise ValueError(f"Keyspace grande demais para o mapa de status: {size} índices")
+        encoded = pattern.encode("utf-8")
+        if self.HEADER.size + len(encoded) > self.DATA_OFFSET:
+            raise ValueError(f"Padrão longo demais para o cabeçalho: {pattern}")
+
+        self.path = Path(path)
+        self.size = size
+        self.pattern = pattern
+        self.writable = True
+        self._locked = shared and fcntl is not None
+
+        length = self.DATA_OFFSET + (size + 3) // 4
+        if resume and self.path.exists():
+            stored_size, stored_pattern = self._read_header(self.path)
+            if (stored_size, stored_pattern) != (size, pattern):
+                raise ValueError(
+                    f"{self.path} é do padrão '{stored_pattern}' ({stored_size} índices), "
+                    f"não de '{pattern}' ({size})"
+                )
+            self._file = open(self.path, "r+b")
+        else:
+            self._file = open(self.path, "w+b")
+            self._file.write(self.HEADER.pack(self.MAGIC, size, len(encoded)) + encoded)
+            self._file.truncate(length)  # esparso: zeros = desconhecido
+            self._file.flush()
+        self._mm = mmap.mmap(self._file.fileno(), length)
+
+    @classmethod
+    def _read_header(cls, path: Path):
+        with open(path, "rb") as f:
+            raw = f.read(cls.DATA_OFFSET)
+        if len(raw) < cls.HEADER.size:
+            raise ValueError(f"Mapa de status inválido: {path}")
+        magic, size, pattern_len = cls.HEADER.unpack_from(raw)
+        if magic != cls.MAGIC:
+            raise ValueError(f"Mapa de status inválido: {path}")
+        pattern = raw[cls.HEADER.size:cls.HEADER.size + pattern_len].decode("utf-8")
+        return size, pattern
+
+    @classmethod
+    def open(cls, path: str) -> "StatusMap":
+        """
+        Abre um mapa só para leitura (ex.: de uma varredura em andamento)
+
+        Args:
+            path: Arquivo do mapa
+
+        Returns:
+            Mapa com `size` e `pattern` do cabeçalho
+
+        Raises:
+            ValueError: Se o arquivo não for um mapa de status
+        """
+        path = Path(path)
+        size, pattern = cls._read_header(path)
+        status_map = cls.__new__(cls)
+        status_map.path = path
+        status_map.size = size
+        status_map.pattern = pattern
+        status_map.writable = False
+        status_map._locked = False
+        status_map._file = open(path, "rb")
+        status_map._mm = mmap.mmap(status_map._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return status_map
+
+    def __len__(self) -> int:
+        return self.size
+
+    def get(self, index: int) -> int:
+        """
+        Returns:
+            Código (UNKNOWN, AVAILABLE, TAKEN ou ERROR) do índice
+        """
+        if not 0 <= index < self.size:
+            raise IndexError(f"Índice fora do mapa: {index}")
+        byte = self._mm[self.DATA_OFFSET + index // 4]
+        return (byte >> (2 * (index % 4))) & 3
+
+    def set(self, index: int, code: int):
+        """
+        Grava o código de um índice
+
+        Args:
+            index: Índice no keyspace
+            code: UNKNOWN, AVAILABLE, TAKEN ou ERROR
+        """
+        if not 0 <= index < self.size:
+            raise IndexError(f"Índice fora do mapa: {index}")
+        offset = self.DATA_OFFSET + index // 4
+        shift = 2 * (index % 4)
+        if self._locked:
+            fcntl.lockf(self._file, fcntl.LOCK_EX, 1, offset)
+        try:
+            byte = self._mm[offset]
+            self._mm[offset] = (byte & ~(3 << shift) & 0xFF) | (code << shift)
+        finally:
+            if self._locked:
+                fcntl.lockf(self._file, fcntl.LOCK_UN, 1, offset)
+
+    def _data(self, start: int = 0, stop: Optional[int] = None) -> bytes:
+        """Cópia dos bytes de dados [start, stop) (padrão: até o fim)"""
+        end = (self.size + 3) // 4
+        stop = end if stop is None else min(stop, end)
+        return self._mm[self.DATA_OFFSET + start:self.DATA_OFFSET + stop]
+
+    def _chunks(self) -> Iterator[Tuple[int, bytes]]:
+        """Os dados em pedaços de DATA_CHUNK bytes, como (posição do byte, bytes)"""
+        for start in range(0, (self.size + 3) // 4, DATA_CHUNK):
+            yield start, self._data(start, start + DATA_CHUNK)
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Returns:
+            Quantidade de índices por código ('unknown', 'available', 'taken', 'error')
+        """
+        counts = dict.fromkeys(CODE_NAMES, 0)
+        for _, data in self._chunks():
+            for code, name in enumerate(CODE_NAMES):
+                counts[name] += sum(data.translate(_COUNT_TABLES[code]))
+        # Os bits de preenchimento do último byte contam como desconhecidos
+        counts["unknown"] -= (self.size + 3) // 4 * 4 - self.size
+        return counts
+
+    def indices(self, code: int) -> Iterator[int]:
+        """
+        Índices com um código, em ordem; os bytes sem nenhum são pulados em C
+
+        Args:
+            code: AVAILABLE, TAKEN ou ERROR
+
+        Returns:
+            Iterador de índices
+        """
+        if code == UNKNOWN:
+            raise ValueError("Use counts() para os desconhecidos")
+        for start, data in self._chunks():
+            for match in _NONZERO.finditer(data.translate(_COUNT_TABLES[code])):
+                byte_index = match.start()
+                byte = data[byte_index]
+                for slot in range(4):
+                    if (byte >> (2 * slot)) & 3 == code:
+                        yield (start + byte_index) * 4 + slot
+
+    def codes(self, start: int = 0, stop: Optional[int] = None):
+        """
+        Códigos dos índices [start, stop) como array NumPy (um uint8 por
+        índice), para comparações vetorizadas
+
+        O array ocupa um byte por índice, quatro vezes o arquivo: mapas
+        grandes devem ser percorridos em faixas de CODES_CHUNK, como em
+        scan_diff. Requer numpy (`pip install numpy`).
+
+        Args:
+            start: Primeiro índice
+            stop: Fim da faixa, exclusivo (padrão: o fim do mapa)
+
+        Returns:
+            numpy.ndarray com os códigos da faixa
+        """
+        try:
+            import numpy as np
+        except ImportError as e:
+            raise ImportError("Operações vetorizadas no mapa requerem numpy: pip install numpy") from e
+
+        stop = self.size if stop is None else min(stop, self.size)
+        first = start // 4
+        packed = np.frombuffer(self._data(first, (stop + 3) // 4), dtype=np.uint8)
+        shifts = np.array([0, 2, 4, 6], dtype=np.uint8)
+        return ((packed[:, None] >> shifts) & 3).reshape(-1)[start - 4 * first:stop - 4 * first]
+
+    def flush(self):
+        """Pede ao sistema que grave as páginas alteradas (não é necessário para leitores)"""
+        if self.writable:
+            self._mm.flush()
+
+    def close(self):
+        if self._mm.closed:
+            return
+        self.flush()
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __repr__(self) -> str:
+        return str(self.path)
+
+
+class StatusMapSink(ResultSink):
+    """
+    Grava cada resultado no mapa de status, no índice do domínio
+
+    Resultados fora do keyspace (não deveriam ocorrer) são ignorados.
+    """
+
+    def __init__(self, status_map: StatusMap, keyspace: Keyspace):
+        """
+        Args:
+            status_map: Mapa aberto para gravação
+            keyspace: Keyspace do padrão (na ordem original, não embaralhada)
+        """
+        super().__init__()
+        self.status_map = status_map
+        self.keyspace = keyspace
+
+    def _write(self, result: CheckResult):
+        code = STATUS_CODES.get(result.status)
+        if code is None:
+            return
+        try:
+            index = self.keyspace.index(result.domain)
+        except ValueError:
+            return
+        self.status_map.set(index, code)
+
+    def flush(self):
+        self.status_map.flush()
+
+    def close(self):
+        self.status_map.close()
+
+    def __repr__(self) -> str:
+        return f"{self.status_map} (mapa de status)"
+
+
+def main():
+    """
+    Lê o mapa de status de uma varredura (em andamento ou concluída)
+    """
+    parser = argparse.ArgumentParser(
+        description='Mostra o estado de uma varredura a partir do mapa de status (--status-map)',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exemplos de uso:
+
+  # Contagem por status
+  python status_map.py scan.status
+
+  # Domínios disponíveis encontrados até agora
+  python status_map.py scan.status --list available
+        """
+    )
+    parser.add_argument('path', metavar='ARQUIVO', help='Mapa de status')
+    parser.add_argument(
+        '--list',
+        choices=CODE_NAMES[1:],
+        help='Imprime os domínios com este status, um por linha'
+    )
+    args = parser.parse_args()
+
+    try:
+        status_map = StatusMap.open(args.path)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+
+    with status_map:
+        if args.list:
+            keyspace = keyspace_for_pattern(status_map.pattern)
+            out = sys.stdout
+            for index in status_map.indices(CODE_NAMES.index(args.list)):
+                out.write(keyspace[index] + "\n")
+            return
+
+        counts = status_map.counts()
+        done = status_map.size - counts["unknown"]
+        print(f"Padrão: {status_map.pattern} ({status_map.size} domínios)")
+        print(f"Resolvidos: {done} ({done / max(status_map.size, 1):.1%})")
+        for name in CODE_NAMES:
+            print(f"  {name}: {counts[name]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,8 @@ import asyncio
 import aiohttp
 import sys
 
+from avail_parser import AVAILABLE, DEFINITIVE, LABELS, read_status
+
 API_URL = "https://registro.br/v2/ajax/avail/raw/"
 
 # Domínios de teste (alguns provavelmente disponíveis, outros ocupados)
@@ -22,14 +24,10 @@ async def check_domain(session, domain):
     """Verifica um domínio"""
     try:
         async with session.get(API_URL + domain, timeout=aiohttp.ClientTimeout(total=10)) as resp:
-            if resp.status == 200:
-                data = await resp.text()
-                if "disponível" in data.lower():
-                    return domain, "disponível"
-                else:
-                    return domain, "ocupado"
-            else:
-                return domain, f"erro: status {resp.status}"
+            status = await read_status(resp)
+            if status in DEFINITIVE:
+                return domain, status
+            return domain, f"erro: status {resp.status} ({LABELS[status]})"
     except Exception as e:
         return domain, f"erro: {str(e)[:50]}"
 
@@ -50,11 +48,11 @@ async def main():
     erros = 0
 
     for domain, status in results:
-        if status == "disponível":
+        if status == AVAILABLE:
             print(f"✅ {domain:<30} DISPONÍVEL")
             disponiveis += 1
-        elif status == "ocupado":
-            print(f"❌ {domain:<30} OCUPADO")
+        elif status in DEFINITIVE:
+            print(f"❌ {domain:<30} {LABELS[status].upper()}")
             ocupados += 1
         else:
             print(f"⚠️ {domain:<30} {status}")
@@ -6,17 +6,27 @@ Verificador assíncrono de domínios .com.br
 import streamlit as st
 import asyncio
 import aiohttp
-import itertools
 import pandas as pd
 from datetime import datetime
 import io
+import itertools
 import sys
+import tempfile
+import time
 from pathlib import Path
 
 # Adiciona o diretório tools ao path
 ROOT_DIR = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(ROOT_DIR / "tools" / "domain-checker"))
 
+from avail_parser import AVAILABLE, DEFINITIVE, read_status
+from keyspace import Keyspace, keyspace_for_pattern, known_size
+from normalize import REASONS, Normalizer
+from progress import ProgressReporter, ProgressTracker, format_duration
+from rate_limiter import TokenBucket
+from result_cache import ResultCache
+from sinks import CheckResult, ParquetSink
+
 def show_domain_checker():
     """Página principal do Domain Checker"""
 
@@ -64,11 +74,19 @@ def show_specific_domains_mode():
         "Domínios (um por linha)",
         placeholder="exemplo1.com.br\nexemplo2.com.br\nexemplo3.com.br",
         height=150,
-        help="Digite um domínio por linha. A extensão .com.br será adicionada automaticamente se não informada."
+        help="Digite um domínio por linha. A extensão .com.br será adicionada automaticamente se não informada; "
+             "acentos são convertidos para punycode e nomes inválidos ou repetidos são descartados."
     )
 
     col1, col2 = st.columns([3, 1])
 
+    with col1:
+        use_cache = st.checkbox(
+            "💾 Usar cache de resultados",
+            value=False,
+            help="Reaproveita resultados recentes (compartilhado com a CLI) sem consultar a API."
+        )
+
     with col2:
         check_button = st.button("🚀 Verificar Domínios", type="primary", use_container_width=True)
 
@@ -77,19 +95,24 @@ def show_specific_domains_mode():
             st.error("❌ Por favor, digite pelo menos um domínio!")
             return
 
-        # Processa a lista de domínios
-        domains = []
-        for line in domains_input.strip().split('\n'):
-            line = line.strip()
-            if line:
-                # Adiciona .com.br se não tiver
-                if not line.endswith('.com.br'):
-                    line = f"{line}.com.br"
-                domains.append(line)
-
-        if domains:
+        # Normaliza, valida e remove repetidos (mesmas regras da CLI)
+        normalizer = Normalizer()
+        domains = list(normalizer.feed(domains_input.splitlines()))
+
+        if normalizer.duplicates:
+            st.info(f"♻️ {normalizer.duplicates} domínios repetidos ignorados")
+        if normalizer.rejected:
+            rejected = sum(normalizer.rejected.values())
+            with st.expander(f"⚠️ {rejected} nomes inválidos ignorados"):
+                for reason, count in normalizer.rejected.most_common():
+                    examples = ", ".join(normalizer.examples[reason])
+                    st.markdown(f"- **{REASONS[reason]}**: {count} (ex.: `{examples}`)")
+
+        if not domains:
+            st.error("❌ Nenhum domínio válido para verificar!")
+        else:
             st.info(f"🔍 Verificando {len(domains)} domínios...")
-            run_domain_check(domains)
+            run_domain_check(domains, use_cache=use_cache)
 
 def show_auto_generation_mode():
     """Modo de geração automática de domínios"""
@@ -101,10 +124,11 @@ def show_auto_generation_mode():
     with col1:
         pattern_type = st.selectbox(
             "Padrão de Geração",
-            ["Letras Customizadas", "2 Letras", "3 Letras", "4 Letras"],
+            ["Letras Customizadas", "2 Letras", "3 Letras", "4 Letras", "Máscara"],
             help="Escolha o padrão para gerar os domínios"
         )
 
+    pattern = None
     with col2:
         if pattern_type == "Letras Customizadas":
             custom_letters = st.text_input(
@@ -113,21 +137,41 @@ def show_auto_generation_mode():
                 max_chars=26,
                 help="Digite as letras que deseja usar na geração (ex: abc)"
             ).lower()
-
-    # Calcula quantidade de domínios
-    if pattern_type == "Letras Customizadas":
-        if custom_letters:
-            total_domains = len(custom_letters) ** 3
+            if custom_letters:
+                pattern = f"custom:{custom_letters}"
+        elif pattern_type == "Máscara":
+            mask = st.text_input(
+                "Máscara",
+                value="loja?l?l",
+                help="?l letra, ?d dígito, ?a letra ou dígito, ?h também hífen, [a-f] conjunto, "
+                     "{loja,shop} alternativas, <arquivo.txt> palavras de um arquivo; "
+                     "categorias depois do ponto, ex.: loja?l?l.{com,net,org}.br"
+            )
+            if mask.strip():
+                pattern = f"mask:{mask.strip()}"
+        else:
+            pattern = {"2 Letras": "2letters", "3 Letras": "3letters", "4 Letras": "4letters"}[pattern_type]
+
+    # Calcula quantidade de domínios (sem gerá-los)
+    domains = None
+    if pattern is not None:
+        try:
+            domains = generate_domains(pattern)
+        except (OSError, ValueError) as e:
+            st.error(f"❌ {e}")
+
+    if domains is not None:
+        total_domains = domains.size
+        if pattern_type == "Letras Customizadas":
             st.info(f"📊 Serão gerados **{total_domains:,}** domínios com o padrão '{custom_letters}'")
-    elif pattern_type == "2 Letras":
-        total_domains = 26 ** 2
-        st.info(f"📊 Serão gerados **{total_domains:,}** domínios (aa.com.br até zz.com.br)")
-    elif pattern_type == "3 Letras":
-        total_domains = 26 ** 3
-        st.warning(f"⚠️ Serão gerados **{total_domains:,}** domínios! Isso pode levar várias horas.")
-    else:  # 4 Letras
-        total_domains = 26 ** 4
-        st.error(f"🚨 Serão gerados **{total_domains:,}** domínios! Isso pode levar dias!")
+        elif pattern_type == "2 Letras":
+            st.info(f"📊 Serão gerados **{total_domains:,}** domínios (aa.com.br até zz.com.br)")
+        elif total_domains >= 400_000:
+            st.error(f"🚨 Serão gerados **{total_domains:,}** domínios! Isso pode levar dias!")
+        elif total_domains >= 10_000:
+            st.warning(f"⚠️ Serão gerados **{total_domains:,}** domínios! Isso pode levar várias horas.")
+        else:
+            st.info(f"📊 Serão gerados **{total_domains:,}** domínios ({domains.mask()})")
 
     # Configurações avançadas
     with st.expander("⚙️ Configurações Avançadas"):
@@ -144,13 +188,13 @@ def show_auto_generation_mode():
             )
 
         with col2:
-            batch_delay = st.slider(
-                "Delay Entre Lotes (segundos)",
-                min_value=0.1,
-                max_value=5.0,
-                value=1.0,
-                step=0.1,
-                help="Pausa entre lotes de requisições. Valores menores = mais rápido, mas maior risco de bloqueio."
+            max_rps = st.slider(
+                "Requisições por Segundo (máx.)",
+                min_value=1,
+                max_value=200,
+                value=50,
+                step=1,
+                help="Limite contínuo de requisições por segundo (token bucket). Valores maiores = mais rápido, mas maior risco de bloqueio."
             )
 
         timeout = st.slider(
@@ -161,6 +205,12 @@ def show_auto_generation_mode():
             help="Tempo máximo de espera por cada requisição"
         )
 
+        use_cache = st.checkbox(
+            "💾 Usar cache de resultados",
+            value=False,
+            help="Reaproveita resultados recentes (compartilhado com a CLI) sem consultar a API."
+        )
+
     # Botão de verificação
     col1, col2, col3 = st.columns([1, 2, 1])
 
@@ -168,58 +218,67 @@ def show_auto_generation_mode():
         check_button = st.button("🚀 Iniciar Verificação", type="primary", use_container_width=True)
 
     if check_button:
-        # Gera lista de domínios
-        if pattern_type == "Letras Customizadas":
-            if not custom_letters:
-                st.error("❌ Digite as letras para geração customizada!")
-                return
-            domains = generate_domains(custom_letters, 3)
-        elif pattern_type == "2 Letras":
-            domains = generate_domains('abcdefghijklmnopqrstuvwxyz', 2)
-        elif pattern_type == "3 Letras":
-            if not st.session_state.get('confirmed_3_letters', False):
-                st.warning("⚠️ Esta verificação pode levar várias horas!")
-                if st.button("✅ Confirmar e Continuar"):
-                    st.session_state['confirmed_3_letters'] = True
-                    st.rerun()
-                return
-            domains = generate_domains('abcdefghijklmnopqrstuvwxyz', 3)
-        else:  # 4 Letras
-            if not st.session_state.get('confirmed_4_letters', False):
-                st.error("🚨 Esta verificação pode levar dias!")
-                if st.button("✅ Confirmar e Continuar (Não Recomendado)"):
-                    st.session_state['confirmed_4_letters'] = True
+        if domains is None:
+            st.error("❌ Informe um padrão válido para a geração!")
+            return
+
+        # Varreduras longas pedem confirmação
+        if domains.size >= 10_000:
+            confirmed = f"confirmed_{pattern}"
+            if not st.session_state.get(confirmed, False):
+                if domains.size >= 400_000:
+                    st.error("🚨 Esta verificação pode levar dias!")
+                    label = "✅ Confirmar e Continuar (Não Recomendado)"
+                else:
+                    st.warning("⚠️ Esta verificação pode levar várias horas!")
+                    label = "✅ Confirmar e Continuar"
+                if st.button(label):
+                    st.session_state[confirmed] = True
                     st.rerun()
                 return
-            domains = generate_domains('abcdefghijklmnopqrstuvwxyz', 4)
 
-        if domains:
-            st.info(f"🔍 Verificando {len(domains):,} domínios...")
-            run_domain_check(domains, batch_size=batch_size, batch_delay=batch_delay, timeout=timeout)
+        if domains.size:
+            st.info(f"🔍 Verificando {domains.size:,} domínios...")
+            run_domain_check(
+                domains,
+                batch_size=batch_size,
+                max_rps=max_rps,
+                timeout=timeout,
+                use_cache=use_cache
+            )
 
-def generate_domains(letters: str, length: int) -> list:
+def generate_domains(pattern: str) -> Keyspace:
     """
-    Gera lista de domínios baseada em letras e comprimento
+    Gera domínios a partir de um padrão (o mesmo motor da CLI)
 
     Args:
-        letters: Letras a usar
-        length: Comprimento das combinações
+        pattern: '2letters', '3letters', '4letters', 'custom:abc' ou 'mask:<máscara>'
 
     Returns:
-        Lista de domínios
+        Keyspace que produz os domínios sob demanda (com .size, sem gerá-los)
     """
-    combos = itertools.product(letters, length=length)
-    return [f"{''.join(combo)}.com.br" for combo in combos]
-
-def run_domain_check(domains: list, batch_size: int = 50, batch_delay: float = 1.0, timeout: int = 10):
+    return keyspace_for_pattern(pattern)
+
+def run_domain_check(
+    domains,
+    batch_size: int = 50,
+    batch_delay: float = 1.0,
+    timeout: int = 10,
+    use_cache: bool = False,
+    max_rps: float = None
+):
     """
     Executa a verificação de domínios
 
+    Os domínios são consumidos incrementalmente, lote a lote.
+
     Args:
-        domains: Lista de domínios a verificar
+        domains: Domínios a verificar (lista ou Keyspace)
         batch_size: Tamanho do lote
-        batch_delay: Delay entre lotes
+        batch_delay: Delay entre lotes (ignorado quando max_rps é informado)
         timeout: Timeout das requisições
+        use_cache: Consulta o cache persistente antes da API
+        max_rps: Limite de requisições por segundo (token bucket)
     """
 
     API_URL = "https://registro.br/v2/ajax/avail/raw/"
@@ -242,42 +301,126 @@ def run_domain_check(domains: list, batch_size: int = 50, batch_delay: float = 1
         with metrics_cols[3]:
             errors_metric = st.empty()
 
+        rate_cols = st.columns(3)
+        with rate_cols[0]:
+            rps_metric = st.empty()
+        with rate_cols[1]:
+            latency_metric = st.empty()
+        with rate_cols[2]:
+            eta_metric = st.empty()
+
     # Estado inicial
-    total = len(domains)
+    total = known_size(domains)
     checked = 0
     available_domains = []
     errors = 0
+    cache = ResultCache() if use_cache else None
+    rate_limiter = TokenBucket(max_rps) if max_rps else None
+    tracker = ProgressTracker()
+    tracker.start(total)
+
+    # Tabela completa (todos os status), gravada em row groups durante a
+    # verificação; sem pyarrow a verificação segue sem o Parquet
+    outcomes_path = Path(tempfile.mkdtemp(prefix="domain_checker_")) / "resultados.parquet"
+    try:
+        outcomes = ParquetSink(str(outcomes_path))
+    except ImportError:
+        outcomes = None
+        outcomes_path.parent.rmdir()
+
+    def record(domain, status, latency=None, attempts=1):
+        if outcomes is not None:
+            outcomes.write(CheckResult(domain, status, latency, None, attempts, time.time()))
+        tracker.record_result(status)
+
+    def update_progress(snapshot):
+        """Atualiza barra e métricas a partir do ProgressTracker"""
+        progress_bar.progress(snapshot.fraction)
+        status_text.text(
+            f"Verificando... {snapshot.completed:,}/{total:,} ({snapshot.fraction * 100:.1f}%)"
+        )
+        checked_metric.metric("Verificados", f"{checked:,}")
+        available_metric.metric(
+            "Disponíveis",
+            f"{snapshot.available:,}",
+            delta=f"+{snapshot.available}"
+        )
+        errors_metric.metric("Erros", f"{snapshot.errors:,}")
+        rps_metric.metric("Requisições/s", f"{snapshot.rps:.1f}")
+        latency_metric.metric(
+            "Latência p50 / p95",
+            f"{snapshot.p50 * 1000:.0f} / {snapshot.p95 * 1000:.0f} ms" if snapshot.p50 is not None else "-"
+        )
+        eta_metric.metric("ETA", format_duration(snapshot.eta) if snapshot.eta is not None else "-")
 
     # Atualiza métricas iniciais
     total_metric.metric("Total", f"{total:,}")
     checked_metric.metric("Verificados", "0")
     available_metric.metric("Disponíveis", "0", delta="0")
     errors_metric.metric("Erros", "0")
+    rps_metric.metric("Requisições/s", "-")
+    latency_metric.metric("Latência p50 / p95", "-")
+    eta_metric.metric("ETA", "-")
+
+    async def lookup_cache(batch):
+        """
+        Consulta o lote no cache (fora do event loop) e registra os acertos
+
+        Returns:
+            (faltas, disponíveis em cache); erros não são guardados, e os de
+            versões antigas contam como falta
+        """
+        nonlocal checked
+        if cache is None:
+            return batch, []
+
+        cached = await cache.lookup(batch)
+        misses, hits = [], []
+        for domain in batch:
+            status = cached.get(domain)
+            if status in DEFINITIVE:
+                record(domain, status, attempts=0)
+                checked += 1
+                if status == AVAILABLE:
+                    hits.append(domain)
+            else:
+                misses.append(domain)
+        return misses, hits
 
     async def check_domain(session, domain, semaphore):
-        """Verifica um domínio"""
+        """Verifica um domínio (que não estava no cache)"""
         nonlocal checked, errors
 
+        if rate_limiter is not None:
+            await rate_limiter.acquire()
+
         async with semaphore:
+            start = time.monotonic()
             try:
                 async with session.get(
                     API_URL + domain,
                     timeout=aiohttp.ClientTimeout(total=timeout)
                 ) as resp:
-                    if resp.status == 200:
-                        data = await resp.text()
-                        checked += 1
-
-                        if "disponível" in data.lower():
-                            return domain, True
-                        else:
-                            return domain, False
-                    else:
-                        errors += 1
-                        return None, None
+                    status = await read_status(resp)
+                latency = time.monotonic() - start
+                tracker.record_request(latency)
+
+                if status in DEFINITIVE:
+                    checked += 1
+                    record(domain, status, latency)
+                    if cache is not None:
+                        cache.store(domain, status)
+                    return domain, status == AVAILABLE
+                else:
+                    # Limitação de taxa, erro HTTP ou resposta desconhecida
+                    errors += 1
+                    record(domain, "error", latency)
+                    return None, None
 
             except Exception:
+                tracker.record_request(time.monotonic() - start)
                 errors += 1
+                record(domain, "error")
                 return None, None
 
     async def verify_all():
@@ -286,41 +429,32 @@ def run_domain_check(domains: list, batch_size: int = 50, batch_delay: float = 1
 
         semaphore = asyncio.Semaphore(batch_size)
 
-        async with aiohttp.ClientSession() as session:
-            tasks = []
-
-            for i, domain in enumerate(domains, 1):
-                task = check_domain(session, domain, semaphore)
-                tasks.append(task)
-
-                # Processa em lotes
-                if len(tasks) >= batch_size or i == total:
-                    results = await asyncio.gather(*tasks, return_exceptions=True)
-
-                    for result in results:
-                        if isinstance(result, tuple) and result[0]:
-                            domain, is_available = result
-                            if is_available:
-                                available_domains.append(domain)
-
-                    # Atualiza UI
-                    progress = checked / total
-                    progress_bar.progress(progress)
-                    status_text.text(f"Verificando... {checked:,}/{total:,} ({progress*100:.1f}%)")
+        # Barra e métricas atualizadas por tempo, independente dos lotes
+        async with ProgressReporter(tracker, update_progress, interval=1.0), \
+                aiohttp.ClientSession() as session:
+            pending = iter(domains)
+            batch = list(itertools.islice(pending, batch_size))
+
+            # Processa em lotes; o cache é consultado por lote antes das requisições
+            while batch:
+                misses, hits = await lookup_cache(batch)
+                available_domains.extend(hits)
+                results = await asyncio.gather(
+                    *(check_domain(session, domain, semaphore) for domain in misses),
+                    return_exceptions=True
+                )
 
-                    checked_metric.metric("Verificados", f"{checked:,}")
-                    available_metric.metric(
-                        "Disponíveis",
-                        f"{len(available_domains):,}",
-                        delta=f"+{len(available_domains)}"
-                    )
-                    errors_metric.metric("Erros", f"{errors:,}")
+                for result in results:
+                    if isinstance(result, tuple) and result[0]:
+                        domain, is_available = result
+                        if is_available:
+                            available_domains.append(domain)
 
-                    tasks = []
+                batch = list(itertools.islice(pending, batch_size))
 
-                    # Delay entre lotes
-                    if i < total:
-                        await asyncio.sleep(batch_delay)
+                # Delay entre lotes (com limite de taxa o ritmo já é contínuo)
+                if batch and misses and rate_limiter is None:
+                    await asyncio.sleep(batch_delay)
 
     # Executa verificação
     try:
@@ -355,6 +489,22 @@ def run_domain_check(domains: list, batch_size: int = 50, batch_delay: float = 1
             else:
                 st.warning("😕 Nenhum domínio disponível foi encontrado.")
 
+            # Todos os resultados (ocupados e erros incluídos) em Parquet
+            if outcomes is not None:
+                outcomes.close()
+                st.download_button(
+                    label="📥 Baixar Todos os Resultados (Parquet)",
+                    data=outcomes_path.read_bytes(),
+                    file_name=f"resultados_{datetime.now().strftime('%Y%m%d_%H%M%S')}.parquet",
+                    mime="application/vnd.apache.parquet"
+                )
+                st.caption("Parquet com colunas tipadas: `pd.read_parquet(arquivo)`")
+            else:
+                st.info(
+                    "ℹ️ Instale o pyarrow (`pip install pyarrow`) para baixar "
+                    "todos os resultados em Parquet."
+                )
+
             # Resumo
             st.markdown("### 📊 Resumo")
             col1, col2, col3, col4 = st.columns(4)
@@ -368,8 +518,20 @@ def run_domain_check(domains: list, batch_size: int = 50, batch_delay: float = 1
             with col4:
                 st.metric("Erros", f"{errors:,}")
 
+            if cache is not None:
+                st.caption(f"💾 Cache: {cache.summary()}")
+
     except Exception as e:
         st.error(f"❌ Erro durante a verificação: {str(e)}")
+    finally:
+        if outcomes is not None:
+            outcomes.close()
+            outcomes_path.unlink(missing_ok=True)
+            outcomes_path.parent.rmdir()
+        if cache is not None:
+            # Grava de uma vez o que store() deixou pendente
+            cache.flush()
+            cache.close()
 
 def show_documentation_tab():
     """Tab de documentação"""
@@ -389,7 +551,7 @@ def show_documentation_tab():
       - Domínios específicos (verificação manual)
       - Geração automática (busca em massa)
     - 📊 **Progresso em Tempo Real** - Acompanhe a verificação ao vivo
-    - 💾 **Export CSV** - Baixe os resultados facilmente
+    - 💾 **Export CSV e Parquet** - Baixe os disponíveis em CSV ou todos os resultados em Parquet
     - ⚙️ **Configurável** - Ajuste velocidade e performance
 
     ### 🚀 Como Usar
@@ -397,7 +559,7 @@ def show_documentation_tab():
     #### Modo 1: Domínios Específicos
 
     1. Selecione "🎯 Domínios Específicos"
-    2. Digite os domínios que deseja verificar (um por linha)
+    2. Digite os domínios que deseja verificar (um por linha; acentos viram punycode e nomes inválidos ou repetidos são descartados)
     3. Clique em "Verificar Domínios"
     4. Aguarde os resultados
     5. Baixe o CSV se desejar
@@ -410,6 +572,7 @@ def show_documentation_tab():
        - **2 Letras**: Gera 676 domínios (aa a zz)
        - **3 Letras**: Gera 17.576 domínios (aaa a zzz) ⚠️
        - **4 Letras**: Gera 456.976 domínios (aaaa a zzzz) 🚨
+       - **Máscara**: Descreve o nome por posição (ex: `loja?l?l.{com,net,org}.br`)
     3. Configure parâmetros avançados se necessário
     4. Clique em "Iniciar Verificação"
     5. Aguarde e baixe os resultados
@@ -421,10 +584,10 @@ def show_documentation_tab():
       - Valores médios (50-100): Balanceado (recomendado)
       - Valores altos (100-200): Mais rápido, risco de bloqueio
 
-    - **Delay Entre Lotes**: Pausa entre grupos de requisições
-      - 2-5s: Muito seguro, mais lento
-      - 1-2s: Balanceado (recomendado)
-      - 0.1-1s: Rápido, risco de bloqueio
+    - **Requisições por Segundo**: Limite contínuo de taxa (token bucket), sem rajadas entre lotes
+      - 1-20 req/s: Muito seguro, mais lento
+      - 20-50 req/s: Balanceado (recomendado)
+      - 50-200 req/s: Rápido, risco de bloqueio
 
     - **Timeout**: Tempo máximo de espera por resposta
       - Recomendado: 10 segundos
@@ -442,7 +605,7 @@ def show_documentation_tab():
 
     1. **Teste primeiro**: Use "Letras Customizadas" com poucas letras (ex: abc = 27 domínios)
     2. **Respeite limites**: O Registro.br pode bloquear IPs com requisições excessivas
-    3. **Use delays adequados**: Não reduza muito os delays sem necessidade
+    3. **Use taxas adequadas**: Não aumente muito as requisições por segundo sem necessidade
     4. **Horários**: Evite horários de pico para verificações grandes
 
     ### 🔒 API do Registro.br
@@ -465,12 +628,12 @@ def show_documentation_tab():
 
     **Muitos erros durante a verificação:**
     - Reduza "Requisições Simultâneas"
-    - Aumente "Delay Entre Lotes"
+    - Reduza "Requisições por Segundo"
     - Verifique sua conexão de internet
 
     **Verificação muito lenta:**
     - Aumente "Requisições Simultâneas"
-    - Reduza "Delay Entre Lotes"
+    - Aumente "Requisições por Segundo"
     - Use padrões menores para testes
 
     **Nenhum domínio disponível:**